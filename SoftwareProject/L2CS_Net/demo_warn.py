@@ -8,7 +8,6 @@ import pathlib
 import numpy as np
 import cv2
 import time
-import threading
 import os
 
 import torch
@@ -16,12 +15,13 @@ import torch.backends.cudnn as cudnn
 
 from playsound import playsound       # pip install playsound
 from batch_face.face_detection import RetinaFace  # 若用自定义别名环境，无需改动
-from l2cs import select_device, Pipeline, render
+from l2cs import (select_device, Pipeline, render, GazeZoneClassifier, ZoneAttentionStats,
+                  AttentionAlertEngine, AlertNotifier)
 
 CWD = pathlib.Path.cwd()
 
 def play_audio(path):
-    """非阻塞播放告警音"""
+    """播放告警音（在 AlertNotifier 的单一工作线程中调用）"""
     playsound(path)
 
 def parse_args():
@@ -38,10 +38,18 @@ def parse_args():
                         help='左右偏离阈值 (°)')
     parser.add_argument('--pitch_th', type=float, default=10.0,
                         help='上下偏离阈值 (°)')
-    parser.add_argument('--alert_t',  type=int, default=10,
-                        help='持续偏离多少秒后报警 (s)')
+    parser.add_argument('--alert_t',  type=float, default=10,
+                        help='单次持续偏离多少秒后报警 (s)')
+    parser.add_argument('--window',   type=float, default=30.0,
+                        help='累计偏离统计的滑动窗口 (s)')
+    parser.add_argument('--window_t', type=float, default=15.0,
+                        help='窗口内累计偏离多少秒后报警 (s)')
     parser.add_argument('--audio',    type=str, default='Notice.mp3',
                         help='告警音频文件路径')
+    parser.add_argument('--zones',    type=str, default='',
+                        help='视线区域配置 (JSON)，为空时使用默认座舱布局')
+    parser.add_argument('--stats_window', type=float, default=60.0,
+                        help='区域注视统计的滑动窗口 (s)')
     return parser.parse_args()
 
 if __name__ == '__main__':
@@ -65,8 +73,17 @@ if __name__ == '__main__':
     if not cap.isOpened():
         raise IOError(f"无法打开摄像头 {args.cam}")
 
-    alert_start = None
-    alert_active = False
+    # 视线区域查找表 + 滑动窗口注视统计
+    zone_classifier = (GazeZoneClassifier.from_json(args.zones) if args.zones
+                       else GazeZoneClassifier())
+    zone_stats = ZoneAttentionStats(zone_classifier.names, windows=(args.stats_window,))
+
+    # 告警引擎：滑动窗口偏离统计 + 去抖，告警音由单一工作线程播放
+    notifier = AlertNotifier(lambda event: play_audio(args.audio))
+    alert_engine = AttentionAlertEngine(glance_threshold=args.alert_t,
+                                        window=args.window,
+                                        off_road_threshold=args.window_t,
+                                        notifier=notifier)
 
     print("Starting driver-monitor demo. Press 'q' to exit.")
     with torch.no_grad():
@@ -98,26 +115,32 @@ if __name__ == '__main__':
             pitch = float(pitch_arr[idx])
             yaw   = float(yaw_arr[idx])
 
-            # 偏离判断
-            off_road = abs(yaw) > args.yaw_th or abs(pitch) > args.pitch_th
-            if off_road and alert_start is None:
-                alert_start = time.time()
-            if not off_road:
-                alert_start = None
-                alert_active = False
-            if alert_start and not alert_active:
-                if time.time() - alert_start >= args.alert_t:
-                    threading.Thread(target=play_audio, args=(args.audio,), daemon=True).start()
-                    alert_active = True
+            # 区域分类 (Pipeline 输出为弧度)
+            zone_idx = zone_classifier.index(np.degrees(pitch), np.degrees(yaw))
+            zone_stats.update(time.time(), zone_idx)
+
+            # 偏离判断（阈值单位为度）
+            off_road = (abs(np.degrees(yaw)) > args.yaw_th or
+                        abs(np.degrees(pitch)) > args.pitch_th)
+            alert_engine.update(time.time(), off_road)
 
             # 叠加FPS
             fps = 1.0 / max((time.time() - start_time), 1e-8)
             cv2.putText(frame, f'FPS: {fps:.1f}', (10, 20),
                         cv2.FONT_HERSHEY_COMPLEX_SMALL, 1, (0, 255, 0), 1,
                         cv2.LINE_AA)
+            # 叠加当前区域及窗口内道路注视占比
+            road = zone_stats.summary(args.stats_window)[zone_classifier.names[0]]
+            cv2.putText(frame, f'Zone: {zone_classifier.names[zone_idx]} '
+                               f'({zone_stats.glance_duration():.1f}s)', (10, 45),
+                        cv2.FONT_HERSHEY_COMPLEX_SMALL, 1, (0, 255, 0), 1,
+                        cv2.LINE_AA)
+            cv2.putText(frame, f'Road: {road["dwell"]:.0f}s / {args.stats_window:.0f}s', (10, 70),
+                        cv2.FONT_HERSHEY_COMPLEX_SMALL, 1, (0, 255, 0), 1,
+                        cv2.LINE_AA)
             # 叠加警告文字
-            if alert_active:
-                cv2.putText(frame, '警告，请目视前方', (50, 80),
+            if alert_engine.alert_active:
+                cv2.putText(frame, '警告，请目视前方', (50, 110),
                             cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 0, 255), 3,
                             cv2.LINE_AA)
 
@@ -125,5 +148,6 @@ if __name__ == '__main__':
             if cv2.waitKey(1) & 0xFF == ord('q'):
                 break
 
+    notifier.close()
     cap.release()
     cv2.destroyAllWindows()
\ No newline at end of file
@@ -1,8 +1,33 @@
-from .utils import select_device, natural_keys, gazeto3d, angular, getArch
-from .vis import draw_gaze, render
-from .model import L2CS
-from .pipeline import Pipeline
-from .datasets import Gaze360, Mpiigaze
+import importlib
+
+# zones and alerts only need numpy; everything else pulls in torch and the
+# face detector, so it is imported on first access
+from .zones import GazeZone, GazeZoneClassifier, ZoneAttentionStats, DEFAULT_ZONES
+from .alerts import AttentionAlertEngine, AlertNotifier, AlertEvent
+
+_LAZY = {
+    '.utils': ('select_device', 'natural_keys', 'gazeto3d', 'angular', 'getArch', 'load_checkpoint'),
+    '.vis': ('draw_gaze', 'render'),
+    '.model': ('L2CS',),
+    '.pipeline': ('Pipeline',),
+    '.datasets': ('Gaze360', 'Mpiigaze'),
+    '.evaluate': ('measure_latency', 'evaluate_angular_error', 'count_flops', 'count_params'),
+    '.zoo': ('ModelZoo', 'ModelProfile'),
+}
+_LAZY_NAMES = {name: module for module, names in _LAZY.items() for name in names}
+
+
+def __getattr__(name):
+    module = _LAZY_NAMES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_NAMES))
 
 __all__ = [
     # Classes
@@ -10,6 +35,14 @@ __all__ = [
     'Pipeline',
     'Gaze360',
     'Mpiigaze',
+    'ModelZoo',
+    'ModelProfile',
+    'GazeZone',
+    'GazeZoneClassifier',
+    'ZoneAttentionStats',
+    'AttentionAlertEngine',
+    'AlertNotifier',
+    'AlertEvent',
     # Utils
     'render',
     'select_device',
@@ -17,5 +50,11 @@ __all__ = [
     'natural_keys',
     'gazeto3d',
     'angular',
-    'getArch'
+    'getArch',
+    'measure_latency',
+    'evaluate_angular_error',
+    'count_flops',
+    'count_params',
+    'load_checkpoint',
+    'DEFAULT_ZONES'
 ]
@@ -0,0 +1,171 @@
+import queue
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from .zones import SlidingWindowSums
+
+
+@dataclass
+class AlertEvent:
+    """Debounced off-road attention alert."""
+
+    t: float
+    reason: str             # 'glance': one glance too long, 'window': too much off-road time in the window
+    glance: float           # duration of the ongoing off-road glance (s)
+    off_road_time: float    # off-road time within the window (s)
+    longest_glance: float   # longest off-road glance within the window (s)
+
+
+class AttentionAlertEngine:
+    """Off-road attention alerts from timestamped gaze samples.
+
+    Every `update(t, off_road)` is O(1) (amortised): the off-road time of the
+    last `window` seconds is kept in time buckets, and the longest glance in
+    a monotonic deque. Only the sample timestamps are used, never the wall
+    clock, so recorded streams can be replayed much faster than real time.
+
+    An alert fires when one glance lasts `glance_threshold` seconds or the
+    off-road time in the window reaches `off_road_threshold`. It stays active
+    until the driver has looked back at the road for `rearm_time`, and two
+    alerts are at least `cooldown` seconds apart.
+    """
+
+    def __init__(self, glance_threshold: float = 2.0, window: float = 10.0, off_road_threshold: float = 4.0,
+                 rearm_time: float = 1.0, cooldown: float = 5.0, bucket: float = 0.1, max_gap: float = 2.0,
+                 notifier: Optional['AlertNotifier'] = None):
+        self.glance_threshold = glance_threshold
+        self.window = window
+        self.off_road_threshold = off_road_threshold
+        self.rearm_time = rearm_time
+        self.cooldown = cooldown
+        self.max_gap = max_gap
+        self.notifier = notifier
+
+        self.off_road_sums = SlidingWindowSums(window, 1, bucket)
+        self.glances = deque()      # (end_t, duration) with decreasing durations
+        self.reset_state()
+
+    def reset_state(self):
+        self.off_road_sums.reset()
+        self.glances.clear()
+        self.last_t = None
+        self.last_off_road = False
+        self.glance_start = None
+        self.on_road_since = None
+        self.last_alert_t = None
+        self.alert_active = False
+
+    def _end_glance(self, t_end: float):
+        duration = t_end - self.glance_start
+        while self.glances and self.glances[-1][1] <= duration:
+            self.glances.pop()
+        self.glances.append((t_end, duration))
+        self.glance_start = None
+
+    def current_glance(self) -> float:
+        if self.glance_start is None:
+            return 0.0
+        return self.last_t - self.glance_start
+
+    def off_road_time(self) -> float:
+        return float(self.off_road_sums.totals[0])
+
+    def longest_glance(self) -> float:
+        finished = self.glances[0][1] if self.glances else 0.0
+        return max(finished, self.current_glance())
+
+    def update(self, t: float, off_road: bool) -> Optional[AlertEvent]:
+        if self.last_t is not None:
+            dt = t - self.last_t
+            if dt > self.max_gap:
+                # Tracking gap (no face): close the glance, credit nothing
+                if self.glance_start is not None:
+                    self._end_glance(self.last_t)
+            elif dt > 0 and self.last_off_road:
+                self.off_road_sums.add(t, 0, dt)
+        self.off_road_sums.advance(t)
+
+        self.last_t = t
+        if off_road:
+            if self.glance_start is None:
+                self.glance_start = t
+            self.on_road_since = None
+        else:
+            if self.glance_start is not None:
+                self._end_glance(t)
+            if self.on_road_since is None:
+                self.on_road_since = t
+        self.last_off_road = off_road
+
+        while self.glances and self.glances[0][0] < t - self.window:
+            self.glances.popleft()
+
+        if self.alert_active:
+            if not off_road and t - self.on_road_since >= self.rearm_time:
+                self.alert_active = False
+            return None
+        if not off_road:
+            return None
+        if self.last_alert_t is not None and t - self.last_alert_t < self.cooldown:
+            return None
+
+        glance, off_time = self.current_glance(), self.off_road_time()
+        if glance >= self.glance_threshold:
+            reason = 'glance'
+        elif off_time >= self.off_road_threshold:
+            reason = 'window'
+        else:
+            return None
+
+        self.alert_active = True
+        self.last_alert_t = t
+        event = AlertEvent(t, reason, glance, off_time, self.longest_glance())
+        if self.notifier is not None:
+            self.notifier.notify(event)
+        return event
+
+    def replay(self, samples: Iterable[Tuple[float, bool]]) -> List[AlertEvent]:
+        """Run a recorded (t, off_road) stream and return the emitted alerts."""
+        events = []
+        for t, off_road in samples:
+            event = self.update(t, off_road)
+            if event is not None:
+                events.append(event)
+        return events
+
+
+class AlertNotifier:
+    """Single worker thread delivering alerts to a sink (sound, UI, ...).
+
+    While the sink is busy, at most `max_pending` alerts wait; further ones
+    are dropped instead of piling up threads or sounds.
+    """
+
+    def __init__(self, sink: Callable[[AlertEvent], None], max_pending: int = 1):
+        self.sink = sink
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.dropped = 0
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def notify(self, event: AlertEvent):
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        while True:
+            event = self.queue.get()
+            if event is None:
+                break
+            try:
+                self.sink(event)
+            except Exception as e:
+                print(f'Alert sink failed: {e}')
+
+    def close(self, timeout: float = 2.0):
+        self.queue.put(None)
+        self.thread.join(timeout)
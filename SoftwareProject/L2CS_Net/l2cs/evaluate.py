@@ -0,0 +1,92 @@
+import time
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from .utils import gazeto3d, angular
+
+
+def measure_latency(model: nn.Module, device='cpu', input_size: int = 448, runs: int = 50, warmup: int = 5) -> float:
+    """Average forward time of a single face crop in milliseconds."""
+    device = torch.device(device)
+    model = model.to(device)
+    model.eval()
+    img = torch.randn(1, 3, input_size, input_size, device=device)
+
+    with torch.no_grad():
+        for _ in range(warmup):
+            model(img)
+        if device.type == 'cuda':
+            torch.cuda.synchronize(device)
+
+        start = time.perf_counter()
+        for _ in range(runs):
+            model(img)
+        if device.type == 'cuda':
+            torch.cuda.synchronize(device)
+
+    return (time.perf_counter() - start) * 1000.0 / runs
+
+
+def evaluate_angular_error(model: nn.Module, loader, device, num_bins: int = 90, binwidth: int = 4, angle: int = 180) -> float:
+    """Mean angular error (degrees) of `model` over a Gaze360/Mpiigaze style loader."""
+    model = model.to(device)
+    model.eval()
+    softmax = nn.Softmax(dim=1)
+    idx_tensor = torch.FloatTensor([idx for idx in range(num_bins)]).to(device)
+
+    total = 0
+    avg_error = .0
+    with torch.no_grad():
+        for images, labels, cont_labels, name in loader:
+            images = images.to(device)
+            total += cont_labels.size(0)
+
+            label_pitch = cont_labels[:, 0].float() * np.pi / 180
+            label_yaw = cont_labels[:, 1].float() * np.pi / 180
+
+            gaze_pitch, gaze_yaw = model(images)
+
+            # Continuous predictions
+            pitch_predicted = torch.sum(softmax(gaze_pitch) * idx_tensor, 1).cpu() * binwidth - angle
+            yaw_predicted = torch.sum(softmax(gaze_yaw) * idx_tensor, 1).cpu() * binwidth - angle
+
+            pitch_predicted = pitch_predicted * np.pi / 180
+            yaw_predicted = yaw_predicted * np.pi / 180
+
+            for p, y, pl, yl in zip(pitch_predicted, yaw_predicted, label_pitch, label_yaw):
+                avg_error += angular(gazeto3d([p, y]), gazeto3d([pl, yl]))
+
+    return avg_error / max(total, 1)
+
+
+def count_flops(model: nn.Module, input_size: int = 448) -> int:
+    """Multiply-accumulate operations of one forward pass (conv + linear layers)."""
+    macs = []
+
+    def conv_hook(module, inputs, output):
+        kh, kw = module.kernel_size
+        macs.append(output.numel() * (module.in_channels // module.groups) * kh * kw)
+
+    def linear_hook(module, inputs, output):
+        macs.append(output.numel() * module.in_features)
+
+    hooks = []
+    for m in model.modules():
+        if isinstance(m, nn.Conv2d):
+            hooks.append(m.register_forward_hook(conv_hook))
+        elif isinstance(m, nn.Linear):
+            hooks.append(m.register_forward_hook(linear_hook))
+
+    device = next(model.parameters()).device
+    model.eval()
+    with torch.no_grad():
+        model(torch.zeros(1, 3, input_size, input_size, device=device))
+    for h in hooks:
+        h.remove()
+    return int(sum(macs))
+
+
+def count_params(model: nn.Module) -> int:
+    return sum(p.numel() for p in model.parameters())
@@ -9,7 +9,7 @@ from dataclasses import dataclass
 #from face_detection import RetinaFace
 from batch_face.face_detection import RetinaFace
 
-from .utils import prep_input_numpy, getArch
+from .utils import prep_input_numpy, load_checkpoint, build_transformations
 from .results import GazeResultContainer
 
 
@@ -21,7 +21,8 @@ class Pipeline:
         arch: str,
         device: str = 'cpu', 
         include_detector:bool = True,
-        confidence_threshold:float = 0.5
+        confidence_threshold:float = 0.5,
+        input_size:int = 448
         ):
 
         # Save input parameters
@@ -29,10 +30,11 @@ class Pipeline:
         self.include_detector = include_detector
         self.device = device
         self.confidence_threshold = confidence_threshold
+        self.input_size = input_size
+        self.transformations = build_transformations(input_size)
 
         # Create L2CS model
-        self.model = getArch(arch, 90)
-        self.model.load_state_dict(torch.load(self.weights, map_location=device))
+        self.model = load_checkpoint(self.weights, arch, 90, device)
         self.model.to(self.device)
         self.model.eval()
 
@@ -44,76 +46,93 @@ class Pipeline:
             else:
                 self.detector = RetinaFace(gpu_id=device.index)
 
-            self.softmax = nn.Softmax(dim=1)
-            self.idx_tensor = [idx for idx in range(90)]
-            self.idx_tensor = torch.FloatTensor(self.idx_tensor).to(self.device)
+        self.softmax = nn.Softmax(dim=1)
+        self.idx_tensor = [idx for idx in range(90)]
+        self.idx_tensor = torch.FloatTensor(self.idx_tensor).to(self.device)
 
     def step(self, frame: np.ndarray) -> GazeResultContainer:
 
-        # Creating containers
-        face_imgs = []
+        if not self.include_detector:
+            pitch, yaw = self.predict_gaze(frame)
+            return GazeResultContainer(
+                pitch=pitch,
+                yaw=yaw,
+                bboxes=np.empty((0, 4)),
+                landmarks=np.empty((0, 5, 2)),
+                scores=np.empty((0,))
+            )
+
         bboxes = []
         landmarks = []
         scores = []
+        faces = self.detector(frame)
+        if faces is not None:
+            for box, landmark, score in faces:
+
+                # Apply threshold
+                if score < self.confidence_threshold:
+                    continue
+                bboxes.append(box)
+                landmarks.append(landmark)
+                scores.append(score)
+
+        return self.step_boxes(frame, bboxes, landmarks, scores)
+
+    def step_boxes(self, frame: np.ndarray, bboxes, landmarks=None, scores=None) -> GazeResultContainer:
+        """Estimate gaze for faces located by an external detector.
+
+        Lets a caller that already detects faces (e.g. a dlib landmark pipeline)
+        share its detection pass instead of running RetinaFace again.
+        `bboxes` are (x_min, y_min, x_max, y_max) in frame pixels; `landmarks`
+        are optional (5, 2) points per face and `scores` default to 1.
+        """
+        bboxes = np.asarray(bboxes, dtype=np.float32).reshape(-1, 4)
+        if landmarks is None or len(bboxes) == 0:
+            landmarks = np.zeros((len(bboxes), 5, 2), dtype=np.float32)
+        else:
+            landmarks = np.asarray(landmarks, dtype=np.float32).reshape(len(bboxes), -1, 2)
+        scores = (np.ones(len(bboxes), dtype=np.float32) if scores is None
+                  else np.asarray(scores, dtype=np.float32).reshape(-1))
 
-        if self.include_detector:
-            faces = self.detector(frame)
-
-            if faces is not None: 
-                for box, landmark, score in faces:
-
-                    # Apply threshold
-                    if score < self.confidence_threshold:
-                        continue
-
-                    # Extract safe min and max of x,y
-                    x_min=int(box[0])
-                    if x_min < 0:
-                        x_min = 0
-                    y_min=int(box[1])
-                    if y_min < 0:
-                        y_min = 0
-                    x_max=int(box[2])
-                    y_max=int(box[3])
-                    
-                    # Crop image
-                    img = frame[y_min:y_max, x_min:x_max]
-                    img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
-                    img = cv2.resize(img, (224, 224))
-                    face_imgs.append(img)
-
-                    # Save data
-                    bboxes.append(box)
-                    landmarks.append(landmark)
-                    scores.append(score)
-
-                # Predict gaze
-                pitch, yaw = self.predict_gaze(np.stack(face_imgs))
-
-            else:
-
-                pitch = np.empty((0,1))
-                yaw = np.empty((0,1))
-
+        face_imgs = []
+        keep = []
+        for i, box in enumerate(bboxes):
+
+            # Extract safe min and max of x,y
+            x_min = max(int(box[0]), 0)
+            y_min = max(int(box[1]), 0)
+            x_max = int(box[2])
+            y_max = int(box[3])
+            if x_max <= x_min or y_max <= y_min:
+                continue
+
+            # Crop image
+            img = frame[y_min:y_max, x_min:x_max]
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+            img = cv2.resize(img, (224, 224))
+            face_imgs.append(img)
+            keep.append(i)
+
+        if face_imgs:
+            # Predict gaze for all faces in one batch
+            pitch, yaw = self.predict_gaze(np.stack(face_imgs))
         else:
-            pitch, yaw = self.predict_gaze(frame)
+            pitch = np.empty((0,))
+            yaw = np.empty((0,))
 
-        # Save data
-        results = GazeResultContainer(
+        return GazeResultContainer(
             pitch=pitch,
             yaw=yaw,
-            bboxes=np.stack(bboxes),
-            landmarks=np.stack(landmarks),
-            scores=np.stack(scores)
+            bboxes=bboxes[keep],
+            landmarks=landmarks[keep],
+            scores=scores[keep]
         )
 
-        return results
-
     def predict_gaze(self, frame: Union[np.ndarray, torch.Tensor]):
         
         # Prepare input
         if isinstance(frame, np.ndarray):
-            img = prep_input_numpy(frame, self.device)
+            img = prep_input_numpy(frame, self.device, self.transformations)
         elif isinstance(frame, torch.Tensor):
             img = frame
         else:
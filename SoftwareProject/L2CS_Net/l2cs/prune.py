@@ -0,0 +1,108 @@
+from typing import Callable, Dict, Optional
+
+import torch
+import torch.nn as nn
+
+
+def prunable_convs(model: nn.Module):
+    """Yield (name, block, conv, bn, next_conv) for every prunable channel group.
+
+    Only the inner channels of the residual blocks are pruned (conv1 of a
+    BasicBlock, conv1/conv2 of a Bottleneck), so block outputs and the
+    residual additions keep their width.
+    """
+    for layer_name in ('layer1', 'layer2', 'layer3', 'layer4'):
+        for idx, block in enumerate(getattr(model, layer_name)):
+            pairs = [('conv1', 'bn1', 'conv2')]
+            if hasattr(block, 'conv3'):
+                pairs.append(('conv2', 'bn2', 'conv3'))
+            for conv, bn, next_conv in pairs:
+                yield f'{layer_name}.{idx}.{conv}', block, conv, bn, next_conv
+
+
+def _conv_like(conv: nn.Conv2d, in_channels: int, out_channels: int) -> nn.Conv2d:
+    return nn.Conv2d(in_channels, out_channels, kernel_size=conv.kernel_size, stride=conv.stride,
+                     padding=conv.padding, dilation=conv.dilation, bias=conv.bias is not None)
+
+
+def _keep_channels(block, conv_name, bn_name, next_name, keep: torch.Tensor):
+    """Replace conv/bn/next_conv of `block` with physically smaller copies."""
+    conv, bn, next_conv = getattr(block, conv_name), getattr(block, bn_name), getattr(block, next_name)
+
+    new_conv = _conv_like(conv, conv.in_channels, len(keep))
+    new_conv.weight.data = conv.weight.data[keep].clone()
+
+    new_bn = nn.BatchNorm2d(len(keep), eps=bn.eps, momentum=bn.momentum)
+    new_bn.weight.data = bn.weight.data[keep].clone()
+    new_bn.bias.data = bn.bias.data[keep].clone()
+    new_bn.running_mean = bn.running_mean[keep].clone()
+    new_bn.running_var = bn.running_var[keep].clone()
+    new_bn.num_batches_tracked = bn.num_batches_tracked.clone()
+
+    new_next = _conv_like(next_conv, len(keep), next_conv.out_channels)
+    new_next.weight.data = next_conv.weight.data[:, keep].clone()
+
+    device = conv.weight.device
+    setattr(block, conv_name, new_conv.to(device))
+    setattr(block, bn_name, new_bn.to(device))
+    setattr(block, next_name, new_next.to(device))
+
+
+def compute_sensitivity(model: nn.Module, loader, loss_fn: Callable, device, batches: int = 10) -> Dict[str, torch.Tensor]:
+    """First-order Taylor importance |gamma * dL/dgamma| of every prunable channel.
+
+    `loss_fn(model, batch)` must return a scalar loss for one loader batch.
+    """
+    groups = list(prunable_convs(model))
+    scores = {name: torch.zeros_like(getattr(block, bn).weight) for name, block, _, bn, _ in groups}
+
+    model.to(device)
+    model.eval()
+    for i, batch in enumerate(loader):
+        if i >= batches:
+            break
+        model.zero_grad()
+        loss_fn(model, batch).backward()
+        for name, block, _, bn, _ in groups:
+            bn_module = getattr(block, bn)
+            scores[name] += (bn_module.weight * bn_module.weight.grad).detach().abs()
+    model.zero_grad()
+    return scores
+
+
+def prune_model(model: nn.Module, ratio: float, method: str = 'magnitude',
+                sensitivity: Optional[Dict[str, torch.Tensor]] = None) -> Dict[str, int]:
+    """Remove `ratio` of the inner channels of every residual block in place.
+
+    Channels are ranked by the L1 norm of their filters ('magnitude') or by
+    a score from `compute_sensitivity` ('sensitivity'). Returns the channel
+    config needed to rebuild the pruned network with `apply_channel_config`.
+    """
+    if method == 'sensitivity' and sensitivity is None:
+        raise ValueError('Sensitivity pruning needs the scores of compute_sensitivity')
+
+    channel_cfg = {}
+    for name, block, conv, bn, next_conv in list(prunable_convs(model)):
+        if method == 'sensitivity':
+            importance = sensitivity[name]
+        else:
+            importance = getattr(block, conv).weight.data.abs().sum(dim=(1, 2, 3))
+
+        n_keep = max(1, int(round(importance.numel() * (1.0 - ratio))))
+        keep = torch.argsort(importance, descending=True)[:n_keep].sort().values.cpu()
+        _keep_channels(block, conv, bn, next_conv, keep)
+        channel_cfg[name] = n_keep
+    return channel_cfg
+
+
+def apply_channel_config(model: nn.Module, channel_cfg: Dict[str, int]) -> nn.Module:
+    """Shrink a freshly built L2CS to the widths of a pruned snapshot."""
+    for name, block, conv, bn, next_conv in list(prunable_convs(model)):
+        if name in channel_cfg:
+            _keep_channels(block, conv, bn, next_conv, torch.arange(channel_cfg[name]))
+    return model
+
+
+def save_pruned(model: nn.Module, channel_cfg: Dict[str, int], arch: str, path):
+    """Save a pruned model in the format understood by `load_checkpoint`/`Pipeline`."""
+    torch.save({'arch': arch, 'channel_cfg': channel_cfg, 'state_dict': model.state_dict()}, path)
@@ -15,16 +15,21 @@ import torchvision
 from torchvision import transforms
 
 from .model import L2CS
+from .prune import apply_channel_config
         
-transformations = transforms.Compose([
-    transforms.ToPILImage(),
-    transforms.Resize(448),
-    transforms.ToTensor(),
-    transforms.Normalize(
-        mean=[0.485, 0.456, 0.406],
-        std=[0.229, 0.224, 0.225]
-    )
-])
+def build_transformations(input_size=448):
+    """Input transform of L2CS-Net for a given network input size."""
+    return transforms.Compose([
+        transforms.ToPILImage(),
+        transforms.Resize(input_size),
+        transforms.ToTensor(),
+        transforms.Normalize(
+            mean=[0.485, 0.456, 0.406],
+            std=[0.229, 0.224, 0.225]
+        )
+    ])
+
+transformations = build_transformations(448)
 
 def atoi(text):
     return int(text) if text.isdigit() else text
@@ -37,16 +42,19 @@ def natural_keys(text):
     '''
     return [ atoi(c) for c in re.split(r'(\d+)', text) ]
 
-def prep_input_numpy(img:np.ndarray, device:str):
+def prep_input_numpy(img:np.ndarray, device:str, transform=None):
     """Preparing a Numpy Array as input to L2CS-Net."""
 
+    if transform is None:
+        transform = transformations
+
     if len(img.shape) == 4:
         imgs = []
         for im in img:
-            imgs.append(transformations(im))
+            imgs.append(transform(im))
         img = torch.stack(imgs)
     else:
-        img = transformations(img)
+        img = transform(img)
 
     img = img.to(device)
 
@@ -143,3 +151,15 @@ def getArch(arch,bins):
                 'The default value of ResNet50 will be used instead!')
         model = L2CS( torchvision.models.resnet.Bottleneck, [3, 4, 6,  3], bins)
     return model
+
+def load_checkpoint(weights, arch, bins, device='cpu'):
+    """Build an L2CS model from a plain or a pruned (see l2cs.prune) snapshot."""
+    snapshot = torch.load(weights, map_location=device)
+    if isinstance(snapshot, dict) and 'channel_cfg' in snapshot:
+        model = getArch(snapshot.get('arch', arch), bins)
+        apply_channel_config(model, snapshot['channel_cfg'])
+        snapshot = snapshot['state_dict']
+    else:
+        model = getArch(arch, bins)
+    model.load_state_dict(snapshot)
+    return model
@@ -0,0 +1,184 @@
+import json
+import math
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+@dataclass
+class GazeZone:
+    """Rectangular gaze zone in degrees (yaw horizontal, pitch vertical)."""
+
+    name: str
+    yaw: Tuple[float, float]
+    pitch: Tuple[float, float]
+
+
+# Default cabin layout for a left-hand-drive car and a camera facing the driver.
+# Zones listed first win where they overlap; re-measure them for each vehicle.
+DEFAULT_ZONES = [
+    GazeZone('road',         (-20.0, 20.0), (-10.0, 12.0)),
+    GazeZone('rear_mirror',  (15.0, 35.0),  (12.0, 30.0)),
+    GazeZone('left_mirror',  (-65.0, -30.0), (-10.0, 10.0)),
+    GazeZone('right_mirror', (40.0, 75.0),  (-10.0, 10.0)),
+    GazeZone('dashboard',    (-20.0, 15.0), (-35.0, -10.0)),
+    GazeZone('infotainment', (15.0, 45.0),  (-40.0, -10.0)),
+]
+
+OTHER_ZONE = 'other'
+
+
+class GazeZoneClassifier:
+    """O(1) pitch/yaw -> zone lookup through a precomputed 2-D table."""
+
+    def __init__(self, zones: Sequence[GazeZone] = DEFAULT_ZONES, resolution: float = 1.0,
+                 yaw_range: Tuple[float, float] = (-90.0, 90.0),
+                 pitch_range: Tuple[float, float] = (-90.0, 90.0)):
+        self.zones = list(zones)
+        self.names = [z.name for z in self.zones] + [OTHER_ZONE]
+        self.other = len(self.zones)
+        self.resolution = resolution
+        self.yaw_min, self.pitch_min = yaw_range[0], pitch_range[0]
+
+        n_yaw = int(math.ceil((yaw_range[1] - yaw_range[0]) / resolution)) + 1
+        n_pitch = int(math.ceil((pitch_range[1] - pitch_range[0]) / resolution)) + 1
+        self.table = np.full((n_pitch, n_yaw), self.other, dtype=np.int16)
+
+        # Paint in reverse so that zones listed first take precedence
+        yaw_centers = self.yaw_min + np.arange(n_yaw) * resolution
+        pitch_centers = self.pitch_min + np.arange(n_pitch) * resolution
+        for idx in reversed(range(len(self.zones))):
+            zone = self.zones[idx]
+            cols = (yaw_centers >= zone.yaw[0]) & (yaw_centers <= zone.yaw[1])
+            rows = (pitch_centers >= zone.pitch[0]) & (pitch_centers <= zone.pitch[1])
+            self.table[np.ix_(rows, cols)] = idx
+
+    @classmethod
+    def from_json(cls, path, **kwargs) -> 'GazeZoneClassifier':
+        """Load zones from `[{"name": ..., "yaw": [min, max], "pitch": [min, max]}, ...]`."""
+        with open(path, 'r', encoding='utf-8') as f:
+            zones = [GazeZone(z['name'], tuple(z['yaw']), tuple(z['pitch'])) for z in json.load(f)]
+        return cls(zones, **kwargs)
+
+    def index(self, pitch: float, yaw: float) -> int:
+        """Zone index of one gaze direction in degrees."""
+        row = int(round((pitch - self.pitch_min) / self.resolution))
+        col = int(round((yaw - self.yaw_min) / self.resolution))
+        if 0 <= row < self.table.shape[0] and 0 <= col < self.table.shape[1]:
+            return int(self.table[row, col])
+        return self.other
+
+    def classify(self, pitch: float, yaw: float) -> str:
+        return self.names[self.index(pitch, yaw)]
+
+    def classify_batch(self, pitch: np.ndarray, yaw: np.ndarray) -> np.ndarray:
+        """Vectorised `index` for arrays of directions in degrees."""
+        rows = np.rint((np.asarray(pitch) - self.pitch_min) / self.resolution).astype(np.int64)
+        cols = np.rint((np.asarray(yaw) - self.yaw_min) / self.resolution).astype(np.int64)
+        inside = (rows >= 0) & (rows < self.table.shape[0]) & (cols >= 0) & (cols < self.table.shape[1])
+        out = np.full(rows.shape, self.other, dtype=np.int16)
+        out[inside] = self.table[rows[inside], cols[inside]]
+        return out
+
+
+class SlidingWindowSums:
+    """Per-key sums over the last `window` seconds without keeping raw samples.
+
+    Time is split into fixed buckets held in a ring; adding a value touches
+    one bucket and the running totals, and expired buckets are subtracted
+    as time advances, so memory and update cost do not depend on the sample
+    rate. Totals are exact to within one bucket at the window edge.
+    """
+
+    def __init__(self, window: float, n_keys: int, bucket: float = 1.0):
+        self.window = window
+        self.bucket = bucket
+        self.n_buckets = max(1, int(math.ceil(window / bucket)))
+        self.buckets = np.zeros((self.n_buckets, n_keys))
+        self.totals = np.zeros(n_keys)
+        self.current = None        # absolute index of the newest bucket
+
+    def advance(self, t: float):
+        idx = int(t // self.bucket)
+        if self.current is None:
+            self.current = idx
+            return
+        if idx <= self.current:
+            return
+        steps = min(idx - self.current, self.n_buckets)
+        for k in range(1, steps + 1):
+            pos = (self.current + k) % self.n_buckets
+            self.totals -= self.buckets[pos]
+            self.buckets[pos] = 0.0
+        self.current = idx
+
+    def add(self, t: float, key: int, value: float):
+        self.advance(t)
+        self.buckets[self.current % self.n_buckets, key] += value
+        self.totals[key] += value
+
+    def reset(self):
+        self.buckets[:] = 0.0
+        self.totals[:] = 0.0
+        self.current = None
+
+
+class ZoneAttentionStats:
+    """Incremental per-zone dwell time and glance counts over sliding windows.
+
+    Feed one `update(t, zone_index)` per frame with timestamps in seconds.
+    The time between two samples is credited to the zone of the earlier one
+    (gaps longer than `max_gap` are ignored, e.g. when no face was found).
+    """
+
+    def __init__(self, zone_names: Sequence[str], windows: Sequence[float] = (10.0, 60.0),
+                 bucket: float = 0.5, max_gap: float = 2.0):
+        self.zone_names = list(zone_names)
+        self.max_gap = max_gap
+        n = len(self.zone_names)
+        self.dwell = {w: SlidingWindowSums(w, n, bucket) for w in windows}
+        self.glances = {w: SlidingWindowSums(w, n, bucket) for w in windows}
+
+        self.last_t = None
+        self.current_zone = None
+        self.glance_start = None
+
+    def update(self, t: float, zone: int):
+        if self.last_t is not None:
+            dt = t - self.last_t
+            if 0 < dt <= self.max_gap:
+                for sums in self.dwell.values():
+                    sums.add(t, self.current_zone, dt)
+            elif dt > self.max_gap:
+                self.current_zone = None   # tracking gap: the next sample starts a new glance
+
+        if zone != self.current_zone:
+            for sums in self.glances.values():
+                sums.add(t, zone, 1.0)
+            self.glance_start = t
+        self.current_zone = zone
+        self.last_t = t
+
+    def glance_duration(self) -> float:
+        """Length of the ongoing glance in seconds."""
+        if self.glance_start is None:
+            return 0.0
+        return self.last_t - self.glance_start
+
+    def summary(self, window: float, t: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+        """{zone: {'dwell': seconds, 'glances': count}} over the last `window` seconds."""
+        t = self.last_t if t is None else t
+        dwell, glances = self.dwell[window], self.glances[window]
+        if t is not None:
+            dwell.advance(t)
+            glances.advance(t)
+        return {
+            name: {'dwell': float(dwell.totals[i]), 'glances': int(round(glances.totals[i]))}
+            for i, name in enumerate(self.zone_names)
+        }
+
+    def reset(self):
+        for sums in list(self.dwell.values()) + list(self.glances.values()):
+            sums.reset()
+        self.last_t = self.current_zone = self.glance_start = None
@@ -0,0 +1,142 @@
+import json
+import pathlib
+import platform
+from dataclasses import dataclass, asdict, field
+from typing import Dict, List, Optional, Union
+
+from .utils import load_checkpoint
+from .evaluate import measure_latency
+
+
+@dataclass
+class ModelProfile:
+    """One L2CS checkpoint with its reference latency/accuracy profile."""
+
+    name: str
+    arch: str
+    weights: str                                # relative to the zoo directory
+    dataset: str = 'gaze360'
+    input_size: int = 448
+    precision: str = 'fp32'
+    cpu_latency_ms: Optional[float] = None      # reference CPU latency of one face crop
+    angular_error: Optional[float] = None       # mean angular error (degrees) on the test split
+
+
+@dataclass
+class ModelZoo:
+    """Registry of L2CS checkpoints stored as `zoo.json` next to the weights.
+
+    Besides the reference profile of every model, the registry keeps the
+    latencies measured on each machine (keyed by host name) by `calibrate`,
+    so one file can be shipped to every vehicle computer.
+    """
+
+    root: pathlib.Path
+    models: List[ModelProfile] = field(default_factory=list)
+    calibration: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    REGISTRY_FILE = 'zoo.json'
+
+    @classmethod
+    def load(cls, root: Union[str, pathlib.Path]) -> 'ModelZoo':
+        root = pathlib.Path(root)
+        registry = root / cls.REGISTRY_FILE
+        if not registry.exists():
+            return cls(root)
+
+        with open(registry, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls(
+            root,
+            models=[ModelProfile(**m) for m in data.get('models', [])],
+            calibration=data.get('calibration', {})
+        )
+
+    def save(self):
+        data = {
+            'models': [asdict(m) for m in self.models],
+            'calibration': self.calibration
+        }
+        with open(self.root / self.REGISTRY_FILE, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=4)
+
+    def get(self, name: str) -> ModelProfile:
+        for profile in self.models:
+            if profile.name == name:
+                return profile
+        raise KeyError(f'Unknown model: {name}')
+
+    def register(self, profile: ModelProfile):
+        """Add a model, replacing any existing entry with the same name."""
+        self.models = [m for m in self.models if m.name != profile.name]
+        self.models.append(profile)
+
+    def weights_path(self, profile: ModelProfile) -> pathlib.Path:
+        return self.root / profile.weights
+
+    def available(self, dataset: Optional[str] = None) -> List[ModelProfile]:
+        """Models whose weights are present on disk."""
+        return [m for m in self.models
+                if self.weights_path(m).exists() and (dataset is None or m.dataset == dataset)]
+
+    def latency(self, profile: ModelProfile, host: Optional[str] = None) -> Optional[float]:
+        """Latency measured on `host` (this machine by default), else the reference one."""
+        host = host or platform.node()
+        return self.calibration.get(host, {}).get(profile.name, profile.cpu_latency_ms)
+
+    def calibrate(self, names: Optional[List[str]] = None, device='cpu', runs: int = 20) -> Dict[str, float]:
+        """Quick on-device benchmark of the available models, stored under this host."""
+        host_results = self.calibration.setdefault(platform.node(), {})
+        for profile in self.available():
+            if names is not None and profile.name not in names:
+                continue
+            model = load_checkpoint(self.weights_path(profile), profile.arch, 90)
+            host_results[profile.name] = measure_latency(model, device, profile.input_size, runs=runs)
+            print(f'[zoo] {profile.name}: {host_results[profile.name]:.1f} ms')
+        return host_results
+
+    def select(self, budget_ms: float, dataset: str = 'gaze360', calibrate: bool = False) -> ModelProfile:
+        """Most accurate available model whose latency fits `budget_ms`.
+
+        Models without a known latency are calibrated first when `calibrate`
+        is set, and skipped otherwise. If nothing fits the budget, the fastest
+        model is returned.
+        """
+        candidates = self.available(dataset)
+        if not candidates:
+            raise FileNotFoundError(f'No {dataset} model weights found in {self.root}')
+
+        if calibrate:
+            host_results = self.calibration.get(platform.node(), {})
+            missing = [m.name for m in candidates if m.name not in host_results]
+            if missing:
+                self.calibrate(missing)
+
+        timed = [(self.latency(m), m) for m in candidates if self.latency(m) is not None]
+        if not timed:
+            return candidates[0]
+
+        fitting = [(lat, m) for lat, m in timed if lat <= budget_ms]
+        if not fitting:
+            return min(timed, key=lambda t: t[0])[1]
+
+        def accuracy_key(item):
+            lat, m = item
+            error = m.angular_error if m.angular_error is not None else float('inf')
+            return error, lat
+
+        return min(fitting, key=accuracy_key)[1]
+
+    def load_pipeline(self, profile: ModelProfile, device='cpu', **kwargs):
+        """Build a `Pipeline` for a registered model."""
+        from .pipeline import Pipeline
+
+        if profile.precision != 'fp32':
+            raise ValueError(f'Unsupported precision for {profile.name}: {profile.precision}')
+        return Pipeline(
+            weights=self.weights_path(profile),
+            arch=profile.arch,
+            device=device,
+            input_size=profile.input_size,
+            **kwargs
+        )
@@ -0,0 +1,73 @@
+import argparse
+import json
+import os
+
+from l2cs import ModelZoo, ModelProfile
+
+
+def parse_args():
+    """Parse input arguments."""
+    parser = argparse.ArgumentParser(description='Manage the registry of L2CS-Net checkpoints.')
+    parser.add_argument(
+        '--zoo', dest='zoo', help='Directory holding zoo.json and the weights.',
+        default='models', type=str)
+    sub = parser.add_subparsers(dest='command')
+
+    sub.add_parser('list', help='List registered models.')
+
+    calibrate = sub.add_parser('calibrate', help='Measure CPU latency of every available model on this machine.')
+    calibrate.add_argument('--runs', default=20, type=int)
+
+    select = sub.add_parser('select', help='Pick the most accurate model fitting a latency budget.')
+    select.add_argument('--budget', help='Per-frame latency budget (ms).', required=True, type=float)
+    select.add_argument('--dataset', default='gaze360', type=str)
+    select.add_argument('--calibrate', action='store_true')
+
+    register = sub.add_parser('register', help='Add a checkpoint to the registry.')
+    register.add_argument('--name', required=True, type=str)
+    register.add_argument('--arch', required=True, type=str)
+    register.add_argument('--weights', help='Weights file, relative to --zoo.', required=True, type=str)
+    register.add_argument('--dataset', default='gaze360', type=str)
+    register.add_argument('--input_size', default=448, type=int)
+    register.add_argument('--precision', default='fp32', type=str)
+    register.add_argument('--latency', dest='cpu_latency_ms', default=None, type=float)
+    register.add_argument('--error', dest='angular_error', default=None, type=float)
+    register.add_argument(
+        '--report', help='distill_report.json to take the student latency and error from.',
+        default='', type=str)
+
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    zoo = ModelZoo.load(args.zoo)
+
+    if args.command == 'calibrate':
+        zoo.calibrate(runs=args.runs)
+        zoo.save()
+
+    elif args.command == 'select':
+        profile = zoo.select(args.budget, args.dataset, calibrate=args.calibrate)
+        if args.calibrate:
+            zoo.save()
+        print(f'{profile.name} ({profile.arch}, {zoo.latency(profile)} ms, {profile.angular_error} deg)')
+
+    elif args.command == 'register':
+        latency, error = args.cpu_latency_ms, args.angular_error
+        if args.report:
+            with open(args.report) as f:
+                student = json.load(f)['student']
+            latency = latency if latency is not None else student['cpu_latency_ms']
+            error = error if error is not None else student['angular_error']
+        zoo.register(ModelProfile(
+            name=args.name, arch=args.arch, weights=args.weights, dataset=args.dataset,
+            input_size=args.input_size, precision=args.precision,
+            cpu_latency_ms=latency, angular_error=error))
+        zoo.save()
+
+    else:
+        for profile in zoo.models:
+            present = 'ok' if os.path.exists(zoo.weights_path(profile)) else 'missing'
+            print(f'{profile.name:32s} {profile.arch:10s} {profile.dataset:8s} {profile.input_size:4d} '
+                  f'{profile.precision:5s} {str(zoo.latency(profile)):>8s} ms {str(profile.angular_error):>6s} deg  [{present}]')
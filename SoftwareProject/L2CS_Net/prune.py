@@ -0,0 +1,173 @@
+import os
+import argparse
+import time
+import json
+
+import torch
+import torch.nn as nn
+from torch.utils.data import DataLoader
+from torchvision import transforms
+import torch.backends.cudnn as cudnn
+
+from l2cs import select_device, load_checkpoint, Gaze360, measure_latency, evaluate_angular_error, count_flops, count_params
+from l2cs.prune import prune_model, compute_sensitivity, save_pruned
+from train import gaze_loss, get_ignored_params, get_non_ignored_params, get_fc_params
+
+
+def parse_args():
+    """Parse input arguments."""
+    parser = argparse.ArgumentParser(description='Structured channel pruning of L2CS-Net.')
+    # Gaze360
+    parser.add_argument(
+        '--gaze360image_dir', dest='gaze360image_dir', help='Directory path for gaze images.',
+        default='datasets/Gaze360/Image', type=str)
+    parser.add_argument(
+        '--gaze360label_dir', dest='gaze360label_dir', help='Labels used for fine-tuning.',
+        default='datasets/Gaze360/Label/train.label', type=str)
+    parser.add_argument(
+        '--gaze360testlabel_dir', dest='gaze360testlabel_dir', help='Labels used for the angular error report.',
+        default='datasets/Gaze360/Label/test.label', type=str)
+
+    parser.add_argument(
+        '--snapshot', dest='snapshot', help='Path of the model snapshot to prune.',
+        default='models/L2CSNet_gaze360.pkl', type=str)
+    parser.add_argument(
+        '--arch', dest='arch', help='Network architecture of the snapshot.',
+        default='ResNet50', type=str)
+    parser.add_argument(
+        '--output', dest='output', help='Path of output models.',
+        default='output/pruned/', type=str)
+    parser.add_argument(
+        '--ratios', dest='ratios', help='Comma separated fractions of inner channels to remove.',
+        default='0.25,0.5', type=str)
+    parser.add_argument(
+        '--method', dest='method', help='Channel ranking: magnitude or sensitivity.',
+        default='magnitude', type=str)
+    parser.add_argument(
+        '--sensitivity_batches', dest='sensitivity_batches', help='Batches used to estimate sensitivity.',
+        default=20, type=int)
+    parser.add_argument(
+        '--finetune_epochs', dest='finetune_epochs', help='Fine-tuning epochs after each pruning step.',
+        default=3, type=int)
+    parser.add_argument(
+        '--gpu', dest='gpu_id', help='GPU device id to use [0]',
+        default='0', type=str)
+    parser.add_argument(
+        '--batch_size', dest='batch_size', help='Batch size.',
+        default=16, type=int)
+    parser.add_argument(
+        '--alpha', dest='alpha', help='Regression loss coefficient.',
+        default=1, type=float)
+    parser.add_argument(
+        '--lr', dest='lr', help='Base learning rate.',
+        default=0.00001, type=float)
+    args = parser.parse_args()
+    return args
+
+
+def profile_model(model, test_loader, gpu):
+    """FLOPs, parameters, CPU latency and angular error of one model."""
+    stats = {
+        'flops': count_flops(model.to(gpu)),
+        'params': count_params(model),
+        'angular_error': float(evaluate_angular_error(model, test_loader, gpu)),
+        'cpu_latency_ms': measure_latency(model, 'cpu'),
+    }
+    model.to(gpu)
+    return stats
+
+
+def finetune(model, train_loader, gpu, args):
+    """A few epochs of the regular train.py gaze360 loss on the pruned network."""
+    criterion = nn.CrossEntropyLoss().to(gpu)
+    reg_criterion = nn.MSELoss().to(gpu)
+    softmax = nn.Softmax(dim=1).to(gpu)
+    idx_tensor = torch.FloatTensor([idx for idx in range(90)]).to(gpu)
+
+    model.train()
+    optimizer_gaze = torch.optim.Adam([
+        {'params': get_ignored_params(model), 'lr': 0},
+        {'params': get_non_ignored_params(model), 'lr': args.lr},
+        {'params': get_fc_params(model), 'lr': args.lr}
+    ], args.lr)
+
+    for epoch in range(args.finetune_epochs):
+        sum_loss = iter_gaze = 0
+        for i, (images_gaze, labels_gaze, cont_labels_gaze, name) in enumerate(train_loader):
+            pitch, yaw = model(images_gaze.to(gpu))
+            loss_pitch_gaze, loss_yaw_gaze = gaze_loss(
+                pitch, yaw, labels_gaze.to(gpu), cont_labels_gaze.to(gpu),
+                criterion, reg_criterion, softmax, idx_tensor, args.alpha)
+
+            optimizer_gaze.zero_grad(set_to_none=True)
+            (loss_pitch_gaze + loss_yaw_gaze).backward()
+            optimizer_gaze.step()
+
+            sum_loss += float(loss_pitch_gaze + loss_yaw_gaze)
+            iter_gaze += 1
+        print('Fine-tune epoch [%d/%d] loss %.4f' % (epoch + 1, args.finetune_epochs, sum_loss / max(iter_gaze, 1)))
+
+
+if __name__ == '__main__':
+    args = parse_args()
+    cudnn.enabled = True
+    gpu = select_device(args.gpu_id, batch_size=args.batch_size)
+    ratios = [float(r) for r in args.ratios.split(',')]
+
+    transformations = transforms.Compose([
+        transforms.Resize(448),
+        transforms.ToTensor(),
+        transforms.Normalize(
+            mean=[0.485, 0.456, 0.406],
+            std=[0.229, 0.224, 0.225]
+        )
+    ])
+
+    train_loader = DataLoader(
+        dataset=Gaze360(args.gaze360label_dir, args.gaze360image_dir, transformations, 180, 4),
+        batch_size=args.batch_size, shuffle=True, num_workers=0, pin_memory=True)
+    test_loader = DataLoader(
+        dataset=Gaze360(args.gaze360testlabel_dir, args.gaze360image_dir, transformations, 180, 4, train=False),
+        batch_size=args.batch_size, shuffle=False, num_workers=0)
+
+    output = os.path.join(args.output, '{}_{}_{}'.format('L2CS-pruned', args.method, int(time.time())))
+    if not os.path.exists(output):
+        os.makedirs(output)
+
+    criterion = nn.CrossEntropyLoss().to(gpu)
+    reg_criterion = nn.MSELoss().to(gpu)
+    softmax = nn.Softmax(dim=1).to(gpu)
+    idx_tensor = torch.FloatTensor([idx for idx in range(90)]).to(gpu)
+
+    def sensitivity_loss(model, batch):
+        images_gaze, labels_gaze, cont_labels_gaze, name = batch
+        pitch, yaw = model(images_gaze.to(gpu))
+        loss_pitch_gaze, loss_yaw_gaze = gaze_loss(
+            pitch, yaw, labels_gaze.to(gpu), cont_labels_gaze.to(gpu),
+            criterion, reg_criterion, softmax, idx_tensor, args.alpha)
+        return loss_pitch_gaze + loss_yaw_gaze
+
+    base = load_checkpoint(args.snapshot, args.arch, 90).to(gpu)
+    report = {'arch': args.arch, 'method': args.method, 'results': []}
+    base_stats = profile_model(base, test_loader, gpu)
+    report['results'].append(dict(ratio=0.0, weights=args.snapshot, **base_stats))
+    print('ratio 0.00: {flops:,} MACs, {params:,} params, {cpu_latency_ms:.1f} ms, {angular_error:.2f} deg'.format(**base_stats))
+
+    sensitivity = None
+    if args.method == 'sensitivity':
+        sensitivity = compute_sensitivity(base, train_loader, sensitivity_loss, gpu, args.sensitivity_batches)
+
+    for ratio in ratios:
+        model = load_checkpoint(args.snapshot, args.arch, 90).to(gpu)
+        channel_cfg = prune_model(model, ratio, args.method, sensitivity)
+        finetune(model, train_loader, gpu, args)
+
+        weights = os.path.join(output, 'pruned_{:.2f}.pkl'.format(ratio))
+        save_pruned(model, channel_cfg, args.arch, weights)
+
+        stats = profile_model(model, test_loader, gpu)
+        report['results'].append(dict(ratio=ratio, weights=weights, **stats))
+        print('ratio {:.2f}: {flops:,} MACs, {params:,} params, {cpu_latency_ms:.1f} ms, {angular_error:.2f} deg'.format(ratio, **stats))
+
+    with open(os.path.join(output, 'prune_report.json'), 'w') as f:
+        json.dump(report, f, indent=4)
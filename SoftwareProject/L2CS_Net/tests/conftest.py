@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Import the in-tree l2cs package rather than an installed copy
+L2CS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if L2CS_DIR not in sys.path:
+    sys.path.insert(0, L2CS_DIR)
@@ -0,0 +1,64 @@
+import pytest
+
+from l2cs.alerts import AttentionAlertEngine
+
+
+def stream(pattern, hz=10):
+    """(t, off_road) samples at `hz` for a list of (seconds, off_road) segments."""
+    samples, t = [], 0.0
+    for seconds, off_road in pattern:
+        for _ in range(int(round(seconds * hz))):
+            samples.append((round(t, 6), off_road))
+            t += 1.0 / hz
+    return samples
+
+
+def test_long_glance_alert():
+    events = AttentionAlertEngine().replay(stream([(1.0, False), (5.0, True)]))
+    assert len(events) == 1
+    event = events[0]
+    assert event.reason == 'glance'
+    assert event.t == pytest.approx(3.0)
+    assert event.glance == pytest.approx(2.0)
+    assert event.off_road_time == pytest.approx(2.0)
+
+
+def test_window_alert_from_short_glances():
+    # 1.5 s off / 0.5 s on: no single glance is too long, but the window fills up
+    events = AttentionAlertEngine().replay(stream([(1.5, True), (0.5, False)] * 10))
+    assert len(events) == 1
+    event = events[0]
+    assert event.reason == 'window'
+    assert event.t == pytest.approx(5.0)
+    assert event.off_road_time == pytest.approx(4.0)
+    assert event.longest_glance == pytest.approx(1.5)
+
+
+def test_rearm_and_cooldown():
+    engine = AttentionAlertEngine(off_road_threshold=100.0)
+    # Looking back for 0.5 s does not rearm the alert
+    events = engine.replay(stream([(1.0, False), (3.0, True), (0.5, False), (3.0, True)]))
+    assert [e.t for e in events] == [pytest.approx(3.0)]
+
+    # 1.5 s on the road rearms it, the next alert waits for the 5 s cooldown
+    engine.reset_state()
+    events = engine.replay(stream([(1.0, False), (3.0, True), (1.5, False), (4.0, True)]))
+    assert [e.t for e in events] == [pytest.approx(3.0), pytest.approx(8.0)]
+    assert events[1].glance == pytest.approx(2.5)
+
+
+def test_tracking_gap_closes_glance():
+    engine = AttentionAlertEngine()
+    samples = [(i / 10, True) for i in range(16)] + [(4.0 + i / 10, True) for i in range(40)]
+    events = engine.replay(samples)
+    # The glance restarts after the 2.5 s gap, nothing is credited for the gap itself
+    assert [e.t for e in events] == [pytest.approx(6.0)]
+    assert events[0].off_road_time == pytest.approx(3.5)
+
+
+def test_replay_is_deterministic():
+    pattern = [(0.7, False), (2.4, True), (1.3, False), (1.6, True), (0.2, False), (1.9, True)] * 20
+    first = AttentionAlertEngine().replay(stream(pattern))
+    second = AttentionAlertEngine().replay(stream(pattern))
+    assert first
+    assert first == second
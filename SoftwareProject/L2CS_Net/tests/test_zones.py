@@ -0,0 +1,72 @@
+import json
+
+import numpy as np
+import pytest
+
+from l2cs.zones import DEFAULT_ZONES, GazeZone, GazeZoneClassifier, SlidingWindowSums, ZoneAttentionStats
+
+
+def test_classify_default_zones():
+    classifier = GazeZoneClassifier()
+    assert classifier.classify(0.0, 0.0) == 'road'
+    assert classifier.classify(0.0, -50.0) == 'left_mirror'
+    assert classifier.classify(-20.0, 30.0) == 'infotainment'
+    assert classifier.classify(60.0, 0.0) == 'other'
+    assert classifier.classify(0.0, 120.0) == 'other'
+    # road and dashboard share pitch -10; the zone listed first wins
+    assert classifier.classify(-10.0, 0.0) == 'road'
+
+
+def test_classify_batch_matches_classify():
+    classifier = GazeZoneClassifier()
+    rng = np.random.default_rng(0)
+    pitch = rng.uniform(-100.0, 100.0, 500)
+    yaw = rng.uniform(-100.0, 100.0, 500)
+    batch = classifier.classify_batch(pitch, yaw)
+    assert batch.tolist() == [classifier.index(p, y) for p, y in zip(pitch, yaw)]
+
+
+def test_from_json(tmp_path):
+    path = tmp_path / "zones.json"
+    path.write_text(json.dumps([{"name": "road", "yaw": [-10, 10], "pitch": [-5, 5]}]), encoding='utf-8')
+    classifier = GazeZoneClassifier.from_json(str(path), resolution=0.5)
+    assert classifier.zones == [GazeZone('road', (-10, 10), (-5, 5))]
+    assert classifier.classify(0.0, 0.0) == 'road'
+    assert classifier.classify(0.0, 15.0) == 'other'
+
+
+def test_sliding_window_sums_expire():
+    sums = SlidingWindowSums(10.0, 2, bucket=1.0)
+    sums.add(0.0, 0, 1.0)
+    sums.add(5.0, 0, 2.0)
+    sums.add(5.5, 1, 4.0)
+    assert sums.totals.tolist() == [3.0, 4.0]
+    sums.advance(10.5)
+    assert sums.totals.tolist() == [2.0, 4.0]
+    # Going back in time changes nothing
+    sums.advance(3.0)
+    assert sums.totals.tolist() == [2.0, 4.0]
+    sums.advance(100.0)
+    assert sums.totals.tolist() == [0.0, 0.0]
+
+
+def test_zone_attention_stats():
+    names = [z.name for z in DEFAULT_ZONES] + ['other']
+    road, left = names.index('road'), names.index('left_mirror')
+    stats = ZoneAttentionStats(names, windows=(10.0,), bucket=0.5)
+
+    # 2 s road, 1 s left mirror, 1 s road at 10 Hz
+    zones = [road] * 20 + [left] * 10 + [road] * 10
+    for i, zone in enumerate(zones):
+        stats.update(i / 10, zone)
+    summary = stats.summary(10.0)
+    assert summary['road']['dwell'] == pytest.approx(2.9)
+    assert summary['left_mirror']['dwell'] == pytest.approx(1.0)
+    assert summary['road']['glances'] == 2
+    assert summary['left_mirror']['glances'] == 1
+    assert stats.glance_duration() == pytest.approx(0.9)
+
+    # A tracking gap ends the glance: the same zone counts as a new glance
+    stats.update(6.0, road)
+    assert stats.summary(10.0)['road']['glances'] == 3
+    assert stats.glance_duration() == 0.0
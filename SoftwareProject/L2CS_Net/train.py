@@ -1,17 +1,19 @@
 import os
 import argparse
 import time
+import json
 
 import torch.utils.model_zoo as model_zoo
 import torch
 import torch.nn as nn
+import torch.nn.functional as F
 from torch.autograd import Variable
 from torch.utils.data import DataLoader
 from torchvision import transforms
 import torch.backends.cudnn as cudnn
 import torchvision
 
-from l2cs import L2CS, select_device, Gaze360, Mpiigaze
+from l2cs import L2CS, select_device, getArch, Gaze360, Mpiigaze, measure_latency, evaluate_angular_error
 
 
 def parse_args():
@@ -61,6 +63,25 @@ def parse_args():
     parser.add_argument(
         '--lr', dest='lr', help='Base learning rate.',
         default=0.00001, type=float)
+    # Knowledge distillation (gaze360 only)
+    parser.add_argument(
+        '--distill', dest='distill', help='Train --arch as a student of the --teacher snapshot.',
+        action='store_true')
+    parser.add_argument(
+        '--teacher', dest='teacher', help='Path of the teacher model snapshot.',
+        default='models/L2CSNet_gaze360.pkl', type=str)
+    parser.add_argument(
+        '--teacher_arch', dest='teacher_arch', help='Network architecture of the teacher.',
+        default='ResNet50', type=str)
+    parser.add_argument(
+        '--temperature', dest='temperature', help='Softening temperature of the bin logits.',
+        default=4.0, type=float)
+    parser.add_argument(
+        '--beta', dest='beta', help='Distillation loss coefficient.',
+        default=1.0, type=float)
+    parser.add_argument(
+        '--gaze360testlabel_dir', dest='gaze360testlabel_dir', help='Gaze360 labels used for the distillation report.',
+        default='datasets/Gaze360/Label/test.label', type=str)
     # ---------------------------------------------------------------------------------------------------------------------
     # Important args ------------------------------------------------------------------------------------------------------
     args = parser.parse_args()
@@ -102,6 +123,69 @@ def load_filtered_state_dict(model, snapshot):
     model.load_state_dict(model_dict)
 
 
+def gaze_loss(pitch, yaw, labels_gaze, cont_labels_gaze, criterion, reg_criterion, softmax, idx_tensor,
+              alpha, binwidth=4, angle=180):
+    # Combined classification + regression loss over the pitch/yaw bins.
+    label_pitch_gaze = labels_gaze[:, 0]
+    label_yaw_gaze = labels_gaze[:, 1]
+    label_pitch_cont_gaze = cont_labels_gaze[:, 0]
+    label_yaw_cont_gaze = cont_labels_gaze[:, 1]
+
+    # Cross entropy loss
+    loss_pitch_gaze = criterion(pitch, label_pitch_gaze)
+    loss_yaw_gaze = criterion(yaw, label_yaw_gaze)
+
+    # MSE loss
+    pitch_predicted = torch.sum(softmax(pitch) * idx_tensor, 1) * binwidth - angle
+    yaw_predicted = torch.sum(softmax(yaw) * idx_tensor, 1) * binwidth - angle
+
+    loss_reg_pitch = reg_criterion(pitch_predicted, label_pitch_cont_gaze)
+    loss_reg_yaw = reg_criterion(yaw_predicted, label_yaw_cont_gaze)
+
+    # Total loss
+    return loss_pitch_gaze + alpha * loss_reg_pitch, loss_yaw_gaze + alpha * loss_reg_yaw
+
+
+def distillation_loss(student_logits, teacher_logits, temperature):
+    # Hinton et al. soft-target loss, scaled by T^2 to keep gradients comparable to the hard loss.
+    return F.kl_div(
+        F.log_softmax(student_logits / temperature, dim=1),
+        F.softmax(teacher_logits / temperature, dim=1),
+        reduction='batchmean') * temperature ** 2
+
+
+def load_teacher(arch, snapshot, bins, gpu):
+    teacher = getArch(arch, bins)
+    teacher.load_state_dict(torch.load(snapshot, map_location='cpu'))
+    teacher.to(gpu)
+    teacher.eval()
+    for param in teacher.parameters():
+        param.requires_grad = False
+    return teacher
+
+
+def distill_report(teacher, student, args, gpu, transformations, output):
+    # Latency (CPU, one face crop) vs angular error on the test split, teacher against student.
+    dataset = Gaze360(args.gaze360testlabel_dir, args.gaze360image_dir, transformations, 180, 4, train=False)
+    test_loader = DataLoader(dataset=dataset, batch_size=int(args.batch_size), shuffle=False, num_workers=0)
+
+    report = {}
+    for name, arch, model in [('teacher', args.teacher_arch, teacher), ('student', args.arch, student)]:
+        report[name] = {
+            'arch': arch,
+            'angular_error': float(evaluate_angular_error(model, test_loader, gpu)),
+            'cpu_latency_ms': measure_latency(model, 'cpu'),
+        }
+        model.to(gpu)
+    report['speedup'] = report['teacher']['cpu_latency_ms'] / report['student']['cpu_latency_ms']
+
+    with open(os.path.join(output, 'distill_report.json'), 'w') as f:
+        json.dump(report, f, indent=4)
+    print('Distillation report: teacher {arch} {angular_error:.2f} deg / {cpu_latency_ms:.1f} ms'.format(**report['teacher']))
+    print('                     student {arch} {angular_error:.2f} deg / {cpu_latency_ms:.1f} ms'.format(**report['student']))
+    return report
+
+
 def getArch_weights(arch, bins):
     if arch == 'ResNet18':
         model = L2CS(torchvision.models.resnet.BasicBlock, [2, 2, 2, 2], bins)
@@ -156,6 +240,12 @@ if __name__ == '__main__':
         
         
         model.cuda(gpu)
+
+        teacher = None
+        if args.distill:
+            print('Loading teacher {} from {}.'.format(args.teacher_arch, args.teacher))
+            teacher = load_teacher(args.teacher_arch, args.teacher, 90, gpu)
+
         dataset=Gaze360(args.gaze360label_dir, args.gaze360image_dir, transformations, 180, 4)
         print('Loading data.')
         train_loader_gaze = DataLoader(
@@ -166,7 +256,7 @@ if __name__ == '__main__':
             pin_memory=True)
         torch.backends.cudnn.benchmark = True
 
-        summary_name = '{}_{}'.format('L2CS-gaze360-', int(time.time()))
+        summary_name = '{}_{}'.format('L2CS-gaze360-distill-' + args.arch if args.distill else 'L2CS-gaze360-', int(time.time()))
         output=os.path.join(output, summary_name)
         if not os.path.exists(output):
             os.makedirs(output)
@@ -196,37 +286,23 @@ if __name__ == '__main__':
             for i, (images_gaze, labels_gaze, cont_labels_gaze,name) in enumerate(train_loader_gaze):
                 images_gaze = Variable(images_gaze).cuda(gpu)
                 
-                # Binned labels
-                label_pitch_gaze = Variable(labels_gaze[:, 0]).cuda(gpu)
-                label_yaw_gaze = Variable(labels_gaze[:, 1]).cuda(gpu)
-
-                # Continuous labels
-                label_pitch_cont_gaze = Variable(cont_labels_gaze[:, 0]).cuda(gpu)
-                label_yaw_cont_gaze = Variable(cont_labels_gaze[:, 1]).cuda(gpu)
+                # Binned and continuous labels
+                labels_gaze = Variable(labels_gaze).cuda(gpu)
+                cont_labels_gaze = Variable(cont_labels_gaze).cuda(gpu)
 
                 pitch, yaw = model(images_gaze)
 
-                # Cross entropy loss
-                loss_pitch_gaze = criterion(pitch, label_pitch_gaze)
-                loss_yaw_gaze = criterion(yaw, label_yaw_gaze)
-
-                # MSE loss
-                pitch_predicted = softmax(pitch)
-                yaw_predicted = softmax(yaw)
+                # Cross entropy + MSE loss
+                loss_pitch_gaze, loss_yaw_gaze = gaze_loss(
+                    pitch, yaw, labels_gaze, cont_labels_gaze,
+                    criterion, reg_criterion, softmax, idx_tensor, alpha)
 
-                pitch_predicted = \
-                    torch.sum(pitch_predicted * idx_tensor, 1) * 4 - 180
-                yaw_predicted = \
-                    torch.sum(yaw_predicted * idx_tensor, 1) * 4 - 180
-
-                loss_reg_pitch = reg_criterion(
-                    pitch_predicted, label_pitch_cont_gaze)
-                loss_reg_yaw = reg_criterion(
-                    yaw_predicted, label_yaw_cont_gaze)
-
-                # Total loss
-                loss_pitch_gaze += alpha * loss_reg_pitch
-                loss_yaw_gaze += alpha * loss_reg_yaw
+                # Distillation loss against the teacher's bin logits
+                if teacher is not None:
+                    with torch.no_grad():
+                        teacher_pitch, teacher_yaw = teacher(images_gaze)
+                    loss_pitch_gaze += args.beta * distillation_loss(pitch, teacher_pitch, args.temperature)
+                    loss_yaw_gaze += args.beta * distillation_loss(yaw, teacher_yaw, args.temperature)
 
                 sum_loss_pitch_gaze += loss_pitch_gaze
                 sum_loss_yaw_gaze += loss_yaw_gaze
@@ -259,6 +335,9 @@ if __name__ == '__main__':
                                 output +'/'+
                                 '_epoch_' + str(epoch+1) + '.pkl')
                     )
+
+        if teacher is not None:
+            distill_report(teacher, model, args, gpu, transformations, output)
             
 
    
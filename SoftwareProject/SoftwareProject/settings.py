@@ -159,3 +159,11 @@ STATICFILES_DIRS = [
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# 视线模型选择：单帧延迟预算 (ms)，以及启动时是否在本机现场标定模型库延迟
+GAZE_LATENCY_BUDGET_MS = 100
+GAZE_CALIBRATE = False
+
+# 集成演示状态推送地址（与 integrated_demo/core/state_stream.py 的默认值一致）
+INTEGRATED_STATE_HOST = '127.0.0.1'
+INTEGRATED_STATE_PORT = 8765
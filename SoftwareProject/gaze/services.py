@@ -30,21 +30,31 @@ if str(L2CS_PATH) not in sys.path:
 # ────────────────────────────
 _PIPELINE = None           # type: ignore
 _DEVICE   = None
-_WEIGHTS  = L2CS_PATH / "models" / "L2CSNet_gaze360.pkl"   # ← 换成你的权重
+_ZOO_DIR  = L2CS_PATH / "models"                            # zoo.json + 权重
+_DEFAULT_BUDGET_MS = 100.0                                  # 单帧延迟预算 (ms)
 
 # ────────────────────────────
 # 3. 内部：加载 Pipeline
 # ────────────────────────────
 def _load_pipeline():
+    """按延迟预算从模型库中选择最精确的模型
+    预算/是否现场标定可在 settings 中用 GAZE_LATENCY_BUDGET_MS / GAZE_CALIBRATE 配置"""
     global _PIPELINE, _DEVICE
     import torch
-    from l2cs import select_device, Pipeline
+    from django.conf import settings
+    from l2cs import select_device, ModelZoo
+
+    budget = getattr(settings, "GAZE_LATENCY_BUDGET_MS", _DEFAULT_BUDGET_MS)
+    calibrate = getattr(settings, "GAZE_CALIBRATE", False)
 
     _DEVICE = select_device("cpu", batch_size=1)           # "cuda:0" 可用 GPU
-    print(f"[gaze] loading weights from {_WEIGHTS}")
-    _PIPELINE = Pipeline(weights=_WEIGHTS,
-                         arch="ResNet50",
-                         device=_DEVICE)
+    zoo = ModelZoo.load(_ZOO_DIR)
+    profile = zoo.select(budget, calibrate=calibrate)
+    if calibrate:
+        zoo.save()                                          # 缓存本机标定结果
+    print(f"[gaze] selected {profile.name} ({profile.arch}, "
+          f"{zoo.latency(profile)} ms, budget {budget} ms)")
+    _PIPELINE = zoo.load_pipeline(profile, device=_DEVICE)
     print(f"[gaze] Pipeline loaded ({_DEVICE})")
 
 # ────────────────────────────
@@ -87,7 +97,11 @@ def run_demo_camera():
                 hwnd, "视线识别"
             )
 
-        cap = cv2.VideoCapture(0, cv2.CAP_DSHOW)
+        # 摄像头服务 (integrated_demo/camera_service.py) 运行时从共享内存读取，
+        # 可与集成演示同时使用同一摄像头；通过 integrated_demo 包导入，
+        # 避免与其他名为 core 的包冲突（BASE_DIR 即 manage.py 所在目录，已在 sys.path 中）
+        from integrated_demo.core.frame_bus import open_capture
+        cap = open_capture(0, cv2.CAP_DSHOW)
         if not cap.isOpened():
             print("[demo] ❌ 无法打开摄像头"); return
 
@@ -0,0 +1,173 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+回归与性能测试：回放固定的测试视频，统计各阶段耗时和整体帧率，
+并把输出的事件时间线与基准文件（golden）比较
+
+用法:
+    python benchmark.py                          # 使用 benchmarks/manifest.json 中的视频
+    python benchmark.py --update-golden          # 认可当前结果，更新基准文件
+    python benchmark.py clip1.mp4 --report out.json
+"""
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+
+from core.engine import DetectionConfig
+from core.profiling import StageTimer
+from replay import replay_video, json_default
+
+BENCHMARK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="集成演示检测流水线的回归与性能测试")
+    parser.add_argument("clips", nargs="*", help="测试视频，未指定时读取清单文件")
+    parser.add_argument("--manifest", default=os.path.join(BENCHMARK_DIR, "manifest.json"),
+                        help="测试清单：视频列表、检测配置和分析间隔")
+    parser.add_argument("--golden-dir", default=os.path.join(BENCHMARK_DIR, "golden"),
+                        help="基准事件文件目录，每个视频一个 <视频名>.jsonl")
+    parser.add_argument("--report", default="benchmark_report.json", help="测试报告输出路径")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="事件时间允许的偏差（秒）")
+    parser.add_argument("--update-golden", action="store_true", help="用本次结果覆盖基准文件")
+    return parser.parse_args()
+
+
+def load_manifest(path):
+    """读取测试清单，视频路径相对清单文件所在目录"""
+    if not os.path.exists(path):
+        return {'clips': [], 'config': {}, 'stride': 1}
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    manifest['clips'] = [os.path.join(base, clip) for clip in manifest.get('clips', [])]
+    return manifest
+
+
+def golden_path(golden_dir, clip):
+    return os.path.join(golden_dir, os.path.splitext(os.path.basename(clip))[0] + ".jsonl")
+
+
+def load_events(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def save_events(path, events):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        for record in events:
+            f.write(json.dumps(record, ensure_ascii=False, default=json_default) + "\n")
+
+
+def diff_events(golden, events, tolerance):
+    """按事件类型逐个匹配时间线，时间差在 tolerance 秒以内视为同一事件
+
+    返回 {matched, missing, extra, max_shift}，missing 为基准中有而本次没有的事件，
+    extra 为本次多出的事件。
+    """
+    matched, missing, extra = 0, [], []
+    max_shift = 0.0
+    for event_type in sorted({e['event_type'] for e in golden} | {e['event_type'] for e in events}):
+        expected = sorted(e['timestamp'] for e in golden if e['event_type'] == event_type)
+        actual = sorted(e['timestamp'] for e in events if e['event_type'] == event_type)
+        i = j = 0
+        while i < len(expected) and j < len(actual):
+            shift = actual[j] - expected[i]
+            if abs(shift) <= tolerance:
+                matched += 1
+                max_shift = max(max_shift, abs(shift))
+                i += 1
+                j += 1
+            elif shift < 0:
+                extra.append({'event_type': event_type, 'timestamp': actual[j]})
+                j += 1
+            else:
+                missing.append({'event_type': event_type, 'timestamp': expected[i]})
+                i += 1
+        missing.extend({'event_type': event_type, 'timestamp': t} for t in expected[i:])
+        extra.extend({'event_type': event_type, 'timestamp': t} for t in actual[j:])
+    return {'matched': matched, 'missing': missing, 'extra': extra, 'max_shift': max_shift}
+
+
+def run_clip(clip, config, stride, args):
+    """回放一个测试视频，返回该视频的报告"""
+    timer = StageTimer()
+    events, stats = replay_video(clip, config, stride, timer=timer, draw=True)
+    entry = dict(stats)
+    entry['stages'] = timer.summary()
+
+    golden_file = golden_path(args.golden_dir, clip)
+    if args.update_golden:
+        save_events(golden_file, events)
+        entry['golden'] = 'updated'
+    elif os.path.exists(golden_file):
+        entry['diff'] = diff_events(load_events(golden_file), events, args.tolerance)
+        entry['golden'] = 'passed' if not (entry['diff']['missing'] or entry['diff']['extra']) else 'failed'
+    else:
+        entry['golden'] = 'missing'
+    return entry
+
+
+def print_clip(entry):
+    print(f"\n{os.path.basename(entry['video'])}: {entry['analyzed_frames']}帧, "
+          f"{entry['fps']:.1f} FPS, 实时倍速 {entry['realtime_factor']:.2f}x, 基准: {entry['golden']}")
+    for name, s in sorted(entry['stages'].items()):
+        print(f"  {name:<16} 平均 {s['mean_ms']:7.2f}ms  p95 {s['p95_ms']:7.2f}ms  ({s['count']}次)")
+    if 'diff' in entry:
+        diff = entry['diff']
+        print(f"  事件: 匹配 {diff['matched']}, 缺失 {len(diff['missing'])}, "
+              f"多出 {len(diff['extra'])}, 最大时间偏差 {diff['max_shift']:.2f}s")
+
+
+def main():
+    args = parse_args()
+    manifest = load_manifest(args.manifest)
+    clips = args.clips or manifest['clips']
+    if not clips:
+        print(f"没有测试视频，请在 {args.manifest} 中配置或在命令行指定")
+        return 2
+
+    config = DetectionConfig.from_dict(manifest.get('config', {}))
+    stride = manifest.get('stride', 1)
+
+    report = {
+        'timestamp': datetime.datetime.now().isoformat(),
+        'host': platform.node(),
+        'platform': platform.platform(),
+        'config': config.to_dict(),
+        'stride': stride,
+        'tolerance': args.tolerance,
+        'clips': [],
+    }
+    for clip in clips:
+        entry = run_clip(clip, config, stride, args)
+        print_clip(entry)
+        report['clips'].append(entry)
+
+    total_frames = sum(c['analyzed_frames'] for c in report['clips'])
+    total_elapsed = sum(c['elapsed'] for c in report['clips'])
+    total_video = sum(c['video_seconds'] for c in report['clips'])
+    report['summary'] = {
+        'frames': total_frames,
+        'fps': total_frames / total_elapsed if total_elapsed > 0 else 0.0,
+        'realtime_factor': total_video / total_elapsed if total_elapsed > 0 else 0.0,
+        'golden_failed': [c['video'] for c in report['clips'] if c['golden'] == 'failed'],
+    }
+    report['passed'] = not report['summary']['golden_failed']
+
+    with open(args.report, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4, ensure_ascii=False, default=json_default)
+    print(f"\n合计 {total_frames}帧, {report['summary']['fps']:.1f} FPS, "
+          f"实时倍速 {report['summary']['realtime_factor']:.2f}x, 报告: {args.report}")
+    return 0 if report['passed'] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+摄像头服务：独占摄像头，把每一帧写入共享内存帧总线（core/frame_bus.py）
+
+服务运行时，集成演示、视线识别等程序打开摄像头时会自动改为从帧总线读取，
+可以同时运行且只采集一次。
+
+用法:
+    python camera_service.py --device 0 --width 640
+"""
+
+import argparse
+import sys
+import time
+
+import cv2
+
+from core.frame_bus import DEFAULT_BUS_NAME, DEFAULT_SLOTS, FrameBusWriter
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="摄像头服务：把摄像头画面发布到共享内存帧总线")
+    parser.add_argument("--device", type=int, default=0, help="摄像头编号")
+    parser.add_argument("--width", type=int, default=640, help="发布的图像宽度，高度按比例缩放")
+    parser.add_argument("--name", default=DEFAULT_BUS_NAME, help="共享内存名称")
+    parser.add_argument("--slots", type=int, default=DEFAULT_SLOTS, help="环形缓冲槽数")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    cap = cv2.VideoCapture(args.device)
+    ok, frame = cap.read()
+    if not ok:
+        print(f"无法打开摄像头 {args.device}")
+        return 1
+
+    # 按第一帧的比例确定总线图像尺寸，之后直接缩放到共享内存中
+    height, width = frame.shape[:2]
+    if args.width and args.width != width:
+        height, width = int(round(height * args.width / float(width))), args.width
+    try:
+        bus = FrameBusWriter(args.name, (height, width) + frame.shape[2:], args.slots)
+    except FileExistsError as e:
+        print(f"无法创建帧总线: {e}")
+        cap.release()
+        return 1
+    print(f"摄像头服务已启动: {args.name} {width}x{height}，Ctrl+C 退出")
+
+    started = time.time()
+    try:
+        while ok:
+            bus.publish(frame, time.time())
+            if bus.seq % 300 == 0:
+                print(f"已发布 {bus.seq} 帧，{bus.seq / (time.time() - started):.1f} fps")
+            ok, frame = cap.read()
+        print("读取摄像头失败，服务退出")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        cap.release()
+        bus.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
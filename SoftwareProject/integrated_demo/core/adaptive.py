@@ -0,0 +1,157 @@
+"""
+自适应性能调节：根据实测的分析耗时、CPU 占用和温度在一组由高到低的档位之间切换，
+调整分析间隔、人脸检测分辨率和可选检测（视线估计、交替检测），使分析满足目标延迟
+
+负载过高时逐档降低，连续一段时间余量充足后逐档恢复；每次切换都给出原因，便于记录。
+"""
+
+import os
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+@dataclass(frozen=True)
+class AdaptiveLevel:
+    """一个性能档位"""
+    frame_skip: int               # 每隔N帧分析一次
+    face_detect_width: int        # HOG 人脸检测图像宽度
+    gaze: bool                    # 是否允许视线估计
+    alternating: bool             # 是否使用交替检测
+
+    def describe(self):
+        text = f"每{self.frame_skip}帧 检测{self.face_detect_width}px"
+        if not self.gaze:
+            text += " 关闭视线"
+        if self.alternating:
+            text += " 交替检测"
+        return text
+
+
+# 由高到低排列，先降低分析频率和检测分辨率，再关闭可选检测
+LEVELS = (
+    AdaptiveLevel(1, 320, True, False),
+    AdaptiveLevel(2, 320, True, False),
+    AdaptiveLevel(2, 240, True, False),
+    AdaptiveLevel(2, 240, False, False),
+    AdaptiveLevel(3, 240, False, False),
+    AdaptiveLevel(3, 240, False, True),
+    AdaptiveLevel(4, 160, False, True),
+)
+
+
+@dataclass
+class LoadSample:
+    """一次测量"""
+    analysis_ms: float            # 分析阶段单帧平均耗时
+    capture_fps: float            # 采集帧率
+    dropped: int = 0              # 分析队列本周期内丢弃的帧数
+    cpu_percent: Optional[float] = None
+    temperature: Optional[float] = None
+
+
+def read_system_load():
+    """返回 (CPU 占用百分比, CPU 温度)，无法获取的项为 None"""
+    cpu = temperature = None
+    if psutil is not None:
+        cpu = psutil.cpu_percent(interval=None)
+        sensors = getattr(psutil, "sensors_temperatures", None)
+        if sensors is not None:
+            try:
+                readings = [t.current for entries in sensors().values() for t in entries if t.current]
+            except (OSError, AttributeError):
+                readings = []
+            temperature = max(readings) if readings else None
+    elif hasattr(os, "getloadavg"):
+        cpu = min(os.getloadavg()[0] / (os.cpu_count() or 1) * 100.0, 100.0)
+    return cpu, temperature
+
+
+class AdaptiveController:
+    """自适应档位控制器
+
+    参数:
+        target_ms: 分析单帧的目标耗时（毫秒）
+        cpu_limit: CPU 占用上限（百分比）
+        temperature_limit: CPU 温度上限（摄氏度）
+        levels: 档位列表，由高到低
+        start_level: 初始档位序号
+        down_checks: 连续多少次测量超限后降档
+        recover_seconds: 余量充足持续多久后升档
+    """
+
+    def __init__(self, target_ms=100.0, cpu_limit=85.0, temperature_limit=85.0, levels=LEVELS,
+                 start_level=1, down_checks=2, recover_seconds=10.0):
+        self.target_ms = target_ms
+        self.cpu_limit = cpu_limit
+        self.temperature_limit = temperature_limit
+        self.levels = levels
+        self.index = min(start_level, len(levels) - 1)
+        self.down_checks = down_checks
+        self.recover_seconds = recover_seconds
+        self.decisions = []           # (时间, 原档位, 新档位, 原因)
+        self._over = 0
+        self._relaxed_since = None
+
+    @property
+    def level(self):
+        return self.levels[self.index]
+
+    def _pressure(self, sample):
+        """返回超限原因，没有超限时返回 None"""
+        # 分析占用率：每秒送入分析的帧数 × 单帧耗时，超过 0.9 说明分析跟不上
+        duty = sample.analysis_ms / 1000.0 * sample.capture_fps / self.level.frame_skip
+        if sample.temperature is not None and sample.temperature > self.temperature_limit:
+            return f"CPU温度{sample.temperature:.0f}°C"
+        if sample.cpu_percent is not None and sample.cpu_percent > self.cpu_limit:
+            return f"CPU占用{sample.cpu_percent:.0f}%"
+        if sample.analysis_ms > self.target_ms:
+            return f"分析耗时{sample.analysis_ms:.0f}ms超过目标{self.target_ms:.0f}ms"
+        if duty > 0.9 or sample.dropped > 0:
+            return f"分析跟不上(占用{duty:.0%}，丢弃{sample.dropped}帧)"
+        return None
+
+    def _relaxed(self, sample):
+        """当前档位余量充足，升一档后预计仍在目标内"""
+        if self.index == 0:
+            return False
+        duty = sample.analysis_ms / 1000.0 * sample.capture_fps / self.levels[self.index - 1].frame_skip
+        return (sample.analysis_ms < self.target_ms * 0.6 and duty < 0.6 and
+                (sample.cpu_percent is None or sample.cpu_percent < self.cpu_limit - 20) and
+                (sample.temperature is None or sample.temperature < self.temperature_limit - 10))
+
+    def update(self, sample, now=None):
+        """提交一次测量；档位变化时返回 (新档位, 原因)，否则返回 None"""
+        now = time.monotonic() if now is None else now
+        reason = self._pressure(sample)
+        if reason is not None:
+            self._relaxed_since = None
+            self._over += 1
+            if self._over >= self.down_checks and self.index < len(self.levels) - 1:
+                self._over = 0
+                return self._switch(self.index + 1, reason, now)
+            return None
+
+        self._over = 0
+        if not self._relaxed(sample):
+            self._relaxed_since = None
+            return None
+        if self._relaxed_since is None:
+            self._relaxed_since = now
+        elif now - self._relaxed_since >= self.recover_seconds:
+            self._relaxed_since = None
+            return self._switch(self.index - 1, f"负载降低(分析{sample.analysis_ms:.0f}ms)", now)
+        return None
+
+    def _switch(self, index, reason, now):
+        old = self.index
+        self.index = index
+        self.decisions.append((now, old, index, reason))
+        if len(self.decisions) > 100:
+            del self.decisions[:-50]
+        return self.level, reason
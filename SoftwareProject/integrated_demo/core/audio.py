@@ -0,0 +1,190 @@
+"""
+提示音服务：启动时把所有提示音读入内存，由单个工作线程依次播放
+
+- 每个提示音有冷却时间，冷却期内的重复请求直接忽略；
+- 同一提示音已在等待播放时不再重复排队（合并连续事件）；
+- 等待队列有上限，事件密集时不会积压大量声音，也不会为每个事件创建线程。
+
+Windows 使用 winsound 从内存播放 WAV 数据；其他系统使用 VLC，
+每个提示音的 Media 对象在启动时创建一次，通过内存读取回调播放已读入的数据，
+播放时复用同一个播放器，不再访问磁盘。
+"""
+
+import ctypes
+import glob
+import io
+import os
+import platform
+import queue
+import threading
+import time
+import wave
+
+SYSTEM = platform.system()
+
+
+class _WinsoundBackend:
+    def __init__(self):
+        import winsound
+        self._winsound = winsound
+
+    def prepare(self, path, data):
+        return data
+
+    def play(self, handle, duration):
+        # 内存播放不支持异步，在工作线程中同步播放，天然保证一次只播放一个提示音
+        self._winsound.PlaySound(handle, self._winsound.SND_MEMORY)
+
+
+class _VlcBackend:
+    def __init__(self):
+        import vlc
+        self._instance = vlc.Instance()
+        self._player = self._instance.media_player_new()
+
+    def prepare(self, path, data):
+        return _VlcMemoryMedia(self._instance, data)
+
+    def play(self, handle, duration):
+        self._player.set_media(handle.media)
+        self._player.play()
+        time.sleep(duration)
+        self._player.stop()
+
+
+class _VlcMemoryMedia:
+    """从内存中的 WAV 数据创建 VLC Media（libvlc 内存读取回调）
+
+    每次播放时 VLC 重新调用 open 回调，读取位置从头开始；
+    回调对象保存在实例上，避免被回收后 VLC 调用到失效的函数指针。
+    """
+
+    def __init__(self, instance, data):
+        import vlc
+        self.data = data
+        self.pos = 0
+        decorators = vlc.CallbackDecorators
+        self._callbacks = (
+            decorators.MediaOpenCb(self._open),
+            decorators.MediaReadCb(self._read),
+            decorators.MediaSeekCb(self._seek),
+            decorators.MediaCloseCb(self._close),
+        )
+        self.media = instance.media_new_callbacks(*self._callbacks, None)
+
+    def _open(self, opaque, datap, sizep):
+        self.pos = 0
+        sizep[0] = len(self.data)
+        return 0
+
+    def _read(self, opaque, buf, length):
+        chunk = self.data[self.pos:self.pos + length]
+        ctypes.memmove(buf, chunk, len(chunk))
+        self.pos += len(chunk)
+        return len(chunk)
+
+    def _seek(self, opaque, offset):
+        self.pos = min(offset, len(self.data))
+        return 0
+
+    def _close(self, opaque):
+        pass
+
+
+def _create_backend():
+    try:
+        return _WinsoundBackend() if SYSTEM == "Windows" else _VlcBackend()
+    except Exception as e:
+        print(f"音频输出不可用: {str(e)}")
+        return None
+
+
+class AudioCueService:
+    """提示音服务
+
+    参数:
+        cue_files: {提示音名称: WAV 文件路径}
+        cooldown: 同一提示音两次播放的最小间隔（秒）
+        cooldowns: 个别提示音的冷却时间，覆盖 cooldown
+        max_pending: 等待播放的提示音上限，超过时丢弃新请求
+    """
+
+    def __init__(self, cue_files, cooldown=2.0, cooldowns=None, max_pending=3):
+        self.cooldown = cooldown
+        self.cooldowns = dict(cooldowns or {})
+        self.backend = _create_backend()
+
+        self.cues = {}             # 名称 -> (播放句柄, 时长秒)
+        self.missing = []          # 不存在或无法读取的文件
+        self.played = 0
+        self.suppressed = 0        # 因冷却、合并或队列满而忽略的请求
+
+        self._last_played = {}
+        self._pending = set()
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=max_pending)
+
+        for name, path in cue_files.items():
+            self._load(name, path)
+
+        self._worker = threading.Thread(target=self._run, name="audio-cues", daemon=True)
+        self._worker.start()
+
+    @classmethod
+    def from_directory(cls, cue_files, gesture_dir=None, **kwargs):
+        """cue_files 加上 gesture_dir 中的手势提示音（名称为 gesture_<文件名>）"""
+        cue_files = dict(cue_files)
+        if gesture_dir and os.path.isdir(gesture_dir):
+            for path in glob.glob(os.path.join(gesture_dir, "*.wav")):
+                cue_files[f"gesture_{os.path.splitext(os.path.basename(path))[0]}"] = path
+        return cls(cue_files, **kwargs)
+
+    def _load(self, name, path):
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+            with wave.open(io.BytesIO(data)) as w:
+                duration = w.getnframes() / float(w.getframerate())
+            handle = self.backend.prepare(path, data) if self.backend is not None else None
+            self.cues[name] = (handle, duration)
+        except (OSError, wave.Error, EOFError) as e:
+            self.missing.append(path)
+            print(f"提示音加载失败 {path}: {str(e)}")
+
+    def play(self, name):
+        """请求播放提示音（不阻塞），返回是否进入播放队列"""
+        if name not in self.cues or self.backend is None:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            cooldown = self.cooldowns.get(name, self.cooldown)
+            if name in self._pending or now - self._last_played.get(name, -cooldown) < cooldown:
+                self.suppressed += 1
+                return False
+            try:
+                self._queue.put_nowait(name)
+            except queue.Full:
+                self.suppressed += 1
+                return False
+            self._pending.add(name)
+            # 冷却从请求时开始计算，连续事件只播放第一次
+            self._last_played[name] = now
+            return True
+
+    def _run(self):
+        while True:
+            name = self._queue.get()
+            if name is None:
+                break
+            with self._lock:
+                self._pending.discard(name)
+            handle, duration = self.cues[name]
+            try:
+                self.backend.play(handle, duration)
+                self.played += 1
+            except Exception as e:
+                print(f"音频播放错误: {str(e)}")
+
+    def close(self):
+        self._queue.put(None)
+        self._worker.join(timeout=2.0)
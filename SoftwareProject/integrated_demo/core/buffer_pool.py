@@ -0,0 +1,80 @@
+"""
+图像缓冲池：按尺寸和类型缓存预先分配的数组，缩放、复制、颜色转换直接写入池中的缓冲（cv2 的 dst 参数）
+
+帧在采集、分析、显示、录制各阶段之间传递，生命周期不确定（队列满时会被丢弃），
+因此缓冲带引用计数：每个持有方 retain 一次、用完 release 一次，计数归零时回到池中。
+稳定运行后每帧的图像处理不再分配新内存。
+"""
+
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+
+class PooledBuffer:
+    """池中的一个缓冲，array 为可直接使用的 numpy 数组"""
+
+    __slots__ = ('array', '_pool', '_key', '_refs')
+
+    def __init__(self, pool, key, array):
+        self.array = array
+        self._pool = pool
+        self._key = key
+        self._refs = 0
+
+    def retain(self):
+        """增加一个持有方，返回自身"""
+        with self._pool._lock:
+            self._refs += 1
+        return self
+
+    def release(self):
+        """持有方用完后调用，所有持有方都释放后回到池中"""
+        self._pool._release(self)
+
+
+class BufferPool:
+    """按 (形状, 类型) 分组的缓冲池，可在多个线程中同时使用
+
+    参数:
+        max_free: 每种尺寸最多保留的空闲缓冲数，超过的缓冲交给垃圾回收
+    """
+
+    def __init__(self, max_free=16):
+        self.max_free = max_free
+        self.allocated = 0        # 新分配的缓冲数
+        self.reused = 0           # 从池中复用的次数
+        self._free = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def acquire(self, shape, dtype=np.uint8):
+        """取出一个缓冲（内容未初始化），调用方为第一个持有方"""
+        key = (tuple(shape), np.dtype(dtype).str)
+        with self._lock:
+            free = self._free[key]
+            if free:
+                buffer = free.pop()
+                self.reused += 1
+            else:
+                buffer = None
+                self.allocated += 1
+        if buffer is None:
+            buffer = PooledBuffer(self, key, np.empty(shape, dtype=dtype))
+        buffer._refs = 1
+        return buffer
+
+    def _release(self, buffer):
+        with self._lock:
+            if buffer._refs <= 0:
+                raise RuntimeError("缓冲被重复释放")
+            buffer._refs -= 1
+            if buffer._refs > 0:
+                return
+            free = self._free[buffer._key]
+            if len(free) < self.max_free:
+                free.append(buffer)
+
+    def describe(self):
+        """统计文本，如 "缓冲池 分配12 复用3456" """
+        return f"缓冲池 分配{self.allocated} 复用{self.reused}"
@@ -0,0 +1,390 @@
+"""
+摄像头会话录制格式（.vcap）：保存未叠加标注的原始帧和精确的采集时间戳，
+用于确定性地重新运行疲劳/视线分析
+
+文件结构（小端）:
+    文件头   b'VCAP' | u32 版本 | u32 元数据长度 | 元数据JSON
+    数据块*  b'CHNK' | u32 帧数 | u64 数据长度 | 帧索引项 × 帧数 | 帧数据
+    尾部索引 b'VIDX' | u64 帧数 | 帧索引项 × 帧数 | u64 索引偏移 | b'VEND'
+
+帧索引项为 (f8 时间戳, u8 文件内偏移, u4 字节数, u4 帧号)。每个数据块自带
+所在帧的索引，录制中断（没有尾部索引）时可以逐块扫描恢复。读取时整个文件
+通过 mmap 映射，raw 编码的帧直接作为映射内存上的 numpy 视图返回，不复制数据。
+
+实时录制时由 SessionRecorder 在后台线程编码和写入，采集线程只把帧放入队列，
+不会因编码或写入数据块而延迟，保证记录的采集时间戳准确。
+"""
+
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+FILE_MAGIC = b'VCAP'
+CHUNK_MAGIC = b'CHNK'
+INDEX_MAGIC = b'VIDX'
+END_MAGIC = b'VEND'
+VERSION = 1
+
+INDEX_DTYPE = np.dtype([('timestamp', '<f8'), ('offset', '<u8'), ('size', '<u4'), ('frame_id', '<u4')])
+
+_HEADER = struct.Struct('<4sII')
+_CHUNK = struct.Struct('<4sIQ')
+_INDEX = struct.Struct('<4sQ')
+_FOOTER = struct.Struct('<Q4s')
+
+CODECS = ('raw', 'jpeg', 'png')
+
+
+class SessionWriter:
+    """录制会话文件
+
+    参数:
+        path: 输出文件路径（建议使用 .vcap 扩展名）
+        codec: 'raw'（不压缩，回放零拷贝）、'jpeg' 或 'png'
+        quality: JPEG 质量
+        width: 存储前缩放到的宽度，None 表示保持原尺寸
+        chunk_bytes: 数据块大小，达到后写入文件
+        metadata: 附加到文件头的信息（如摄像头、检测配置）
+    """
+
+    def __init__(self, path, codec='jpeg', quality=90, width=None, chunk_bytes=8 << 20, metadata=None):
+        if codec not in CODECS:
+            raise ValueError(f"不支持的编码: {codec}")
+        self.path = path
+        self.codec = codec
+        self.quality = quality
+        self.width = width
+        self.chunk_bytes = chunk_bytes
+        self.metadata = dict(metadata or {})
+        self.metadata.update({'codec': codec, 'width': width})
+
+        self._file = open(path, 'wb')
+        self._header_written = False
+
+        self._pending = []        # 当前数据块中的 (时间戳, 帧号, 数据)
+        self._pending_bytes = 0
+        self._index = []          # 已写入帧的索引项
+        self.shape = None         # 存储帧的尺寸，所有帧必须一致
+
+    def _encode(self, frame):
+        if self.width is not None and frame.shape[1] != self.width:
+            height = int(round(frame.shape[0] * self.width / frame.shape[1]))
+            frame = cv2.resize(frame, (self.width, height), interpolation=cv2.INTER_AREA)
+        if self.shape is None:
+            self.shape = frame.shape
+            self.metadata['shape'] = list(frame.shape)
+        elif frame.shape != self.shape:
+            raise ValueError(f"帧尺寸变化: {frame.shape} != {self.shape}")
+
+        if self.codec == 'raw':
+            return np.ascontiguousarray(frame, dtype=np.uint8).tobytes()
+        if self.codec == 'jpeg':
+            ok, buf = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+        else:
+            ok, buf = cv2.imencode('.png', frame)
+        if not ok:
+            raise IOError("帧编码失败")
+        return buf.tobytes()
+
+    def _write_header(self):
+        # 文件头在第一帧编码后写入，此时才知道存储帧的尺寸
+        meta = json.dumps(self.metadata, ensure_ascii=False).encode('utf-8')
+        self._file.write(_HEADER.pack(FILE_MAGIC, VERSION, len(meta)))
+        self._file.write(meta)
+        self._header_written = True
+
+    def write(self, frame, timestamp, frame_id=None):
+        """追加一帧，timestamp 为采集时间（秒）"""
+        frame_id = len(self) if frame_id is None else frame_id
+        data = self._encode(frame)
+        self._pending.append((timestamp, frame_id, data))
+        self._pending_bytes += len(data)
+        if self._pending_bytes >= self.chunk_bytes:
+            self.flush()
+
+    def flush(self):
+        """把当前数据块写入文件"""
+        if not self._pending:
+            return
+        if not self._header_written:
+            self._write_header()
+        start = self._file.tell()
+        entries = np.zeros(len(self._pending), dtype=INDEX_DTYPE)
+        offset = start + _CHUNK.size + entries.nbytes
+        for i, (timestamp, frame_id, data) in enumerate(self._pending):
+            entries[i] = (timestamp, offset, len(data), frame_id)
+            offset += len(data)
+
+        self._file.write(_CHUNK.pack(CHUNK_MAGIC, len(self._pending), self._pending_bytes))
+        self._file.write(entries.tobytes())
+        for _, _, data in self._pending:
+            self._file.write(data)
+        self._file.flush()
+
+        self._index.append(entries)
+        self._pending = []
+        self._pending_bytes = 0
+
+    def close(self):
+        """写入剩余数据和尾部索引"""
+        if self._file.closed:
+            return
+        self.flush()
+        if not self._header_written:
+            self._write_header()
+        index = np.concatenate(self._index) if self._index else np.zeros(0, dtype=INDEX_DTYPE)
+        index_offset = self._file.tell()
+        self._file.write(_INDEX.pack(INDEX_MAGIC, len(index)))
+        self._file.write(index.tobytes())
+        self._file.write(_FOOTER.pack(index_offset, END_MAGIC))
+        self._file.close()
+
+    def __len__(self):
+        return sum(len(e) for e in self._index) + len(self._pending)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SessionRecorder(threading.Thread):
+    """后台会话录制线程：采集线程提交帧，由本线程编码并写入 SessionWriter
+
+    参数:
+        writer: SessionWriter，由本线程负责关闭
+        queue_size: 待写入帧队列上限，队列满时丢弃新到的帧（已写入帧的时间戳不受影响）
+    """
+
+    def __init__(self, writer, queue_size=60):
+        super().__init__(name="session-recorder", daemon=True)
+        self.writer = writer
+        self.queue_size = queue_size
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._closing = False
+
+        self.dropped = 0          # 因队列满丢弃的帧数
+        self.written = 0          # 写入文件的帧数
+        self.encode_ms = 0.0      # 单帧编码和写入耗时（指数平均）
+        self.error = None
+
+    @property
+    def path(self):
+        return self.writer.path
+
+    def write(self, frame, timestamp, frame_id=None, release=None):
+        """提交一帧（调用方之后不能再修改该帧），返回是否进入队列
+
+        参数:
+            release: 可选回调，该帧写入完成或被丢弃后调用（如把帧缓冲还给缓冲池）
+        """
+        with self._cond:
+            accepted = not self._closing and len(self._queue) < self.queue_size
+            if accepted:
+                self._queue.append((frame, timestamp, frame_id, release))
+                self._cond.notify()
+            elif not self._closing:
+                self.dropped += 1
+        if not accepted and release is not None:
+            release()
+        return accepted
+
+    def run(self):
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._queue or self._closing)
+                    if not self._queue:
+                        break
+                    frame, timestamp, frame_id, release = self._queue.popleft()
+                start = time.perf_counter()
+                try:
+                    self.writer.write(frame, timestamp, frame_id)
+                finally:
+                    if release is not None:
+                        release()
+                elapsed_ms = (time.perf_counter() - start) * 1000.0
+                self.encode_ms = elapsed_ms if self.written == 0 else 0.9 * self.encode_ms + 0.1 * elapsed_ms
+                self.written += 1
+        except Exception as e:
+            self.error = e
+        finally:
+            # 出错退出时剩余的帧不再写入，也要释放
+            with self._cond:
+                self._closing = True
+                pending = list(self._queue)
+                self._queue.clear()
+            for _, _, _, release in pending:
+                if release is not None:
+                    release()
+            self.writer.close()
+
+    def close(self, timeout=10.0):
+        """写完队列中剩余的帧后关闭文件"""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        if self.is_alive():
+            self.join(timeout)
+
+    @property
+    def queued(self):
+        return len(self._queue)
+
+    def __len__(self):
+        return self.written
+
+    def describe(self):
+        """统计文本，如 "会话 队列2/60 丢弃0 编码6ms" """
+        return f"会话 队列{self.queued}/{self.queue_size} 丢弃{self.dropped} 编码{self.encode_ms:.0f}ms"
+
+
+class SessionReader:
+    """读取会话文件，支持按帧号/时间快速定位和零拷贝读取"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        if size < _HEADER.size:
+            # 录制刚开始或在写出文件头之前中断：没有可恢复的帧
+            # （mmap 不能映射空文件）
+            self._open_empty()
+            return
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, meta_len = _HEADER.unpack_from(self._mm, 0)
+        if magic != FILE_MAGIC:
+            self.close()
+            raise ValueError(f"不是会话文件: {path}")
+        if version > VERSION:
+            self.close()
+            raise ValueError(f"不支持的会话文件版本: {version}")
+        self._data_start = _HEADER.size + meta_len
+        if size < self._data_start:
+            # 元数据没有写完整
+            self._mm.close()
+            self._open_empty()
+            return
+        self.metadata = json.loads(bytes(self._mm[_HEADER.size:self._data_start]).decode('utf-8'))
+        self.codec = self.metadata['codec']
+        self.shape = tuple(self.metadata['shape']) if 'shape' in self.metadata else None
+
+        self.index = self._read_footer_index()
+        if self.index is None:
+            # 录制中断，没有尾部索引：逐块扫描恢复
+            self.index = self._scan_chunks()
+            self.recovered = True
+        else:
+            self.recovered = False
+
+    def _open_empty(self):
+        self._mm = None
+        self.metadata = {}
+        self.codec = None
+        self.shape = None
+        self.index = np.zeros(0, dtype=INDEX_DTYPE)
+        self.recovered = True
+
+    def _read_footer_index(self):
+        size = len(self._mm)
+        if size < self._data_start + _FOOTER.size:
+            return None
+        index_offset, end = _FOOTER.unpack_from(self._mm, size - _FOOTER.size)
+        if end != END_MAGIC:
+            return None
+        magic, count = _INDEX.unpack_from(self._mm, index_offset)
+        if magic != INDEX_MAGIC:
+            return None
+        return np.frombuffer(self._mm, dtype=INDEX_DTYPE, count=count, offset=index_offset + _INDEX.size)
+
+    def _scan_chunks(self):
+        entries = []
+        pos, size = self._data_start, len(self._mm)
+        while pos + _CHUNK.size <= size:
+            magic, count, payload = _CHUNK.unpack_from(self._mm, pos)
+            end = pos + _CHUNK.size + count * INDEX_DTYPE.itemsize + payload
+            if magic != CHUNK_MAGIC or end > size:
+                break
+            entries.append(np.frombuffer(self._mm, dtype=INDEX_DTYPE, count=count, offset=pos + _CHUNK.size))
+            pos = end
+        if not entries:
+            return np.zeros(0, dtype=INDEX_DTYPE)
+        return np.concatenate(entries)
+
+    @property
+    def timestamps(self):
+        return self.index['timestamp']
+
+    @property
+    def duration(self):
+        if len(self.index) < 2:
+            return 0.0
+        return float(self.timestamps[-1] - self.timestamps[0])
+
+    @property
+    def fps(self):
+        """按时间戳计算的平均帧率"""
+        return (len(self.index) - 1) / self.duration if self.duration > 0 else 0.0
+
+    def __len__(self):
+        return len(self.index)
+
+    def seek_time(self, timestamp):
+        """时间戳不早于 timestamp 的第一帧序号（二分查找）"""
+        return int(np.searchsorted(self.timestamps, timestamp, side='left'))
+
+    def frame(self, i):
+        """第 i 帧，返回 (时间戳, 帧号, 图像)；raw 编码时图像是只读的零拷贝视图"""
+        entry = self.index[i]
+        offset, size = int(entry['offset']), int(entry['size'])
+        if self.codec == 'raw':
+            image = np.frombuffer(self._mm, dtype=np.uint8, count=size, offset=offset).reshape(self.shape)
+        else:
+            buf = np.frombuffer(self._mm, dtype=np.uint8, count=size, offset=offset)
+            image = cv2.imdecode(buf, cv2.IMREAD_UNCHANGED)
+        return float(entry['timestamp']), int(entry['frame_id']), image
+
+    def iter_frames(self, start=0, end=None):
+        """依次读取 [start, end) 范围内的帧"""
+        end = len(self) if end is None else min(end, len(self))
+        for i in range(start, end):
+            yield self.frame(i)
+
+    def __iter__(self):
+        return self.iter_frames()
+
+    def close(self):
+        # 释放 numpy 视图后才能关闭映射
+        self.index = None
+        try:
+            if self._mm is not None:
+                self._mm.close()
+        except BufferError:
+            # 仍有外部持有的零拷贝帧，交给垃圾回收
+            pass
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def is_session_file(path):
+    """是否为会话文件（按文件头判断）"""
+    if not os.path.isfile(path):
+        return False
+    with open(path, 'rb') as f:
+        return f.read(4) == FILE_MAGIC
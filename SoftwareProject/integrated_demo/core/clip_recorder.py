@@ -0,0 +1,217 @@
+"""
+事件片段录制：内存中始终保留最近几秒的 JPEG 压缩帧，
+发生指定事件（如睡眠、疲劳、打哈欠）时把事件前后的片段在后台编码保存
+
+不需要持续录制整段视频，只保存关心的时刻。事件后的时间窗口内再次发生
+事件时合并到同一个片段，不会产生重叠的文件。
+
+add_frame 只把帧放入有界队列，JPEG 压缩由独立的压缩线程完成，调用方（显示阶段）
+不承担每帧的压缩开销；片段编码在另一个线程中进行，不影响压缩。
+"""
+
+import os
+import queue
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import List
+
+import cv2
+import numpy as np
+
+from .video_encoder import VideoEncoder
+
+
+@dataclass
+class PendingClip:
+    """等待事件后时间窗口结束的片段"""
+    event_type: str
+    event_time: float
+    start: float
+    end: float
+    events: List[str] = field(default_factory=list)
+
+
+class ClipRecorder:
+    """事件片段录制
+
+    参数:
+        directory: 片段保存目录
+        pre_seconds: 事件前保留的秒数
+        post_seconds: 事件后继续录制的秒数
+        trigger_events: 触发录制的事件类型
+        quality: 内存中缓存帧的 JPEG 质量
+        max_queue: 等待编码的片段上限，超过时丢弃新片段
+        max_incoming: 等待压缩的帧数上限，超过时丢弃新到的帧
+    """
+
+    def __init__(self, directory="clips", pre_seconds=10.0, post_seconds=5.0,
+                 trigger_events=('sleep', 'fatigue', 'yawn'), quality=80, max_queue=4, max_incoming=30):
+        self.directory = directory
+        self.pre_seconds = pre_seconds
+        self.post_seconds = post_seconds
+        self.trigger_events = set(trigger_events)
+        self.quality = quality
+
+        self._frames = deque()        # (时间戳, JPEG 数据)，按时间顺序
+        self._pending = []            # 等待结束的 PendingClip
+        self._lock = threading.Lock()
+        self._jobs = queue.Queue(maxsize=max_queue)
+        self._worker = threading.Thread(target=self._encode_loop, name="clip-encoder", daemon=True)
+        self._worker.start()
+
+        self.max_incoming = max_incoming
+        self._incoming = deque()      # 等待压缩的 (时间戳, 帧, release)，处理完才移出
+        self._incoming_cond = threading.Condition()
+        self._closing = False
+        self._compressor = threading.Thread(target=self._compress_loop, name="clip-compress", daemon=True)
+        self._compressor.start()
+
+        self.saved = []               # 已保存的片段路径
+        self.dropped_clips = 0
+        self.dropped_frames = 0       # 压缩跟不上时丢弃的帧数
+        self.on_saved = None          # 片段保存后的回调 on_saved(path, clip)，在编码线程中调用
+
+    def add_frame(self, frame, timestamp=None, release=None):
+        """提交一帧（调用方之后不能再修改该帧），由压缩线程压缩缓存；返回是否进入队列
+
+        参数:
+            release: 可选回调，该帧压缩完成或被丢弃后调用（如把帧缓冲还给缓冲池）
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._incoming_cond:
+            accepted = not self._closing and len(self._incoming) < self.max_incoming
+            if accepted:
+                self._incoming.append((timestamp, frame, release))
+                self._incoming_cond.notify_all()
+            elif not self._closing:
+                self.dropped_frames += 1
+        if not accepted and release is not None:
+            release()
+        return accepted
+
+    def _compress_loop(self):
+        while True:
+            with self._incoming_cond:
+                self._incoming_cond.wait_for(lambda: self._incoming or self._closing)
+                if not self._incoming:
+                    break
+                timestamp, frame, release = self._incoming[0]
+            data = None
+            try:
+                ok, buf = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.quality])
+                if ok:
+                    data = buf.tobytes()
+            except Exception as e:
+                print(f"事件片段帧压缩失败: {str(e)}")
+            finally:
+                if release is not None:
+                    release()
+            if data is not None:
+                self._store(timestamp, data)
+            with self._incoming_cond:
+                self._incoming.popleft()
+                self._incoming_cond.notify_all()
+
+    def _store(self, timestamp, data):
+        """缓存一帧压缩数据，检查是否有片段可以保存"""
+        with self._lock:
+            self._frames.append((timestamp, data))
+
+            # 事件后的时间窗口已结束的片段交给编码线程
+            ready = [clip for clip in self._pending if timestamp >= clip.end]
+            for clip in ready:
+                self._pending.remove(clip)
+                self._submit(clip)
+
+            # 保留事件前的时间窗口，以及尚未结束的片段需要的帧
+            keep_from = timestamp - self.pre_seconds
+            if self._pending:
+                keep_from = min(keep_from, min(clip.start for clip in self._pending))
+            while self._frames and self._frames[0][0] < keep_from:
+                self._frames.popleft()
+
+    def trigger(self, event_type, timestamp=None):
+        """发生事件；返回是否会录制片段"""
+        if event_type not in self.trigger_events:
+            return False
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            for clip in self._pending:
+                if clip.start <= timestamp <= clip.end:
+                    # 合并到尚未结束的片段，并延长结束时间
+                    clip.end = max(clip.end, timestamp + self.post_seconds)
+                    clip.events.append(event_type)
+                    return True
+            self._pending.append(PendingClip(event_type, timestamp, timestamp - self.pre_seconds,
+                                             timestamp + self.post_seconds, [event_type]))
+            return True
+
+    def _submit(self, clip):
+        # 调用方持有 self._lock
+        frames = [item for item in self._frames if clip.start <= item[0] <= clip.end]
+        if not frames:
+            return
+        try:
+            self._jobs.put_nowait((clip, frames))
+        except queue.Full:
+            self.dropped_clips += 1
+
+    def flush(self):
+        """立即保存所有未结束的片段（如停止检测时），包含已提交的所有帧"""
+        with self._incoming_cond:
+            self._incoming_cond.wait_for(lambda: not self._incoming)
+        with self._lock:
+            pending, self._pending = self._pending, []
+            for clip in pending:
+                self._submit(clip)
+
+    def _encode_loop(self):
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+            clip, frames = job
+            try:
+                path = self._encode(clip, frames)
+                self.saved.append(path)
+                if self.on_saved is not None:
+                    self.on_saved(path, clip)
+            except Exception as e:
+                print(f"事件片段保存失败: {str(e)}")
+            finally:
+                self._jobs.task_done()
+
+    def _encode(self, clip, frames):
+        os.makedirs(self.directory, exist_ok=True)
+        # 文件名精确到毫秒，同一毫秒内的同类片段再加序号，避免相互覆盖
+        stamp = time.strftime("%Y%m%d_%H%M%S", time.localtime(clip.event_time))
+        stamp += f"_{int(clip.event_time * 1000) % 1000:03d}"
+        path = os.path.join(self.directory, f"{clip.event_type}_{stamp}.mp4")
+        suffix = 1
+        while os.path.exists(path):
+            path = os.path.join(self.directory, f"{clip.event_type}_{stamp}_{suffix}.mp4")
+            suffix += 1
+
+        duration = frames[-1][0] - frames[0][0]
+        fps = (len(frames) - 1) / duration if duration > 0 else 20.0
+        encoder = VideoEncoder(path, fps=min(max(fps, 1.0), 60.0), queue_size=8, drop_policy='block',
+                               block_timeout=None)
+        encoder.start()
+        for timestamp, data in frames:
+            encoder.write(cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR), timestamp)
+        encoder.close(timeout=None)
+        if encoder.error is not None:
+            raise encoder.error
+        return path
+
+    def close(self):
+        """压缩剩余的帧，保存未结束的片段并等待编码完成"""
+        with self._incoming_cond:
+            self._closing = True
+            self._incoming_cond.notify_all()
+        self._compressor.join()
+        self.flush()
+        self._jobs.put(None)
+        self._worker.join()
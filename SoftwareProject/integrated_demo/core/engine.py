@@ -0,0 +1,745 @@
+"""
+无界面的检测引擎：人脸疲劳（眨眼/闭眼/打哈欠）、点头/摇头和手势识别
+
+引擎只接收图像帧和时间戳，返回每帧的分析结果和检测事件，不依赖 PyQt，
+可用于界面程序、服务进程、离线视频分析和性能测试。
+"""
+
+import os
+import sys
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import dlib
+import numpy as np
+from imutils import face_utils
+
+from .face_features import FaceFeatures, extract_features
+from .face_tracker import FaceTracker
+from .head_pose import HeadPoseEstimator, NOD_PITCH_THRESHOLD, PoseGestureDetector, SHAKE_YAW_THRESHOLD
+from .scheduler import ModalityScheduler
+from .stages import FramePacket
+
+DEMO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODELS_DIR = os.path.join(DEMO_DIR, "models")
+
+# 68点面部轮廓连线：(起点, 终点, 是否首尾相连)
+LANDMARK_OUTLINES = [
+    (0, 16, False),   # 脸部轮廓
+    (17, 21, False),  # 左眉毛
+    (22, 26, False),  # 右眉毛
+    (27, 30, False),  # 鼻梁
+    (31, 35, True),   # 鼻子底部
+    (36, 41, True),   # 左眼
+    (42, 47, True),   # 右眼
+    (48, 59, True),   # 嘴唇外围
+    (60, 67, True),   # 嘴唇内围
+]
+
+# 写入检测日志（log_detection）的事件类型
+LOGGED_EVENTS = {'nod', 'shake', 'yawn', 'blink', 'sleep', 'fatigue', 'hand_gesture'}
+
+
+@dataclass
+class DetectionConfig:
+    """检测开关和阈值，可由界面控件、命令行参数或配置文件生成"""
+    # 功能开关
+    nod: bool = True
+    shake: bool = True
+    yawn: bool = True
+    blink: bool = True
+    fatigue: bool = True
+    hand: bool = True
+    gaze: bool = False                 # 视线估计（需要 L2CS 模型，复用人脸检测结果）
+    debug: bool = True                 # 绘制调试信息（手部框、计数器等）
+    alternating: bool = False          # 交替检测：每帧只运行人脸或手势之一
+
+    # 疲劳检测参数
+    ear_thresh: float = 0.24           # 眼睛长宽比阈值
+    ar_consec_frames: int = 60         # 闭眼判定连续帧数阈值
+    mar_thresh: float = 0.5            # 打哈欠嘴部长宽比阈值
+    mouth_ar_consec_frames: int = 15   # 打哈欠连续帧数阈值
+    yawns_for_fatigue: int = 4         # 判断为疲劳的哈欠次数
+    fatigue_window: float = 180.0      # 判断疲劳的时间窗口(秒)
+
+    # 点头/摇头参数
+    nod_pitch_threshold: float = NOD_PITCH_THRESHOLD   # 点头俯仰角阈值(度)
+    shake_yaw_threshold: float = SHAKE_YAW_THRESHOLD   # 摇头偏航角阈值(度)
+
+    # 手势参数
+    gesture_hold_time: float = 1.0     # 手势需要保持的时间(秒)
+    gesture_repeat_interval: float = 10.0  # 相同手势再次播报的间隔(秒)
+
+    # 人脸定位
+    face_detect_width: int = 320       # HOG 人脸检测使用的图像宽度(像素)，0 表示原图
+    face_redetect_interval: int = 10   # 两次人脸检测之间用特征点跟踪的最多帧数，0 表示每帧检测
+
+    # 其他
+    face_box_frames: int = 5           # 交替模式下人脸框持续显示帧数
+    no_detection_timeout: float = 3.0  # 人脸和手都消失多久后提示脱离识别范围(秒)
+
+    def face_enabled(self):
+        """是否启用了任一人脸相关检测"""
+        return self.nod or self.shake or self.yawn or self.blink or self.fatigue or self.gaze
+
+    @classmethod
+    def from_dict(cls, data):
+        """从字典（如JSON配置文件）创建，忽略未知字段"""
+        names = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in data.items() if k in names})
+
+    def to_dict(self):
+        return asdict(self)
+
+
+@dataclass
+class DetectionEvent:
+    """检测事件，事件类型与 log_detection 一致"""
+    event_type: str
+    timestamp: float                   # 帧时间戳（秒），实时为系统时间，回放为视频时间
+    details: Dict[str, Any] = field(default_factory=dict)
+    frame_id: int = 0
+
+
+@dataclass
+class FrameAnalysis:
+    """单帧的分析结果"""
+    frame_id: int
+    timestamp: float
+    frame_shape: Tuple[int, ...]
+    face_ran: bool = False
+    hand_ran: bool = False
+
+    # 人脸
+    face_detected: bool = False
+    face_count: int = 0
+    face_box: Optional[Tuple[int, int, int, int]] = None   # (x, y, w, h)
+    landmarks: Optional[np.ndarray] = None                  # 68x2
+    features: Optional[FaceFeatures] = None                 # EAR/MAR、轮廓和姿态求解点
+    held_face_box: Optional[Tuple[int, int, int, int]] = None  # 交替模式下沿用的人脸框
+    ear: Optional[float] = None
+    mar: Optional[float] = None
+    blink_counter: int = 0
+    yawning: bool = False
+    head_pose: Optional[Tuple[float, float, float]] = None  # (pitch, yaw, roll)，度
+    gaze: Optional[Tuple[float, float]] = None              # 视线 (pitch, yaw)，弧度
+    head_gesture_status: Dict[str, int] = field(default_factory=dict)
+
+    # 手势
+    hand_detected: bool = False
+    hand_boxes: List[List[float]] = field(default_factory=list)
+    gesture: Optional[str] = None
+    gesture_box: Optional[List[float]] = None
+    gesture_hold: float = 0.0
+
+    events: List[DetectionEvent] = field(default_factory=list)
+    errors: Dict[str, Exception] = field(default_factory=dict)
+
+
+def describe_event(event):
+    """事件的中文提示文本，不需要提示的事件返回None"""
+    t = event.event_type
+    if t == 'nod':
+        return "检测到点头"
+    if t == 'shake':
+        return "检测到摇头"
+    if t == 'yawn':
+        return "打哈欠"
+    if t == 'sleep':
+        return "睡觉"
+    if t == 'fatigue':
+        return "疲劳"
+    if t == 'hand_gesture':
+        return f"检测到手势: {event.details['gesture_name']} (已保持{event.details['hold_time']:.1f}秒)"
+    if t == 'no_detection':
+        return "脱离识别范围!!!"
+    if t == 'head_gesture_resumed':
+        return "点头/摇头检测恢复"
+    return None
+
+
+class DetectionEngine:
+    """人脸疲劳、点头/摇头和手势检测引擎
+
+    参数:
+        config: DetectionConfig，可随时整体替换（engine.config = new_config）
+        predictor_path: dlib 68点特征预测模型路径
+        hand_detector_path / hand_classifier_path: 手势 ONNX 模型路径
+    """
+
+    def __init__(self, config: Optional[DetectionConfig] = None,
+                 predictor_path=os.path.join(MODELS_DIR, "shape_predictor_68_face_landmarks.dat"),
+                 hand_detector_path=os.path.join(MODELS_DIR, "hand_detector.onnx"),
+                 hand_classifier_path=os.path.join(MODELS_DIR, "crops_classifier.onnx")):
+        self.config = config or DetectionConfig()
+        self.predictor_path = predictor_path
+        self.hand_detector_path = hand_detector_path
+        self.hand_classifier_path = hand_classifier_path
+
+        self.detector = None
+        self.face_tracker = None
+        self.predictor = None
+        self.hand_controller = None
+        self.gesture_targets = []
+        self.gaze_estimator = None
+
+        # 可选的分阶段计时器（core.profiling.StageTimer），性能测试时设置
+        self.timer = None
+
+        # 灰度图缓冲，每帧复用，不再每帧分配
+        self._gray = None
+
+        # 人脸和手势在各自的工作线程中并发分析同一帧
+        self.scheduler = ModalityScheduler(max_workers=2)
+        self.reset()
+
+    # ------------------------------------------------------------------ 模型
+    def load(self, load_hand=True, load_gaze=False):
+        """加载模型，返回提示信息列表；缺少模型文件的功能会被标记为不可用"""
+        messages = []
+        self.detector = dlib.get_frontal_face_detector()
+        self.face_tracker = FaceTracker(self.detector)
+        if os.path.exists(self.predictor_path):
+            self.predictor = dlib.shape_predictor(self.predictor_path)
+            messages.append("人脸特征点模型加载成功")
+        else:
+            messages.append(f"错误：找不到人脸特征点模型文件: {self.predictor_path}")
+
+        if load_hand:
+            if os.path.exists(self.hand_detector_path) and os.path.exists(self.hand_classifier_path):
+                # dynamic_gestures 内部使用相对导入路径
+                for path in (DEMO_DIR, os.path.join(DEMO_DIR, "dynamic_gestures")):
+                    if path not in sys.path:
+                        sys.path.append(path)
+                from dynamic_gestures.main_controller import MainController
+                from dynamic_gestures.utils.enums import targets as gesture_targets
+
+                self.hand_controller = MainController(self.hand_detector_path, self.hand_classifier_path)
+                self.gesture_targets = gesture_targets
+                messages.append("手势检测模型加载成功")
+            else:
+                messages.append("错误：手势检测模型文件不存在")
+
+        if load_gaze:
+            try:
+                from .gaze import GazeEstimator
+                self.gaze_estimator = GazeEstimator()
+                messages.append(f"视线估计模型加载成功: {self.gaze_estimator.profile.name}")
+            except Exception as e:
+                messages.append(f"错误：视线估计模型加载失败: {str(e)}")
+        return messages
+
+    @property
+    def face_available(self):
+        return self.predictor is not None
+
+    @property
+    def hand_available(self):
+        return self.hand_controller is not None
+
+    @property
+    def gaze_available(self):
+        return self.gaze_estimator is not None
+
+    def reset(self):
+        """清空所有跨帧状态（开始新的视频或重新开始检测时调用）"""
+        self.frame_count = 0
+
+        # 计数器
+        self.COUNTER = 0  # 闭眼计数器
+        self.mCOUNTER = 0  # 打哈欠计数器
+        self.mTOTAL = 0  # 打哈欠总次数
+        self.eyes_closed_since = None  # 本次闭眼开始时间
+
+        # 状态标志
+        self.shutEye = False
+        self.ifYawming = False
+
+        # 哈欠时间记录
+        self.timeOfTheLastOfYawns = 0.0
+        self.timeOfTheFirstOfYawns = 0.0
+
+        # 点头/摇头
+        self.head_gesture = PoseGestureDetector(self.config.nod_pitch_threshold, self.config.shake_yaw_threshold)
+        self.head_pose = HeadPoseEstimator()
+        if self.face_tracker is not None:
+            self.face_tracker.reset()
+
+        # 手势持续时间检测
+        self.current_gesture = None       # 当前检测到的手势
+        self.gesture_start_time = 0       # 手势开始时间
+        self.reported_gestures = set()    # 已播报过的手势，避免重复播报
+
+        # 交替检测与人脸框持久显示
+        self.detection_mode = 0  # 0: 面部检测, 1: 手势检测
+        self.last_face_box = None
+        self.face_box_valid_frames = 0
+
+        # 脱离识别范围判断
+        self.face_detected = False
+        self.hand_detected = False
+        self.last_face_time = None
+        self.last_hand_time = None
+        self.no_detection_reported = False
+
+    def close(self):
+        self.scheduler.shutdown()
+
+    def _measure(self, stage):
+        """计时上下文，未设置计时器时不产生开销"""
+        return self.timer.measure(stage) if self.timer is not None else nullcontext()
+
+    # ------------------------------------------------------------------ 分析
+    def process(self, frame, timestamp, frame_id=None) -> FrameAnalysis:
+        """分析一帧图像（BGR），timestamp 为秒"""
+        cfg = self.config
+        self.frame_count += 1
+        frame_id = self.frame_count if frame_id is None else frame_id
+        result = FrameAnalysis(frame_id, timestamp, frame.shape)
+        if self.last_face_time is None:
+            self.last_face_time = self.last_hand_time = timestamp
+
+        # 减少点头/摇头显示持续时间的计数器，不管当前是什么检测模式
+        status = self.head_gesture.gesture_status
+        for key in status:
+            if status[key] > 0:
+                status[key] -= 1
+
+        run_face = cfg.face_enabled() and self.detector is not None and self.predictor is not None
+        run_hand = cfg.hand and self.hand_controller is not None
+        if cfg.alternating:
+            # 每一帧只执行一种检测
+            run_face = run_face and self.detection_mode == 0
+            run_hand = run_hand and self.detection_mode == 1
+            self.detection_mode = 1 - self.detection_mode
+        result.face_ran, result.hand_ran = run_face, run_hand
+
+        tasks = {}
+        if run_face:
+            tasks["人脸"] = lambda packet: self._analyze_face(packet, result)
+        if run_hand:
+            tasks["手势"] = lambda packet: self._analyze_hands(packet, result)
+        if tasks:
+            merged = self.scheduler.run(FramePacket(frame_id, timestamp, frame), tasks)
+            result.errors.update(merged.errors)
+            # 按固定顺序合并事件，保证事件流可复现
+            for name in ("人脸", "手势"):
+                result.events.extend(merged.results.get(name) or [])
+
+        if not cfg.alternating:
+            # 两个模态每帧都运行，未运行的模态视为未检测到
+            self.face_detected = self.hand_detected = False
+        if run_face:
+            self.face_detected = result.face_detected
+            if result.face_detected:
+                self.last_face_time = timestamp
+                self.no_detection_reported = False
+        if run_hand:
+            self.hand_detected = result.hand_detected
+            if result.hand_detected:
+                self.last_hand_time = timestamp
+                self.no_detection_reported = False
+
+        # 交替模式下本帧未做人脸检测时，继续显示上一次的人脸框
+        if cfg.alternating and not run_face and self.last_face_box is not None and self.face_box_valid_frames > 0:
+            result.held_face_box = self.last_face_box
+            self.face_box_valid_frames -= 1
+
+        # 人脸和手都消失一段时间后提示脱离识别范围
+        if (not self.face_detected and not self.hand_detected and
+                timestamp - self.last_face_time > cfg.no_detection_timeout and
+                timestamp - self.last_hand_time > cfg.no_detection_timeout and
+                not self.no_detection_reported):
+            result.events.append(DetectionEvent('no_detection', timestamp, {}, frame_id))
+            self.no_detection_reported = True
+
+        result.head_gesture_status = dict(status)
+        return result
+
+    def _analyze_face(self, packet, result):
+        """人脸检测和疲劳分析，返回本帧产生的事件"""
+        cfg = self.config
+        frame, t = packet.frame, packet.timestamp
+        events = []
+
+        # 转换为灰度图用于检测和特征点定位
+        gray = self._to_gray(frame)
+        tracker = self.face_tracker
+        tracker.detect_width = cfg.face_detect_width
+        tracker.redetect_interval = cfg.face_redetect_interval
+
+        # 优先沿用上一帧特征点推算的人脸区域，到期或跟踪失效时才运行 HOG 检测
+        face = tracker.predict()
+        if face is None:
+            with self._measure('dlib_detect'):
+                faces = tracker.detect(gray)
+            if len(faces) == 0:
+                result.face_count = 0
+                self._lose_face()
+                return events
+            # 取第一个人脸进行处理
+            face = faces[0]
+        result.face_count = tracker.face_count
+        x, y, w, h = face.left(), face.top(), face.right() - face.left(), face.bottom() - face.top()
+        result.face_detected = True
+        result.face_box = (x, y, w, h)
+        self.last_face_box = (x, y, w, h)
+        self.face_box_valid_frames = cfg.face_box_frames
+
+        # 提取人脸特征点
+        with self._measure('shape_predictor'):
+            shape = face_utils.shape_to_np(self.predictor(gray, face))
+        result.landmarks = shape
+        tracker.update(shape, face, frame.shape)
+        features = extract_features(shape)
+        result.features = features
+
+        # 视线估计：与疲劳检测共用本帧的人脸框和特征点，不再单独检测人脸
+        if cfg.gaze and self.gaze_estimator is not None:
+            with self._measure('gaze'):
+                result.gaze = self.gaze_estimator.estimate(frame, shape)
+
+        # 点头/摇头检测
+        if cfg.nod or cfg.shake:
+            events.extend(self._update_head_pose(features.pose_points, frame.shape, t, result))
+
+        # 打哈欠检测
+        if cfg.yawn:
+            events.extend(self._update_yawn(features.mar, t, result))
+
+        # 闭眼检测
+        if cfg.blink:
+            events.extend(self._update_blink(features.ear, t, result))
+
+        # 疲劳状态检测
+        if cfg.fatigue:
+            events.extend(self._check_fatigue(t))
+
+        result.blink_counter = self.COUNTER
+        for event in events:
+            event.frame_id = packet.frame_id
+        return events
+
+    def _to_gray(self, frame):
+        """转换为灰度图，写入复用的缓冲"""
+        if self._gray is None or self._gray.shape != frame.shape[:2]:
+            self._gray = np.empty(frame.shape[:2], dtype=np.uint8)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self._gray)
+
+    def _lose_face(self):
+        """未检测到人脸时更新点头/摇头跟踪状态"""
+        if self.config.nod or self.config.shake:
+            # 计数跟踪丢失帧数，清空姿态历史，人脸重新出现时重新积累
+            self.head_gesture.lost_counter += 1
+            self.head_gesture.reset_tracks()
+            self.head_pose.reset()
+
+    def _gesture_detector(self):
+        """返回点头/摇头检测器，并同步当前配置的阈值"""
+        detector = self.head_gesture
+        detector.nod_threshold = self.config.nod_pitch_threshold
+        detector.shake_threshold = self.config.shake_yaw_threshold
+        return detector
+
+    def _check_gesture_wait(self, detector, t):
+        """检查是否在等待期内，等待期内不进行检测；返回 (是否等待中, 事件列表)"""
+        if detector.wait_after_detection:
+            if t >= detector.wait_until_time:
+                # 等待期结束，重置等待标志
+                detector.wait_after_detection = False
+                return True, [DetectionEvent('head_gesture_resumed', t)]
+            return True, []
+        return False, []
+
+    def _gesture_events(self, gesture, detector, t, details_key, thresholds):
+        """过滤未启用的动作，生成点头/摇头事件并进入等待期"""
+        cfg = self.config
+        # 根据选中选项过滤未启用的手势检测
+        if gesture == "nod" and not cfg.nod:
+            gesture = None
+        if gesture == "shake" and not cfg.shake:
+            gesture = None
+        if not gesture:
+            return []
+        gesture_details = {
+            details_key: {
+                k: float(v) if isinstance(v, (np.integer, np.floating)) else v
+                for k, v in detector.debug_info.items()
+            },
+            'threshold': float(thresholds[0] if gesture == "nod" else thresholds[1])
+        }
+        detector.reset_counters(gesture, t)
+        return [DetectionEvent(gesture, t, gesture_details)]
+
+    def _update_head_pose(self, pose_points, frame_shape, t, result):
+        """由特征点求解头部姿态，根据姿态角变化检测点头/摇头"""
+        cfg = self.config
+        detector = self._gesture_detector()
+        with self._measure('head_pose'):
+            pose = self.head_pose.estimate(pose_points, frame_shape)
+        if pose is None:
+            detector.reset_tracks()
+            return []
+        result.head_pose = pose
+
+        waiting, events = self._check_gesture_wait(detector, t)
+        if waiting:
+            return events
+        detector.update(pose[0], pose[1], t)
+        gesture = detector.analyze_motion(t)
+        return self._gesture_events(gesture, detector, t, 'pose_data',
+                                    (cfg.nod_pitch_threshold, cfg.shake_yaw_threshold))
+
+    def _update_yawn(self, mar, t, result):
+        """处理打哈欠检测"""
+        cfg = self.config
+        result.mar = mar
+
+        events = []
+        if mar > cfg.mar_thresh:
+            self.mCOUNTER += 1
+        if mar < cfg.mar_thresh:
+            self.mCOUNTER = 0
+        else:
+            if self.mCOUNTER >= cfg.mouth_ar_consec_frames:
+                self.ifYawming = True
+
+        if self.ifYawming:
+            if self.mTOTAL == 0:
+                self.timeOfTheFirstOfYawns = t
+            if self.mTOTAL == cfg.yawns_for_fatigue - 1:
+                self.timeOfTheLastOfYawns = t
+            if mar < cfg.mar_thresh:
+                self.ifYawming = False
+                self.mTOTAL += 1
+                events.append(DetectionEvent('yawn', t, {
+                    'counter': self.mTOTAL,
+                    'mar': float(mar),
+                    'threshold': float(cfg.mar_thresh),
+                    'frames_count': self.mCOUNTER
+                }))
+        result.yawning = self.ifYawming
+        return events
+
+    def _update_blink(self, ear, t, result):
+        """处理眨眼/闭眼检测"""
+        cfg = self.config
+        result.ear = ear
+
+        events = []
+        if ear < cfg.ear_thresh:
+            if self.COUNTER == 0:
+                self.eyes_closed_since = t
+            self.COUNTER += 1
+        else:
+            # 如果有足够的闭眼帧数，记录眨眼事件
+            if 5 <= self.COUNTER < cfg.ar_consec_frames:  # 正常眨眼
+                events.append(DetectionEvent('blink', t, {
+                    'frames_count': self.COUNTER,
+                    'ear': float(ear),
+                    'threshold': float(cfg.ear_thresh)
+                }))
+            self.COUNTER = 0
+
+        if self.COUNTER >= cfg.ar_consec_frames:
+            self.shutEye = True
+        return events
+
+    def _check_fatigue(self, t):
+        """综合判断疲劳状态"""
+        cfg = self.config
+        events = []
+        # 如果闭眼时间过长，判定为睡觉
+        if self.shutEye:
+            closed_since = self.eyes_closed_since if self.eyes_closed_since is not None else t
+            events.append(DetectionEvent('sleep', t, {
+                'frames_count': self.COUNTER,
+                'threshold_frames': cfg.ar_consec_frames,
+                'duration': float(t - closed_since)
+            }))
+            self.shutEye = False
+            self.COUNTER = 0
+
+        # 根据短时间内的哈欠次数判断疲劳
+        window = self.timeOfTheLastOfYawns - self.timeOfTheFirstOfYawns
+        if self.mTOTAL >= cfg.yawns_for_fatigue and 0 < window < cfg.fatigue_window:
+            events.append(DetectionEvent('fatigue', t, {
+                'yawn_count': self.mTOTAL,
+                'threshold_count': cfg.yawns_for_fatigue,
+                'time_window': float(window),
+                'max_time_window': cfg.fatigue_window,
+                'first_yawn_time': float(self.timeOfTheFirstOfYawns),
+                'last_yawn_time': float(self.timeOfTheLastOfYawns)
+            }))
+            # 重置相关计数
+            self.mTOTAL = 0
+        return events
+
+    def _analyze_hands(self, packet, result):
+        """手势检测和手势保持时间判断，返回本帧产生的事件"""
+        cfg = self.config
+        t = packet.timestamp
+        events = []
+
+        # MainController返回三个值：边界框、跟踪ID、手势标签
+        with self._measure('hand_onnx'):
+            bboxes, track_ids, labels = self.hand_controller(packet.frame)
+        if bboxes is None or len(bboxes) == 0:
+            # 没有检测到任何手，重置状态
+            self.current_gesture = None
+            return events
+
+        result.hand_detected = True
+        result.hand_boxes = [[float(v) for v in box[:4]] for box in bboxes]
+
+        # 获取第一个检测到的手势（如果有多个，只处理第一个）
+        current_detected_gesture = None
+        gesture_box = None
+        for i, box in enumerate(bboxes):
+            if labels[i] is not None and 0 <= labels[i] < len(self.gesture_targets):
+                current_detected_gesture = self.gesture_targets[labels[i]]
+                gesture_box = [float(v) for v in box[:4]]
+                break
+
+        if current_detected_gesture is None:
+            # 没有检测到手势，重置状态
+            self.current_gesture = None
+            return events
+
+        # 如果是新的手势或者之前没有手势
+        if self.current_gesture != current_detected_gesture:
+            self.current_gesture = current_detected_gesture
+            self.gesture_start_time = t
+            hold_time = 0.0
+        else:
+            # 计算手势已经保持的时间
+            hold_time = t - self.gesture_start_time
+
+        result.gesture = current_detected_gesture
+        result.gesture_box = gesture_box
+        result.gesture_hold = hold_time
+
+        # 检查手势是否已经保持足够长的时间且未播报过
+        gesture_key = f"{current_detected_gesture}_{int(t / cfg.gesture_repeat_interval)}"
+        if hold_time >= cfg.gesture_hold_time and gesture_key not in self.reported_gestures:
+            events.append(DetectionEvent('hand_gesture', t, {
+                'gesture_name': current_detected_gesture,
+                'hold_time': float(hold_time),
+                'bbox': gesture_box,
+                'hold_threshold': float(cfg.gesture_hold_time)
+            }, packet.frame_id))
+
+            # 标记为已播报
+            self.reported_gestures.add(gesture_key)
+
+            # 定期清理过旧的已播报手势记录
+            if len(self.reported_gestures) > 100:
+                self.reported_gestures = set(list(self.reported_gestures)[-50:])
+        return events
+
+    # ------------------------------------------------------------------ 绘制
+    def draw(self, result: FrameAnalysis, canvas=None):
+        """把分析结果绘制到 canvas 上；canvas 为None时绘制到新的黑色叠加层"""
+        cfg = self.config
+        if canvas is None:
+            canvas = np.zeros(result.frame_shape, dtype=np.uint8)
+
+        if result.face_detected:
+            self._draw_face(canvas, result)
+        elif result.held_face_box is not None:
+            x, y, w, h = result.held_face_box
+            cv2.rectangle(canvas, (x, y), (x + w, y + h), (0, 0, 255), 2)
+
+        # 点头/摇头结果
+        if cfg.nod or cfg.shake:
+            if result.head_gesture_status.get("nod", 0) > 0:
+                cv2.putText(canvas, "NODDING", (50, 60),
+                            cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 0), 3)
+            if result.head_gesture_status.get("shake", 0) > 0:
+                cv2.putText(canvas, "SHAKING", (50, 120),
+                            cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 0, 0), 3)
+
+        if result.hand_detected:
+            self._draw_hands(canvas, result)
+
+        if cfg.alternating:
+            # 在图像上标注当前模式
+            mode_text = "面部检测模式" if result.face_ran else "手势检测模式"
+            cv2.putText(canvas, mode_text, (10, canvas.shape[0] - 10),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+        return canvas
+
+    def _draw_face(self, canvas, result):
+        shape = result.landmarks
+
+        # 绘制人脸边界框，使用更明显的红色矩形
+        x, y, w, h = result.face_box
+        cv2.rectangle(canvas, (x, y), (x + w, y + h), (0, 0, 255), 2)
+
+        # 在画面上显示检测到的人脸数量
+        cv2.putText(canvas, f"FACES: {result.face_count}", (20, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+        cv2.putText(canvas, f"COUNTER: {result.blink_counter}", (300, 30),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+
+        # 绘制所有68个特征点
+        for px, py in shape:
+            cv2.circle(canvas, (int(px), int(py)), 3, (0, 255, 0), -1, 8)
+
+        # 绘制面部轮廓线
+        for start, end, closed in LANDMARK_OUTLINES:
+            for i in range(start, end):
+                cv2.line(canvas, tuple(shape[i]), tuple(shape[i + 1]), (0, 255, 0), 1)
+            if closed:
+                cv2.line(canvas, tuple(shape[end]), tuple(shape[start]), (0, 255, 0), 1)
+
+        # 眼睛和嘴部轮廓
+        cv2.polylines(canvas, list(result.features.outlines.values()), True, (0, 255, 0), 2)
+
+        if result.mar is not None:
+            cv2.putText(canvas, "MAR: {:.2f}".format(result.mar), (20, 100),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+            if result.yawning:
+                cv2.putText(canvas, "YAWNING", (50, 160),
+                            cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 0), 3)
+
+        if result.ear is not None:
+            cv2.putText(canvas, "EAR: {:.2f}".format(result.ear), (20, 70),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+
+        if result.gaze is not None:
+            self.gaze_estimator.draw(canvas, result.face_box, result.gaze)
+
+        if result.head_pose is not None and self.config.debug:
+            cv2.putText(canvas, "PITCH: {:.0f} YAW: {:.0f} ROLL: {:.0f}".format(*result.head_pose), (300, 70),
+                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
+
+    def _draw_hands(self, canvas, result):
+        cfg = self.config
+        if cfg.debug:
+            # 绘制手势边界框
+            for box in result.hand_boxes:
+                x1, y1, x2, y2 = map(int, box)
+                cv2.rectangle(canvas, (x1, y1), (x2, y2), (0, 255, 0), 2)
+
+        if result.gesture is None:
+            return
+
+        # 在画面上显示手势名称
+        x1, y1, x2, y2 = map(int, result.gesture_box)
+        cv2.putText(canvas, f"Gesture: {result.gesture}", (x1, y1 - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
+
+        # 绘制手势保持进度条：背景、进度（进行中为橙色，完成为绿色）
+        progress = min(1.0, result.gesture_hold / cfg.gesture_hold_time)
+        bar_width = int((x2 - x1) * progress)
+        cv2.rectangle(canvas, (x1, y2 + 5), (x2, y2 + 15), (100, 100, 100), -1)
+        bar_color = (255, 128, 0) if progress < 1.0 else (0, 255, 0)
+        cv2.rectangle(canvas, (x1, y2 + 5), (x1 + bar_width, y2 + 15), bar_color, -1)
+
+        # 在调试模式下显示手势保持时间
+        if cfg.debug:
+            cv2.putText(canvas, f"Hold: {result.gesture_hold:.1f}s / {cfg.gesture_hold_time:.1f}s",
+                        (x1, y2 + 30), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
@@ -0,0 +1,242 @@
+"""
+可查询的检测事件库（SQLite，WAL 模式）
+
+事件由后台线程批量写入，检测线程只把记录放入队列，不等待磁盘；
+事件表按时间和事件类型建索引，按时间范围/类型查询、分类型计数和导出
+都是索引查询。导出按自增 id 分批读取（游标分页），可从上次导出的位置继续。
+"""
+
+import csv
+import datetime
+import json
+import queue
+import sqlite3
+import threading
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts REAL NOT NULL,
+    timestamp TEXT NOT NULL,
+    event_type TEXT NOT NULL,
+    details TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_events_ts ON events (ts);
+CREATE INDEX IF NOT EXISTS idx_events_type_ts ON events (event_type, ts);
+CREATE TABLE IF NOT EXISTS export_cursors (
+    name TEXT PRIMARY KEY,
+    last_id INTEGER NOT NULL
+);
+"""
+
+_STOP = object()
+
+
+def _connect(path):
+    conn = sqlite3.connect(path, timeout=10)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.row_factory = sqlite3.Row
+    return conn
+
+
+def _to_epoch(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    return datetime.datetime.fromisoformat(value).timestamp()
+
+
+class EventStore:
+    """检测事件库
+
+    参数:
+        path: 数据库文件路径
+        encoder: json.JSONEncoder 子类，用于序列化事件详情中的 NumPy 类型
+        batch_size: 后台线程每个事务最多写入的事件数
+        max_queue: 写入队列上限，写入线程跟不上时丢弃新事件并计数
+    """
+
+    def __init__(self, path, encoder=None, batch_size=256, max_queue=10000):
+        self.path = path
+        self.encoder = encoder
+        self.batch_size = batch_size
+        self.dropped = 0
+
+        with _connect(path) as conn:
+            conn.executescript(SCHEMA)
+        conn.close()
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._writer = threading.Thread(target=self._write_loop, name="event-store", daemon=True)
+        self._writer.start()
+
+    def append(self, record):
+        """记录一个事件（不阻塞），record 含 timestamp（ISO 字符串或秒）、event_type、details"""
+        row = (_to_epoch(record['timestamp']),
+               record['timestamp'] if isinstance(record['timestamp'], str)
+               else datetime.datetime.fromtimestamp(record['timestamp']).isoformat(),
+               record['event_type'],
+               json.dumps(record.get('details') or {}, ensure_ascii=False, cls=self.encoder))
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    def _write_loop(self):
+        conn = _connect(self.path)
+        try:
+            while True:
+                item = self._queue.get()
+                batch = []
+                stop = item is _STOP
+                if not stop:
+                    batch.append(item)
+                # 合并队列中已有的事件，一个事务写入
+                while not stop and len(batch) < self.batch_size:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stop = True
+                    else:
+                        batch.append(item)
+                if batch:
+                    with conn:
+                        conn.executemany(
+                            "INSERT INTO events (ts, timestamp, event_type, details) VALUES (?, ?, ?, ?)", batch)
+                for _ in range(len(batch) + (1 if stop else 0)):
+                    self._queue.task_done()
+                if stop:
+                    break
+        finally:
+            conn.close()
+
+    def flush(self):
+        """等待队列中的事件全部写入"""
+        self._queue.join()
+
+    def close(self):
+        """写完剩余事件后停止后台线程"""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+
+    @staticmethod
+    def _where(start=None, end=None, event_types=None, after_id=None):
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(_to_epoch(start))
+        if end is not None:
+            clauses.append("ts < ?")
+            params.append(_to_epoch(end))
+        if event_types:
+            clauses.append(f"event_type IN ({','.join('?' * len(event_types))})")
+            params.extend(event_types)
+        if after_id is not None:
+            clauses.append("id > ?")
+            params.append(after_id)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    @staticmethod
+    def _row_to_event(row):
+        return {
+            'id': row['id'],
+            'timestamp': row['timestamp'],
+            'event_type': row['event_type'],
+            'details': json.loads(row['details']),
+        }
+
+    def query(self, start=None, end=None, event_types=None, after_id=None, limit=None):
+        """按时间范围 [start, end)、事件类型查询事件，按 id（写入顺序）排列"""
+        where, params = self._where(start, end, event_types, after_id)
+        sql = f"SELECT id, timestamp, event_type, details FROM events{where} ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        conn = _connect(self.path)
+        try:
+            return [self._row_to_event(row) for row in conn.execute(sql, params)]
+        finally:
+            conn.close()
+
+    def iter_events(self, start=None, end=None, event_types=None, after_id=0, batch=1000):
+        """分批读取事件：每批按 id > 上一批最后 id 查询，不会一次加载全部数据"""
+        last_id = after_id
+        while True:
+            rows = self.query(start, end, event_types, after_id=last_id, limit=batch)
+            if not rows:
+                return
+            yield from rows
+            last_id = rows[-1]['id']
+
+    def counts(self, start=None, end=None):
+        """各事件类型的数量"""
+        where, params = self._where(start, end)
+        conn = _connect(self.path)
+        try:
+            rows = conn.execute(f"SELECT event_type, COUNT(*) AS n FROM events{where} GROUP BY event_type", params)
+            return {row['event_type']: row['n'] for row in rows}
+        finally:
+            conn.close()
+
+    def get_cursor(self, name):
+        """上次导出到的事件 id，未导出过时为0"""
+        conn = _connect(self.path)
+        try:
+            row = conn.execute("SELECT last_id FROM export_cursors WHERE name = ?", (name,)).fetchone()
+            return row['last_id'] if row else 0
+        finally:
+            conn.close()
+
+    def set_cursor(self, name, last_id):
+        conn = _connect(self.path)
+        try:
+            with conn:
+                conn.execute("INSERT OR REPLACE INTO export_cursors (name, last_id) VALUES (?, ?)", (name, last_id))
+        finally:
+            conn.close()
+
+    def export_csv(self, path, start=None, end=None, event_types=None, cursor=None):
+        """导出事件到CSV，详情字段展开为列，返回导出的事件数
+
+        指定 cursor（导出名称）时只导出上次导出之后的新事件，完成后更新游标。
+        """
+        after_id = self.get_cursor(cursor) if cursor else 0
+
+        # 第一遍只收集列名，第二遍写入，两遍都是分批的索引查询；
+        # 第二遍只写到第一遍看到的最后一个事件，之间新写入的事件留给下次导出
+        columns, until_id = set(), after_id
+        for event in self.iter_events(start, end, event_types, after_id):
+            columns.update(event['details'].keys())
+            until_id = event['id']
+        fieldnames = ['id', 'timestamp', 'event_type'] + sorted(columns - {'id', 'timestamp', 'event_type'})
+
+        count, last_id = 0, after_id
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldnames, extrasaction='ignore')
+            writer.writeheader()
+            for event in self.iter_events(start, end, event_types, after_id):
+                if event['id'] > until_id:
+                    break
+                row = {'id': event['id'], 'timestamp': event['timestamp'], 'event_type': event['event_type']}
+                for key, value in event['details'].items():
+                    if key in row:
+                        continue
+                    row[key] = json.dumps(value) if isinstance(value, (dict, list)) else value
+                writer.writerow(row)
+                count += 1
+                last_id = event['id']
+
+        if cursor and count:
+            self.set_cursor(cursor, last_id)
+        return count
+
+
+def today_range():
+    """今天 0 点到明天 0 点的时间范围（秒）"""
+    today = datetime.date.today()
+    start = datetime.datetime.combine(today, datetime.time())
+    end = datetime.datetime.combine(today + datetime.timedelta(days=1), datetime.time())
+    return start.timestamp(), end.timestamp()
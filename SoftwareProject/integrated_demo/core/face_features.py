@@ -0,0 +1,102 @@
+"""
+人脸特征提取：由68点特征点一次计算双眼 EAR、嘴部 MAR、眼睛/嘴部轮廓和头部姿态求解用的点
+
+所有距离通过预先计算的索引数组一次向量化求出，既可处理单个人脸 (68, 2)，
+也可处理一批人脸 (N, 68, 2)（如离线回放时对整段视频的特征点批量计算）。
+"""
+
+from dataclasses import dataclass
+from typing import Dict
+
+import numpy as np
+from imutils import face_utils
+
+from .head_pose import POSE_LANDMARKS
+
+L_START, L_END = face_utils.FACIAL_LANDMARKS_IDXS["left_eye"]
+R_START, R_END = face_utils.FACIAL_LANDMARKS_IDXS["right_eye"]
+M_START, M_END = face_utils.FACIAL_LANDMARKS_IDXS["mouth"]
+
+
+def _ratio_pairs(start, a, b, c):
+    """长宽比 (|a|+|b|)/(2|c|) 用到的三对点，a/b/c 为相对 start 的点对"""
+    return [(start + i, start + j) for i, j in (a, b, c)]
+
+
+# 每行一对点，每3行对应一个长宽比：左眼、右眼、嘴部
+RATIO_PAIRS = np.array(
+    _ratio_pairs(L_START, (1, 5), (2, 4), (0, 3)) +
+    _ratio_pairs(R_START, (1, 5), (2, 4), (0, 3)) +
+    _ratio_pairs(M_START, (2, 9), (4, 7), (0, 6)),
+    dtype=np.intp)
+
+# 绘制用的轮廓：眼睛6个点、嘴唇外围12个点本身按轮廓顺序排列，不需要计算凸包
+OUTLINE_INDICES = {
+    "left_eye": np.arange(L_START, L_END),
+    "right_eye": np.arange(R_START, R_END),
+    "mouth": np.arange(M_START, M_START + 12),
+}
+
+POSE_INDICES = np.array(POSE_LANDMARKS, dtype=np.intp)
+
+
+@dataclass
+class FaceFeatures:
+    """单个人脸的特征"""
+    left_ear: float
+    right_ear: float
+    ear: float                        # 双眼平均
+    mar: float
+    outlines: Dict[str, np.ndarray]   # 名称 -> (K, 2) 轮廓点，int32，可直接用于 cv2.polylines
+    pose_points: np.ndarray           # (6, 2) float64，HeadPoseEstimator 的输入
+
+
+@dataclass
+class FeatureBatch:
+    """一批人脸的特征，各字段第一维为人脸序号"""
+    left_ear: np.ndarray              # (N,)
+    right_ear: np.ndarray
+    ear: np.ndarray
+    mar: np.ndarray
+    pose_points: np.ndarray           # (N, 6, 2)
+
+    def __len__(self):
+        return len(self.ear)
+
+
+def _aspect_ratios(points):
+    """points 为 (..., 68, 2)，返回 (..., 3)：左眼 EAR、右眼 EAR、MAR"""
+    diff = points[..., RATIO_PAIRS[:, 0], :] - points[..., RATIO_PAIRS[:, 1], :]
+    lengths = np.sqrt(np.einsum('...i,...i->...', diff, diff))
+    lengths = lengths.reshape(lengths.shape[:-1] + (3, 3))
+    return (lengths[..., 0] + lengths[..., 1]) / (2.0 * lengths[..., 2])
+
+
+def extract_features(shape):
+    """由 (68, 2) 特征点计算单个人脸的全部特征"""
+    points = np.asarray(shape, dtype=np.float64)
+    left_ear, right_ear, mar = _aspect_ratios(points)
+    outline_points = np.asarray(shape, dtype=np.int32)
+    return FaceFeatures(
+        left_ear=float(left_ear),
+        right_ear=float(right_ear),
+        ear=float((left_ear + right_ear) / 2.0),
+        mar=float(mar),
+        outlines={name: outline_points[idx] for name, idx in OUTLINE_INDICES.items()},
+        pose_points=points[POSE_INDICES],
+    )
+
+
+def extract_features_batch(shapes):
+    """由 (N, 68, 2) 特征点批量计算特征"""
+    points = np.asarray(shapes, dtype=np.float64)
+    if points.ndim != 3 or points.shape[1:] != (68, 2):
+        raise ValueError(f"特征点数组形状应为 (N, 68, 2)，实际为 {points.shape}")
+    ratios = _aspect_ratios(points)
+    return FeatureBatch(
+        left_ear=ratios[:, 0],
+        right_ear=ratios[:, 1],
+        ear=(ratios[:, 0] + ratios[:, 1]) / 2.0,
+        mar=ratios[:, 2],
+        pose_points=points[:, POSE_INDICES],
+    )
@@ -0,0 +1,110 @@
+"""
+人脸定位：在缩小的灰度图上运行 HOG 人脸检测，检测之间由上一帧的特征点推算人脸区域
+
+HOG 检测是疲劳检测中开销最大的一步。检测图像缩小到 detect_width 宽，
+检测框再按比例映射回原图；两次检测之间直接用上一帧特征点的外接框作为
+特征点模型的输入区域，每 redetect_interval 帧或特征点质量下降时才重新检测。
+"""
+
+import cv2
+import dlib
+import numpy as np
+
+MIN_TRACK_IOU = 0.5           # 新特征点外接框与输入区域的最小重合度，低于此值视为跟踪漂移
+MAX_SCALE_CHANGE = 1.4        # 相对上次检测框的最大尺寸变化比例
+
+
+def landmark_box(shape):
+    """特征点外接正方形 (left, top, right, bottom)，与 HOG 检测框的比例大致相同"""
+    x0, y0 = shape.min(axis=0)
+    x1, y1 = shape.max(axis=0)
+    side = max(x1 - x0, y1 - y0)
+    cx, cy = (x0 + x1) / 2.0, (y0 + y1) / 2.0
+    half = side / 2.0
+    return int(round(cx - half)), int(round(cy - half)), int(round(cx + half)), int(round(cy + half))
+
+
+def box_iou(a, b):
+    """两个 (left, top, right, bottom) 框的交并比"""
+    iw = min(a[2], b[2]) - max(a[0], b[0])
+    ih = min(a[3], b[3]) - max(a[1], b[1])
+    if iw <= 0 or ih <= 0:
+        return 0.0
+    inter = float(iw * ih)
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0
+
+
+class FaceTracker:
+    """人脸检测与跟踪
+
+    参数:
+        detector: dlib 人脸检测器
+        detect_width: 检测图像的宽度（像素），0 表示使用原图
+        redetect_interval: 两次检测之间最多跟踪的帧数，0 表示每帧都检测
+    """
+
+    def __init__(self, detector, detect_width=320, redetect_interval=10):
+        self.detector = detector
+        self.detect_width = detect_width
+        self.redetect_interval = redetect_interval
+        self.face_count = 0           # 最近一次检测到的人脸数
+        self.detections = 0           # 累计检测次数
+        self.tracked = 0              # 累计由特征点跟踪的帧数
+        self._small = None            # 缩小后的检测图像，尺寸不变时复用
+        self.reset()
+
+    def reset(self):
+        """丢弃跟踪状态，下一帧重新检测"""
+        self._roi = None              # 下一帧的特征点输入区域
+        self._detected_size = None    # 上次检测框的边长
+        self._frames_since_detect = 0
+
+    def predict(self):
+        """返回由上一帧特征点推算的人脸区域（dlib.rectangle）；需要重新检测时返回 None"""
+        if self._roi is None or self._frames_since_detect >= self.redetect_interval:
+            return None
+        self._frames_since_detect += 1
+        self.tracked += 1
+        return dlib.rectangle(*self._roi)
+
+    def detect(self, gray):
+        """在缩小的灰度图上检测人脸，返回映射回原图坐标的 dlib.rectangle 列表"""
+        height, width = gray.shape[:2]
+        scale = 1.0
+        if 0 < self.detect_width < width:
+            scale = self.detect_width / float(width)
+            small_shape = (int(round(height * scale)), self.detect_width)
+            if self._small is None or self._small.shape != small_shape:
+                self._small = np.empty(small_shape, dtype=gray.dtype)
+            gray = cv2.resize(gray, small_shape[::-1], dst=self._small, interpolation=cv2.INTER_AREA)
+        faces = self.detector(gray, 0)
+        if scale != 1.0:
+            faces = [dlib.rectangle(int(f.left() / scale), int(f.top() / scale),
+                                    int(f.right() / scale), int(f.bottom() / scale)) for f in faces]
+        else:
+            faces = list(faces)
+        self.face_count = len(faces)
+        self.detections += 1
+        self._frames_since_detect = 0
+        if faces:
+            self._detected_size = faces[0].width()
+        else:
+            self.reset()
+        return faces
+
+    def update(self, shape, face, frame_shape):
+        """根据本帧特征点更新下一帧的人脸区域；特征点质量下降时下一帧重新检测"""
+        if self.redetect_interval <= 0:
+            return
+        roi = landmark_box(np.asarray(shape))
+        used = (face.left(), face.top(), face.right(), face.bottom())
+        height, width = frame_shape[:2]
+        side = roi[2] - roi[0]
+        inside = roi[0] >= 0 and roi[1] >= 0 and roi[2] <= width and roi[3] <= height
+        scale_ok = (self._detected_size is not None and side > 0 and
+                    1.0 / MAX_SCALE_CHANGE <= side / float(self._detected_size) <= MAX_SCALE_CHANGE)
+        if inside and scale_ok and box_iou(roi, used) >= MIN_TRACK_IOU:
+            self._roi = roi
+        else:
+            self._roi = None
@@ -0,0 +1,306 @@
+"""
+共享内存帧总线：摄像头服务独占摄像头，把每帧写入共享内存环形缓冲，
+任意数量的进程（视线估计、疲劳检测、手势、录制）同时读取最新帧
+
+共享内存布局：
+    头部   magic | version | slots | height | width | channels | closed | seq | heartbeat
+    槽信息 每个槽 (seq, timestamp)
+    数据   slots 个 height × width × channels 的 uint8 图像
+
+写入第 seq 帧时先把对应槽的 seq 置 0，写完图像和时间戳后再写入槽 seq 和头部 seq。
+读取方直接返回共享内存上的 numpy 视图（不复制），之后用 BusFrame.valid() 检查
+该槽是否已被后续帧覆盖：写入方每写 slots 帧才回到同一个槽，读取方有 slots-1 帧的时间使用视图。
+"""
+
+import os
+import time
+from multiprocessing import shared_memory
+
+import cv2
+import numpy as np
+
+DEFAULT_BUS_NAME = "vmis_camera"
+BUS_MAGIC = b"VFBS"
+BUS_VERSION = 1
+DEFAULT_SLOTS = 4
+STALE_SECONDS = 2.0           # 超过该时间没有新帧视为摄像头服务已停止
+
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S4'), ('version', '<u4'), ('slots', '<u4'), ('height', '<u4'),
+    ('width', '<u4'), ('channels', '<u4'), ('closed', '<u4'), ('reserved', '<u4'),
+    ('seq', '<u8'), ('heartbeat', '<f8'),
+])
+SLOT_DTYPE = np.dtype([('seq', '<u8'), ('timestamp', '<f8')])
+DATA_ALIGN = 64
+
+
+def _data_offset(slots):
+    offset = HEADER_DTYPE.itemsize + SLOT_DTYPE.itemsize * slots
+    return (offset + DATA_ALIGN - 1) // DATA_ALIGN * DATA_ALIGN
+
+
+class _BusMemory:
+    """共享内存上的头部、槽信息和图像数组视图"""
+
+    def __init__(self, shm, slots, height, width, channels):
+        self.shm = shm
+        self.header = np.ndarray((), HEADER_DTYPE, shm.buf, 0)
+        self.slot_info = np.ndarray((slots,), SLOT_DTYPE, shm.buf, HEADER_DTYPE.itemsize)
+        shape = (slots, height, width, channels) if channels > 1 else (slots, height, width)
+        self.frames = np.ndarray(shape, np.uint8, shm.buf, _data_offset(slots))
+        self.slots = slots
+
+    def release(self):
+        # 释放 numpy 视图后才能关闭共享内存
+        self.header = self.slot_info = self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # 调用方仍持有 BusFrame.image 等视图，映射随这些视图回收时释放
+            pass
+
+
+class FrameBusWriter:
+    """帧总线写入端（摄像头服务进程中使用）
+
+    参数:
+        name: 共享内存名称
+        shape: 图像形状 (height, width) 或 (height, width, channels)
+        slots: 环形缓冲槽数
+    """
+
+    def __init__(self, name=DEFAULT_BUS_NAME, shape=(480, 640, 3), slots=DEFAULT_SLOTS):
+        height, width = shape[:2]
+        channels = shape[2] if len(shape) > 2 else 1
+        size = _data_offset(slots) + slots * height * width * channels
+        try:
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # 上次异常退出遗留的共享内存：仍有服务在写入时报错，否则重新创建
+            try:
+                old = FrameBusReader(name)
+            except ValueError as e:
+                raise FileExistsError(f"共享内存 {name} 已被其他程序占用（{e}），请使用其他总线名称") from None
+            running = not old.stale()
+            old.close()
+            if running:
+                raise FileExistsError(f"帧总线 {name} 已有摄像头服务在写入") from None
+            stale = shared_memory.SharedMemory(name=name)
+            stale.close()
+            stale.unlink()
+            shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.name = name
+        self._mem = _BusMemory(shm, slots, height, width, channels)
+        header = self._mem.header
+        header['magic'] = BUS_MAGIC
+        header['version'] = BUS_VERSION
+        header['slots'] = slots
+        header['height'] = height
+        header['width'] = width
+        header['channels'] = channels
+        header['closed'] = 0
+        header['seq'] = 0
+        header['heartbeat'] = time.time()
+        self._mem.slot_info['seq'] = 0
+        self.seq = 0
+
+    @property
+    def shape(self):
+        return self._mem.frames.shape[1:]
+
+    def next_buffer(self):
+        """返回下一帧要写入的槽（numpy 数组），可直接作为 cv2 的 dst 输出；写完后调用 commit"""
+        slot = (self.seq + 1) % self._mem.slots
+        self._mem.slot_info['seq'][slot] = 0    # 标记为正在写入，读取方视为无效
+        return self._mem.frames[slot]
+
+    def commit(self, timestamp=None):
+        """发布 next_buffer 中写好的帧，返回帧序号"""
+        timestamp = time.time() if timestamp is None else timestamp
+        seq = self.seq + 1
+        slot = seq % self._mem.slots
+        self._mem.slot_info['timestamp'][slot] = timestamp
+        self._mem.slot_info['seq'][slot] = seq
+        self._mem.header['seq'] = seq
+        self._mem.header['heartbeat'] = time.time()
+        self.seq = seq
+        return seq
+
+    def publish(self, frame, timestamp=None):
+        """复制一帧到共享内存并发布；尺寸不同时缩放到总线的尺寸"""
+        buffer = self.next_buffer()
+        if frame.shape == buffer.shape:
+            np.copyto(buffer, frame)
+        else:
+            cv2.resize(frame, (buffer.shape[1], buffer.shape[0]), dst=buffer, interpolation=cv2.INTER_AREA)
+        return self.commit(timestamp)
+
+    def close(self):
+        """标记总线已关闭并删除共享内存"""
+        self._mem.header['closed'] = 1
+        shm = self._mem.shm
+        self._mem.release()
+        shm.unlink()
+
+
+class BusFrame:
+    """总线上的一帧；image 为共享内存视图，使用期间应通过 valid() 确认未被覆盖"""
+
+    def __init__(self, reader, seq, timestamp, image):
+        self._reader = reader
+        self.seq = seq
+        self.timestamp = timestamp
+        self.image = image
+
+    def valid(self):
+        return self._reader._slot_seq(self.seq) == self.seq
+
+    def copy(self):
+        """复制图像；复制过程中被覆盖时返回 None"""
+        image = self.image.copy()
+        return image if self.valid() else None
+
+
+def _attach_shared_memory(name):
+    """附加到已有的共享内存
+
+    POSIX 系统上 SharedMemory 会把共享内存登记到 resource_tracker，进程退出时将其删除；
+    读取端只是附加，不拥有共享内存，附加期间跳过登记。
+    """
+    if os.name != "posix":
+        return shared_memory.SharedMemory(name=name)
+    from multiprocessing import resource_tracker
+    register = resource_tracker.register
+    resource_tracker.register = lambda *args, **kwargs: None
+    try:
+        return shared_memory.SharedMemory(name=name)
+    finally:
+        resource_tracker.register = register
+
+
+class FrameBusReader:
+    """帧总线读取端，可在任意进程中创建多个"""
+
+    def __init__(self, name=DEFAULT_BUS_NAME):
+        shm = _attach_shared_memory(name)
+        if shm.size < HEADER_DTYPE.itemsize:
+            shm.close()
+            raise ValueError(f"共享内存 {name} 不是帧总线")
+        header = np.ndarray((), HEADER_DTYPE, shm.buf, 0)
+        valid = bytes(header['magic']) == BUS_MAGIC and int(header['version']) == BUS_VERSION
+        if valid:
+            slots, height, width, channels = (int(header[k]) for k in ('slots', 'height', 'width', 'channels'))
+            valid = slots > 0 and shm.size >= _data_offset(slots) + slots * height * width * channels
+        del header
+        if not valid:
+            shm.close()
+            raise ValueError(f"共享内存 {name} 不是帧总线")
+        self.name = name
+        self._mem = _BusMemory(shm, slots, height, width, channels)
+
+    @property
+    def shape(self):
+        return self._mem.frames.shape[1:]
+
+    @property
+    def seq(self):
+        return int(self._mem.header['seq'])
+
+    @property
+    def closed(self):
+        return bool(self._mem.header['closed'])
+
+    def stale(self, max_age=STALE_SECONDS):
+        """写入端已关闭或长时间没有新帧"""
+        return self.closed or time.time() - float(self._mem.header['heartbeat']) > max_age
+
+    def _slot_seq(self, seq):
+        return int(self._mem.slot_info['seq'][seq % self._mem.slots])
+
+    def latest(self):
+        """返回最新一帧（BusFrame，不复制），还没有帧时返回 None"""
+        while True:
+            seq = self.seq
+            if seq == 0:
+                return None
+            slot = seq % self._mem.slots
+            timestamp = float(self._mem.slot_info['timestamp'][slot])
+            if self._slot_seq(seq) == seq:
+                return BusFrame(self, seq, timestamp, self._mem.frames[slot])
+            # 写入端已开始覆盖该槽（读取期间又写入了 slots 帧），重新读取最新序号
+
+    def wait(self, after_seq=0, timeout=1.0, poll=0.002):
+        """等待序号大于 after_seq 的新帧，超时或总线关闭时返回 None"""
+        deadline = time.monotonic() + timeout
+        while self.seq <= after_seq:
+            if self.closed or time.monotonic() >= deadline:
+                return None
+            time.sleep(poll)
+        return self.latest()
+
+    def close(self):
+        self._mem.release()
+
+
+class BusCapture:
+    """以 cv2.VideoCapture 的接口读取帧总线，read() 返回新帧的副本"""
+
+    def __init__(self, reader, timeout=1.0):
+        self.reader = reader
+        self.timeout = timeout
+        self.last_seq = 0
+        self.last_timestamp = None    # 最近一次读取的帧的采集时间
+
+    def isOpened(self):
+        # 摄像头服务退出（包括异常退出未标记关闭）后心跳停止更新，视为已关闭
+        return self.reader is not None and not self.reader.stale()
+
+    def read(self, image=None):
+        """与 VideoCapture.read 相同；传入形状一致的 image 时复制到其中，不再分配新数组"""
+        if self.reader is None:
+            return False, None
+        frame = self.reader.wait(self.last_seq, self.timeout)
+        if frame is None:
+            return False, None
+        if image is not None and image.shape == frame.image.shape:
+            np.copyto(image, frame.image)
+            if not frame.valid():
+                return False, None
+        else:
+            image = frame.copy()
+            if image is None:
+                return False, None
+        self.last_seq = frame.seq
+        self.last_timestamp = frame.timestamp
+        return True, image
+
+    def get(self, prop):
+        height, width = self.reader.shape[:2]
+        return {cv2.CAP_PROP_FRAME_WIDTH: width, cv2.CAP_PROP_FRAME_HEIGHT: height}.get(prop, 0.0)
+
+    def release(self):
+        if self.reader is not None:
+            self.reader.close()
+            self.reader = None
+
+
+def attach(name=DEFAULT_BUS_NAME):
+    """附加到正在运行的摄像头服务，服务未运行时返回 None"""
+    try:
+        reader = FrameBusReader(name)
+    except (FileNotFoundError, ValueError):
+        return None
+    if reader.stale():
+        reader.close()
+        return None
+    return reader
+
+
+def open_capture(device=0, api_preference=None, bus_name=DEFAULT_BUS_NAME):
+    """摄像头服务正在运行时从帧总线读取，否则直接打开摄像头"""
+    reader = attach(bus_name) if bus_name else None
+    if reader is not None:
+        return BusCapture(reader)
+    if api_preference is not None:
+        return cv2.VideoCapture(device, api_preference)
+    return cv2.VideoCapture(device)
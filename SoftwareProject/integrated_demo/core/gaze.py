@@ -0,0 +1,82 @@
+"""
+视线估计：复用检测引擎的人脸框和特征点，直接调用 L2CS 模型估计视线方向
+
+L2CS 的 Pipeline 自带 RetinaFace 人脸检测；与疲劳检测共用同一摄像头时，
+人脸检测只由引擎（dlib）做一次，这里以不加载检测器的方式创建 Pipeline，
+通过 Pipeline.step_boxes 对引擎给出的人脸估计视线。
+
+L2CS 模型在 RetinaFace 检测框裁出的人脸上训练，该框比 dlib HOG 检测框大
+（包括额头和两侧脸颊），因此输入区域由68点特征点按 RetinaFace 框的比例推算，
+而不是直接使用 HOG 检测框。
+"""
+
+import os
+import sys
+
+import numpy as np
+
+DEMO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+L2CS_DIR = os.path.join(os.path.dirname(DEMO_DIR), "L2CS_Net")
+DEFAULT_BUDGET_MS = 100.0     # 单帧延迟预算（毫秒），用于从模型库中选择模型
+
+# 特征点外接框（眉毛到下巴、两侧下颌）扩展为 RetinaFace 框的比例：
+# 左右各扩展宽度的比例，向上（额头）和向下扩展高度的比例
+CROP_SIDE_MARGIN = 0.08
+CROP_TOP_MARGIN = 0.30
+CROP_BOTTOM_MARGIN = 0.05
+
+
+def five_point_landmarks(shape):
+    """68点特征点转换为 RetinaFace 格式的5个点：左眼、右眼中心，鼻尖，左、右嘴角"""
+    return np.array([
+        shape[36:42].mean(axis=0),
+        shape[42:48].mean(axis=0),
+        shape[30],
+        shape[48],
+        shape[54],
+    ], dtype=np.float32)
+
+
+def face_crop_box(shape, frame_shape):
+    """由68点特征点推算与 RetinaFace 检测框比例相近的人脸框 (x_min, y_min, x_max, y_max)，裁剪到图像内"""
+    x0, y0 = shape.min(axis=0)
+    x1, y1 = shape.max(axis=0)
+    width, height = x1 - x0, y1 - y0
+    frame_height, frame_width = frame_shape[:2]
+    return (max(int(x0 - width * CROP_SIDE_MARGIN), 0),
+            max(int(y0 - height * CROP_TOP_MARGIN), 0),
+            min(int(x1 + width * CROP_SIDE_MARGIN), frame_width),
+            min(int(y1 + height * CROP_BOTTOM_MARGIN), frame_height))
+
+
+class GazeEstimator:
+    """对引擎给出的人脸估计视线
+
+    参数:
+        budget_ms: 单帧延迟预算，从 L2CS 模型库中选择不超过预算的最精确模型
+        device: 推理设备，"cpu" 或 GPU 序号如 "0"
+    """
+
+    def __init__(self, budget_ms=DEFAULT_BUDGET_MS, device="cpu"):
+        if L2CS_DIR not in sys.path:
+            sys.path.append(L2CS_DIR)
+        from l2cs import ModelZoo, draw_gaze, select_device
+
+        zoo = ModelZoo.load(os.path.join(L2CS_DIR, "models"))
+        self.profile = zoo.select(budget_ms)
+        self.pipeline = zoo.load_pipeline(self.profile, device=select_device(device, batch_size=1),
+                                          include_detector=False)
+        self._draw_gaze = draw_gaze
+
+    def estimate(self, frame, landmarks):
+        """landmarks 为68点特征点，返回 (pitch, yaw)（弧度），人脸区域无效时返回 None"""
+        box = face_crop_box(landmarks, frame.shape)
+        results = self.pipeline.step_boxes(frame, [box], [five_point_landmarks(landmarks)])
+        if len(results.pitch) == 0:
+            return None
+        return float(results.pitch[0]), float(results.yaw[0])
+
+    def draw(self, canvas, face_box, gaze):
+        """在人脸框中心绘制视线箭头"""
+        x, y, w, h = face_box
+        self._draw_gaze(x, y, w, h, canvas, gaze, color=(0, 0, 255))
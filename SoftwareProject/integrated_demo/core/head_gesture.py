@@ -0,0 +1,53 @@
+"""
+点头/摇头检测器的公共部分：动作判定参数、显示计数、冷却期和检测后的等待期
+
+具体的检测器见 core/head_pose.py（根据特征点求解的头部姿态角判断动作）。
+"""
+
+from abc import ABC, abstractmethod
+
+DIRECTION_CHANGES = 2     # 摇头方向变换次数阈值
+DOMINANCE_RATIO = 2.0     # 主导方向比例阈值 (增加以要求更明确的垂直运动)
+DISPLAY_DURATION = 45     # 检测到动作后文本显示持续帧数
+
+
+class HeadGestureBase(ABC):
+    """点头/摇头检测器的公共状态：显示计数、冷却期和检测后的等待期
+
+    所有时间均使用调用方传入的时间戳（秒），实时检测和视频回放行为一致。
+    子类实现 reset_tracks 和 _clear_history，分别对应跟踪中断和检测到动作后的清理。
+    """
+    def __init__(self, nod_threshold, shake_threshold):
+        self.nod_threshold = nod_threshold
+        self.shake_threshold = shake_threshold
+        self.gesture_status = {"nod": 0, "shake": 0}  # 动作状态计数，用于控制显示
+        self.lost_counter = 0               # 连续跟踪丢失计数
+        self.debug_info = {}                # 调试信息
+        self.last_gesture_time = float('-inf')  # 上次检测到手势的时间
+        self.cooldown_period = 1.5          # 手势检测冷却期（秒）
+        self.ready_for_detection = True     # 是否已准备好检测
+        self.wait_after_detection = False   # 检测到点头摇头后的等待标志
+        self.wait_until_time = 0            # 等待结束的时间点
+
+    def in_cooldown(self, now):
+        """是否在上次检测到动作后的冷却期内"""
+        self.ready_for_detection = now - self.last_gesture_time >= self.cooldown_period
+        return not self.ready_for_detection
+
+    @abstractmethod
+    def reset_tracks(self):
+        """跟踪中断（如人脸丢失）时清空跟踪状态和运动历史"""
+
+    def reset_counters(self, detected_gesture, now):
+        """检测到动作后重置计数器，触发显示计数"""
+        if detected_gesture in self.gesture_status:
+            self.gesture_status[detected_gesture] = DISPLAY_DURATION
+            self._clear_history()
+
+        # 设置2秒的等待期，在此期间不进行面部检测
+        self.wait_after_detection = True
+        self.wait_until_time = now + 2.0  # 当前时间加2秒
+
+    @abstractmethod
+    def _clear_history(self):
+        """检测到动作后清空运动历史，避免同一段运动被重复判定"""
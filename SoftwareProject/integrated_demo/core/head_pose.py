@@ -0,0 +1,181 @@
+"""
+头部姿态估计：用 dlib 的68个特征点和三维人脸模型求解 solvePnP，得到俯仰/偏航/翻滚角，
+再根据姿态角的时间序列判断点头/摇头
+
+特征点已由疲劳检测计算，姿态估计只需对6个点求解一次 PnP，不需要在整幅灰度图上
+计算光流，也不需要保留上一帧图像。
+"""
+
+import math
+
+import cv2
+import numpy as np
+
+from .head_gesture import DIRECTION_CHANGES, DOMINANCE_RATIO, HeadGestureBase
+
+NOD_PITCH_THRESHOLD = 12.0    # 点头俯仰角变化阈值（度）
+SHAKE_YAW_THRESHOLD = 15.0    # 摇头偏航角变化阈值（度）
+MIN_ANGLE_STEP = 3.0          # 判定方向变化的最小角度（度），过滤特征点抖动
+POSE_WINDOW = 1.5             # 分析的时间窗口（秒）
+POSE_HISTORY = 64             # 姿态角环形缓冲容量（帧）
+
+# 参与求解的特征点：鼻尖、下巴、左眼外角、右眼外角、左嘴角、右嘴角
+POSE_LANDMARKS = [30, 8, 36, 45, 48, 54]
+
+# 对应的三维人脸模型坐标（与相机坐标系同向：x 向右，y 向下，z 远离相机）
+MODEL_POINTS = np.array([
+    (0.0, 0.0, 0.0),          # 鼻尖
+    (0.0, 330.0, 65.0),       # 下巴
+    (-225.0, -170.0, 135.0),  # 左眼外角
+    (225.0, -170.0, 135.0),   # 右眼外角
+    (-150.0, 150.0, 125.0),   # 左嘴角
+    (150.0, 150.0, 125.0),    # 右嘴角
+], dtype=np.float64)
+
+
+class HeadPoseEstimator:
+    """由68点特征点求解头部姿态角
+
+    相机内参按画面尺寸近似（焦距取画面宽度，主点取画面中心）并缓存；
+    上一帧的解作为下一帧迭代求解的初值。
+    """
+
+    def __init__(self):
+        self._camera_matrix = None
+        self._camera_size = None
+        self._dist_coeffs = np.zeros((4, 1), dtype=np.float64)
+        self.rvec = None
+        self.tvec = None
+
+    def camera_matrix(self, frame_shape):
+        size = tuple(frame_shape[:2])
+        if size != self._camera_size:
+            height, width = size
+            self._camera_matrix = np.array([[width, 0, width / 2.0],
+                                            [0, width, height / 2.0],
+                                            [0, 0, 1]], dtype=np.float64)
+            self._camera_size = size
+            self.reset()
+        return self._camera_matrix
+
+    def reset(self):
+        """丢弃上一帧的解（人脸丢失后重新求解）"""
+        self.rvec = self.tvec = None
+
+    def estimate(self, image_points, frame_shape):
+        """image_points 为 POSE_LANDMARKS 对应的 (6, 2) 图像坐标（见 face_features），
+        返回 (pitch, yaw, roll)（度），求解失败时返回 None"""
+        camera = self.camera_matrix(frame_shape)
+        image_points = np.ascontiguousarray(image_points, dtype=np.float64)
+        use_guess = self.rvec is not None
+        ok, rvec, tvec = cv2.solvePnP(MODEL_POINTS, image_points, camera, self._dist_coeffs,
+                                      self.rvec, self.tvec, use_guess, cv2.SOLVEPNP_ITERATIVE)
+        if not ok or tvec[2, 0] <= 0:
+            self.reset()
+            return None
+        self.rvec, self.tvec = rvec, tvec
+        return rotation_to_euler(cv2.Rodrigues(rvec)[0])
+
+
+def rotation_to_euler(R):
+    """旋转矩阵（R = Rz·Ry·Rx）转换为 (pitch, yaw, roll)（度）"""
+    pitch = math.atan2(R[2, 1], R[2, 2])
+    yaw = math.atan2(-R[2, 0], math.hypot(R[2, 1], R[2, 2]))
+    roll = math.atan2(R[1, 0], R[0, 0])
+    return math.degrees(pitch), math.degrees(yaw), math.degrees(roll)
+
+
+def count_reversals(values, min_step=MIN_ANGLE_STEP):
+    """角度序列的方向变化次数，变化小于 min_step 的抖动不计入"""
+    reversals = 0
+    direction = 0                 # 当前运动方向：1 增大，-1 减小，0 尚未确定
+    anchor = values[0]            # 当前方向上的极值
+    for value in values[1:]:
+        delta = value - anchor
+        if direction == 0:
+            if abs(delta) >= min_step:
+                direction = 1 if delta > 0 else -1
+                anchor = value
+        elif delta * direction > 0:
+            anchor = value
+        elif abs(delta) >= min_step:
+            # 反向运动超过 min_step，记为一次方向变化
+            direction = -direction
+            anchor = value
+            reversals += 1
+    return reversals
+
+
+class PoseGestureDetector(HeadGestureBase):
+    """根据头部姿态角时间序列判断点头/摇头
+
+    点头：俯仰角偏离窗口起点超过阈值后回摆，且俯仰变化明显大于偏航变化；
+    低头后不抬起（如打瞌睡）不算点头。
+    摇头：偏航角变化超过阈值，方向变换次数达到 DIRECTION_CHANGES，且偏航变化明显大于俯仰变化。
+    """
+
+    def __init__(self, nod_threshold=NOD_PITCH_THRESHOLD, shake_threshold=SHAKE_YAW_THRESHOLD):
+        super().__init__(nod_threshold, shake_threshold)
+        self.samples = np.zeros((POSE_HISTORY, 3), dtype=np.float64)   # (时间戳, pitch, yaw)
+        self.count = 0
+        self.head = 0
+
+    def reset_tracks(self):
+        """清空姿态历史（人脸丢失或阈值变化后避免误检测）"""
+        self.count = 0
+        self.head = 0
+
+    def _clear_history(self):
+        self.reset_tracks()
+
+    def update(self, pitch, yaw, t):
+        self.samples[self.head] = (t, pitch, yaw)
+        self.head = (self.head + 1) % POSE_HISTORY
+        self.count = min(self.count + 1, POSE_HISTORY)
+        self.lost_counter = 0
+
+    def window(self, now):
+        """时间窗口内的样本，按时间顺序"""
+        order = (np.arange(self.head - self.count, self.head)) % POSE_HISTORY
+        samples = self.samples[order]
+        return samples[samples[:, 0] >= now - POSE_WINDOW]
+
+    def analyze_motion(self, now):
+        """分析窗口内的姿态变化，判断是否构成点头或摇头动作"""
+        if self.in_cooldown(now):
+            return None
+
+        samples = self.window(now)
+        if len(samples) < 5:
+            return None
+        pitch, yaw = samples[:, 1], samples[:, 2]
+        pitch_range = float(np.ptp(pitch))
+        yaw_range = float(np.ptp(yaw))
+
+        deviation = pitch - pitch[0]
+        peak = int(np.argmax(np.abs(deviation)))
+        amplitude = float(abs(deviation[peak]))
+        returned = float(abs(pitch[-1] - pitch[peak]))
+
+        self.debug_info = {
+            'pitch': float(pitch[-1]),
+            'yaw': float(yaw[-1]),
+            'pitch_range': pitch_range,
+            'yaw_range': yaw_range,
+            'nod_amplitude': amplitude,
+            'samples': len(samples),
+        }
+
+        if (amplitude > self.nod_threshold and returned > amplitude * 0.5 and
+                pitch_range > yaw_range * DOMINANCE_RATIO):
+            self.last_gesture_time = now
+            return "nod"
+
+        if yaw_range > self.shake_threshold and yaw_range > pitch_range * DOMINANCE_RATIO:
+            reversals = count_reversals(yaw)
+            self.debug_info['reversals'] = reversals
+            if reversals >= DIRECTION_CHANGES:
+                self.last_gesture_time = now
+                return "shake"
+
+        return None
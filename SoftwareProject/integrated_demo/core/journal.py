@@ -0,0 +1,147 @@
+"""
+检测事件的持久化：按大小轮转的追加式事件日志（JSON Lines）和固定大小的前端状态快照
+
+两者的写入开销都与运行时长无关：事件日志每个事件只追加一行，
+快照只包含当前状态和最近N个事件，通过临时文件+重命名原子替换，
+读取方（如 Django 的 status 接口）不会读到写了一半的文件。
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+
+
+class EventJournal:
+    """按大小轮转的事件日志
+
+    当前文件为 <directory>/<prefix>.jsonl，超过 max_bytes 后依次重命名为
+    <prefix>.1.jsonl、<prefix>.2.jsonl……，最多保留 backup_count 个旧文件。
+
+    参数:
+        directory: 日志目录
+        prefix: 文件名前缀
+        max_bytes: 单个文件的最大字节数
+        backup_count: 保留的旧文件数
+        encoder: json.JSONEncoder 子类，用于序列化 NumPy 等类型
+    """
+
+    def __init__(self, directory, prefix="events", max_bytes=8 << 20, backup_count=10, encoder=None):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.encoder = encoder
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path(), 'a', encoding='utf-8')
+
+    def path(self, index=0):
+        """第 index 个文件的路径，0 为当前文件"""
+        suffix = f".{index}" if index else ""
+        return os.path.join(self.directory, f"{self.prefix}{suffix}.jsonl")
+
+    def append(self, record):
+        """追加一条事件记录（字典）"""
+        line = json.dumps(record, ensure_ascii=False, cls=self.encoder) + "\n"
+        with self._lock:
+            if self._file.tell() + len(line.encode('utf-8')) > self.max_bytes and self._file.tell() > 0:
+                self._rotate()
+            self._file.write(line)
+            self._file.flush()
+
+    def _rotate(self):
+        self._file.close()
+        for i in range(self.backup_count, 0, -1):
+            src = self.path(i - 1)
+            if not os.path.exists(src):
+                continue
+            if i == self.backup_count and os.path.exists(self.path(i)):
+                os.remove(self.path(i))
+            os.replace(src, self.path(i))
+        self._file = open(self.path(), 'a', encoding='utf-8')
+
+    def files(self):
+        """现存的日志文件，从最旧到最新"""
+        paths = [self.path(i) for i in range(self.backup_count, -1, -1)]
+        return [p for p in paths if os.path.exists(p)]
+
+    def records(self):
+        """按时间顺序读取全部事件记录，跳过损坏的行"""
+        with self._lock:
+            self._file.flush()
+            paths = self.files()
+        for path in paths:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        continue
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class StateSnapshot:
+    """前端状态快照：当前状态字段 + 最近 max_events 个事件（新的在前）
+
+    state 为普通字典，调用方直接修改字段，write() 时整体原子写入。
+    写出的 JSON 中 last_events 为最近事件列表，total_events 为累计事件数，
+    与原先 detection_data.json 的字段保持兼容。
+    """
+
+    def __init__(self, path, max_events=50, encoder=None):
+        self.path = path
+        self.encoder = encoder
+        self.state = {}
+        self.recent_events = deque(maxlen=max_events)
+        self.total_events = 0
+
+    def load(self):
+        """读取已有快照，旧文件中超出上限的事件只保留最近的部分，返回是否读取成功"""
+        if not os.path.exists(self.path):
+            return False
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        events = data.pop('last_events', [])
+        self.total_events = data.pop('total_events', len(events))
+        self.state.update(data)
+        self.recent_events.clear()
+        # 快照中新事件在前，deque 中按时间顺序存放
+        self.recent_events.extend(reversed(events[:self.recent_events.maxlen]))
+        return True
+
+    def add_event(self, event):
+        self.recent_events.append(event)
+        self.total_events += 1
+
+    def to_dict(self):
+        data = dict(self.state)
+        data['last_events'] = list(reversed(self.recent_events))
+        data['total_events'] = self.total_events
+        return data
+
+    def write(self, path=None, retries=5):
+        """原子写入快照：先写同目录下的临时文件，再重命名覆盖目标文件"""
+        path = path or self.path
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".snapshot_", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self.to_dict(), f, ensure_ascii=False, cls=self.encoder)
+            for attempt in range(retries):
+                try:
+                    os.replace(tmp_path, path)
+                    return
+                except PermissionError:
+                    # Windows 上目标文件正被读取时无法替换，稍后重试
+                    if attempt == retries - 1:
+                        raise
+                    time.sleep(0.01)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
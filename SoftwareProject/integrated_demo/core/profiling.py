@@ -0,0 +1,50 @@
+"""
+分阶段耗时统计，用于性能测试
+"""
+
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+import numpy as np
+
+
+class StageTimer:
+    """按阶段名累计耗时样本，可在多个工作线程中同时使用"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)   # 阶段名 -> 耗时列表（秒）
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            self.samples[name].append(seconds)
+
+    @contextmanager
+    def measure(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def reset(self):
+        with self._lock:
+            self.samples.clear()
+
+    def summary(self):
+        """{阶段名: {count, mean_ms, p50_ms, p95_ms, max_ms, total_ms}}"""
+        with self._lock:
+            items = {name: np.asarray(values) * 1000.0 for name, values in self.samples.items()}
+        return {
+            name: {
+                'count': int(ms.size),
+                'mean_ms': float(ms.mean()),
+                'p50_ms': float(np.percentile(ms, 50)),
+                'p95_ms': float(np.percentile(ms, 95)),
+                'max_ms': float(ms.max()),
+                'total_ms': float(ms.sum()),
+            }
+            for name, ms in items.items() if ms.size
+        }
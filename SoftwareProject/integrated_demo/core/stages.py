@@ -0,0 +1,183 @@
+"""
+多线程处理流水线的基础组件：有界丢旧队列、帧率统计和处理阶段线程
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+import numpy as np
+
+
+@dataclass
+class FramePacket:
+    """在各阶段之间传递的一帧图像"""
+    frame_id: int
+    timestamp: float
+    frame: np.ndarray
+    buffer: Any = None            # frame 所在的缓冲池缓冲（core.buffer_pool.PooledBuffer），可为None
+
+    def retain(self):
+        if self.buffer is not None:
+            self.buffer.retain()
+        return self
+
+    def release(self):
+        if self.buffer is not None:
+            self.buffer.release()
+
+
+@dataclass
+class AnalysisResult:
+    """分析阶段的输出：与原始帧同尺寸的叠加层（黑色像素表示透明）"""
+    frame_id: int
+    timestamp: float
+    overlay: np.ndarray
+    buffer: Any = None            # overlay 所在的缓冲池缓冲，可为None
+
+    def retain(self):
+        if self.buffer is not None:
+            self.buffer.retain()
+        return self
+
+    def release(self):
+        if self.buffer is not None:
+            self.buffer.release()
+
+
+class DropOldestQueue:
+    """有界队列，满时丢弃最旧的元素，生产者永远不会被阻塞
+
+    参数:
+        maxsize: 队列容量
+        on_drop: 元素被丢弃（队列满或清空）时的回调 on_drop(item)，如释放帧缓冲
+    """
+
+    def __init__(self, maxsize=2, on_drop: Optional[Callable[[Any], None]] = None):
+        self.maxsize = maxsize
+        self.on_drop = on_drop
+        self._items = deque()
+        self._cond = threading.Condition()
+        self.dropped = 0          # 因队列满而丢弃的元素数
+
+    def put(self, item):
+        dropped = None
+        with self._cond:
+            if len(self._items) >= self.maxsize:
+                dropped = self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+        if dropped is not None and self.on_drop is not None:
+            self.on_drop(dropped)
+
+    def get(self, timeout=None):
+        """取出最早的元素，超时返回None"""
+        with self._cond:
+            if not self._cond.wait_for(lambda: len(self._items) > 0, timeout):
+                return None
+            return self._items.popleft()
+
+    def clear(self):
+        with self._cond:
+            items = list(self._items)
+            self._items.clear()
+        if self.on_drop is not None:
+            for item in items:
+                self.on_drop(item)
+
+    def __len__(self):
+        return len(self._items)
+
+
+class FpsMeter:
+    """按固定时间间隔统计帧率和平均处理耗时"""
+
+    def __init__(self, interval=1.0):
+        self.interval = interval
+        self.fps = 0.0
+        self.busy_ms = 0.0        # 最近一个统计周期内单帧平均处理耗时
+        self._count = 0
+        self._busy = 0.0
+        self._start = time.perf_counter()
+
+    def tick(self, busy=0.0):
+        now = time.perf_counter()
+        self._count += 1
+        self._busy += busy
+        elapsed = now - self._start
+        if elapsed >= self.interval:
+            self.fps = self._count / elapsed
+            self.busy_ms = self._busy * 1000.0 / self._count
+            self._count = 0
+            self._busy = 0.0
+            self._start = now
+
+
+class Stage(threading.Thread):
+    """流水线中的一个处理阶段，运行在独立线程上
+
+    参数:
+        name: 阶段名称（用于统计显示）
+        work: 处理函数。有输入队列时以取出的元素调用，否则无参调用；
+              返回False表示本次没有产出，不计入帧率
+        inbox: 输入队列（DropOldestQueue），为None时为源阶段（如采集）
+        on_error: 异常回调 on_error(stage_name, exception)
+        on_done: 输入元素处理完（包括出错）后的回调 on_done(item)，如释放帧缓冲
+    """
+
+    def __init__(self, name, work: Callable[..., Any], inbox: Optional[DropOldestQueue] = None,
+                 on_error: Optional[Callable[[str, Exception], None]] = None,
+                 on_done: Optional[Callable[[Any], None]] = None):
+        super().__init__(name=name, daemon=True)
+        self.work = work
+        self.inbox = inbox
+        self.on_error = on_error
+        self.on_done = on_done
+        self.meter = FpsMeter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            if self.inbox is not None:
+                item = self.inbox.get(timeout=0.1)
+                if item is None:
+                    continue
+                args = (item,)
+            else:
+                args = ()
+
+            start = time.perf_counter()
+            try:
+                produced = self.work(*args)
+            except Exception as e:
+                if self.on_error is not None:
+                    self.on_error(self.name, e)
+                continue
+            finally:
+                if args and self.on_done is not None:
+                    self.on_done(args[0])
+            if produced is not False:
+                self.meter.tick(time.perf_counter() - start)
+
+    def stop(self):
+        self._stop_event.set()
+
+    def describe(self):
+        """单个阶段的统计文本，如 "分析 12.3fps 45ms 队列1/2 丢弃17" """
+        text = f"{self.name} {self.meter.fps:.1f}fps {self.meter.busy_ms:.0f}ms"
+        if self.inbox is not None:
+            text += f" 队列{len(self.inbox)}/{self.inbox.maxsize} 丢弃{self.inbox.dropped}"
+        return text
+
+
+def compose_overlay(frame, overlay, mask=None):
+    """将叠加层中的非黑色像素绘制到帧上（原地修改）
+
+    mask 为可选的 (高, 宽) bool 缓冲，传入时不再为掩码分配内存。
+    """
+    mask = np.any(overlay, axis=2, out=mask)
+    np.copyto(frame, overlay, where=mask[..., None])
+    return frame
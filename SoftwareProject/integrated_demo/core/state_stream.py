@@ -0,0 +1,180 @@
+"""
+检测状态推送：通过本机 TCP 连接把状态变化实时推送给订阅方（Django 服务）
+
+协议为每行一个 JSON 消息（UTF-8）:
+    {"type": "snapshot", "seq": n, "state": {...}}               连接建立或需要重新同步时的完整状态
+    {"type": "delta", "seq": n, "changes": {...}, "removed": [...]}  与上一条相比变化的字段
+    {"type": "event", "seq": n, "event": {...}}                  检测事件（与事件日志格式相同）
+
+seq 在发布方单调递增。发送由后台线程完成，检测线程只做字段比较和入队；
+发送时不持有发布锁，订阅方处理过慢（发送超时）时只阻塞发送线程，超时后断开，
+重连后从完整状态重新开始。所有消息（包括新连接的完整状态）都由发送线程发出，
+同一连接上的消息按 seq 顺序到达。
+"""
+
+import json
+import queue
+import socket
+import threading
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+_WAKE = object()              # 唤醒发送线程处理新连接的占位消息
+
+
+class StatePublisher:
+    """状态发布方
+
+    参数:
+        host, port: 监听地址，默认只监听本机
+        encoder: json.JSONEncoder 子类，用于序列化 NumPy 类型
+        send_timeout: 单个订阅方的发送超时（秒），超时即断开
+    """
+
+    def __init__(self, host=DEFAULT_HOST, port=DEFAULT_PORT, encoder=None, send_timeout=1.0):
+        self.host = host
+        self.port = port
+        self.encoder = encoder
+        self.send_timeout = send_timeout
+
+        self._state = {}          # 最近一次发布的状态（已转换为 JSON 基本类型）
+        self._seq = 0
+        self._lock = threading.Lock()
+        self._clients = []
+        self._joining = []        # 已接受、尚未发送完整状态的连接
+        self._outbox = queue.Queue(maxsize=256)
+        self._resync = False      # 发送队列溢出后，下一条改发完整状态
+        self._server = None
+        self._running = False
+
+    def start(self):
+        """开始监听，端口被占用时抛出 OSError"""
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind((self.host, self.port))
+        self._server.listen(8)
+        self._running = True
+        threading.Thread(target=self._accept_loop, name="state-accept", daemon=True).start()
+        threading.Thread(target=self._send_loop, name="state-send", daemon=True).start()
+
+    @property
+    def client_count(self):
+        return len(self._clients)
+
+    def _encode(self, message):
+        return (json.dumps(message, ensure_ascii=False, cls=self.encoder) + "\n").encode('utf-8')
+
+    def _snapshot_message(self):
+        return {'type': 'snapshot', 'seq': self._seq, 'state': self._state}
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                break
+            conn.settimeout(self.send_timeout)
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            # 完整状态由发送线程发出，保证新订阅方先收到完整状态再收到后续增量
+            with self._lock:
+                self._joining.append(conn)
+            try:
+                self._outbox.put_nowait(_WAKE)
+            except queue.Full:
+                pass              # 发送线程正忙，处理下一条消息时会一并处理新连接
+
+    def _send_loop(self):
+        sent_seq = -1             # 已发送给现有连接的最大 seq
+        while self._running:
+            message = self._outbox.get()
+            if message is None:
+                break
+            # 锁内只取出待发送的内容；发送可能阻塞到 send_timeout，期间不能阻塞 publish
+            with self._lock:
+                joining, self._joining = self._joining, []
+                snapshot = self._snapshot_message() if joining else None
+                if self._resync:
+                    self._resync = False
+                    message = self._snapshot_message()
+                clients = list(self._clients)
+
+            if message is not _WAKE and message['seq'] > sent_seq:
+                # 重新同步发出的完整状态之后，队列中更早的消息不再发送
+                sent_seq = message['seq']
+                data = self._encode(message)
+                for conn in clients:
+                    self._send(conn, data)
+            if joining:
+                # 完整状态晚于本轮消息生成，之后入队的消息 seq 都更大
+                data = self._encode(snapshot)
+                for conn in joining:
+                    try:
+                        conn.sendall(data)
+                    except OSError:
+                        _shutdown(conn)
+                        continue
+                    with self._lock:
+                        if self._running:
+                            self._clients.append(conn)
+                        else:
+                            _shutdown(conn)
+
+    def _send(self, conn, data):
+        try:
+            conn.sendall(data)
+        except OSError:
+            with self._lock:
+                if conn in self._clients:
+                    self._clients.remove(conn)
+            _shutdown(conn)
+
+    def _enqueue(self, message):
+        if not self._clients:
+            return                # 新连接会在加入时收到完整状态
+        try:
+            self._outbox.put_nowait(message)
+        except queue.Full:
+            self._resync = True
+
+    def publish(self, state):
+        """发布当前状态，只发送变化的字段；state 中不应包含事件列表"""
+        # 统一转换为 JSON 基本类型再比较，NumPy 数值与等值的 Python 数值视为相同
+        state = json.loads(json.dumps(state, ensure_ascii=False, cls=self.encoder))
+        with self._lock:
+            changes = {k: v for k, v in state.items() if self._state.get(k, object()) != v}
+            removed = [k for k in self._state if k not in state]
+            if not changes and not removed:
+                return
+            self._state = state
+            self._seq += 1
+            message = {'type': 'delta', 'seq': self._seq, 'changes': changes, 'removed': removed}
+        self._enqueue(message)
+
+    def publish_event(self, event):
+        """发布一个检测事件"""
+        with self._lock:
+            self._seq += 1
+            message = {'type': 'event', 'seq': self._seq, 'event': event}
+        self._enqueue(message)
+
+    def close(self):
+        self._running = False
+        if self._server is not None:
+            # 唤醒阻塞在 accept 上的线程并停止监听
+            _shutdown(self._server)
+        self._outbox.put(None)
+        with self._lock:
+            for conn in self._clients + self._joining:
+                _shutdown(conn)
+            self._clients = []
+            self._joining = []
+
+
+def _shutdown(conn):
+    # shutdown 后对方立即收到连接结束，单独 close 在其他线程仍引用套接字时不会发送
+    try:
+        conn.shutdown(socket.SHUT_RDWR)
+    except OSError:
+        pass
+    conn.close()
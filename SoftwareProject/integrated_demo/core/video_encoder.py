@@ -0,0 +1,196 @@
+"""
+后台视频编码：录制帧放入有界队列，由独立线程编码写入文件
+
+写入文件的帧率按实际到达帧的时间戳测量，输出视频按时间戳对齐
+（丢帧处重复上一帧），时长与真实经过的时间一致。
+"""
+
+import threading
+import time
+from collections import deque
+
+import cv2
+
+DROP_POLICIES = ('oldest', 'newest', 'block')
+
+
+class VideoEncoder(threading.Thread):
+    """后台视频编码线程
+
+    参数:
+        path: 输出文件路径
+        fourcc: 编码器四字符码
+        fps: 输出帧率，None 表示按前 probe_frames 帧的时间戳测量
+        queue_size: 待编码帧队列上限
+        drop_policy: 队列满时的处理方式：'oldest' 丢弃最旧帧，'newest' 丢弃新到的帧，
+                     'block' 阻塞写入方直到有空位（最多 block_timeout 秒，超时丢弃新帧）
+        probe_frames: 测量帧率使用的帧数
+        block_timeout: 'block' 策略的最长等待时间（秒）
+    """
+
+    def __init__(self, path, fourcc='mp4v', fps=None, queue_size=60, drop_policy='oldest',
+                 probe_frames=30, block_timeout=0.5):
+        super().__init__(name="video-encoder", daemon=True)
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"不支持的丢帧策略: {drop_policy}")
+        self.path = path
+        self.fourcc = fourcc
+        self.fps = fps
+        self.queue_size = queue_size
+        self.drop_policy = drop_policy
+        self.probe_frames = probe_frames
+        self.block_timeout = block_timeout
+
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._closing = False
+        self._writer = None
+        self._start_time = None   # 第一帧的时间戳，输出视频的零点
+        self._next_index = 0      # 下一帧在输出视频中的序号
+
+        self.dropped = 0          # 因队列满丢弃的帧数
+        self.written = 0          # 写入文件的帧数（含对齐重复的帧）
+        self.encode_ms = 0.0      # 单帧编码耗时（指数平均）
+        self.encode_max_ms = 0.0
+        self.error = None
+
+    def write(self, frame, timestamp=None, release=None):
+        """提交一帧（调用方之后不能再修改该帧），返回是否进入队列
+
+        参数:
+            release: 可选回调，该帧编码完成或被丢弃后调用（如把帧缓冲还给缓冲池）
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        accepted, dropped = True, None
+        with self._cond:
+            if self._closing:
+                accepted = False
+            elif len(self._queue) >= self.queue_size:
+                if self.drop_policy == 'oldest':
+                    dropped = self._queue.popleft()[2]
+                    self.dropped += 1
+                elif self.drop_policy == 'newest' or not self._cond.wait_for(
+                        lambda: len(self._queue) < self.queue_size or self._closing, self.block_timeout):
+                    self.dropped += 1
+                    accepted = False
+                elif self._closing:
+                    # 等待期间编码线程已退出（关闭或出错），不会再有线程取走该帧
+                    self.dropped += 1
+                    accepted = False
+            if accepted:
+                self._queue.append((timestamp, frame, release))
+                self._cond.notify_all()
+        if not accepted:
+            dropped = release
+        if dropped is not None:
+            dropped()
+        return accepted
+
+    def run(self):
+        probe = []
+        try:
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._queue or self._closing)
+                    if not self._queue:
+                        break
+                    item = self._queue.popleft()
+                    self._cond.notify_all()
+
+                if self._writer is None:
+                    # 积累到足够的帧后测量帧率并打开输出文件
+                    probe.append(item)
+                    if len(probe) < self.probe_frames and (self._queue or not self._closing):
+                        continue
+                    self._open(probe)
+                    batch, probe = probe, []
+                    self._encode_all(batch)
+                else:
+                    self._encode_all([item])
+
+            if probe:
+                self._open(probe)
+                batch, probe = probe, []
+                self._encode_all(batch)
+        except Exception as e:
+            self.error = e
+        finally:
+            if self._writer is not None:
+                self._writer.release()
+            # 出错退出时队列和测量中剩余的帧不再编码，也要释放
+            with self._cond:
+                self._closing = True
+                probe.extend(self._queue)
+                self._queue.clear()
+                self._cond.notify_all()
+            for _, _, release in probe:
+                if release is not None:
+                    release()
+
+    def _encode_all(self, items):
+        """依次编码，每帧编码后立即调用其释放回调"""
+        for index, (ts, frame, release) in enumerate(items):
+            try:
+                self._encode(ts, frame)
+            except Exception:
+                for _, _, pending in items[index + 1:]:
+                    if pending is not None:
+                        pending()
+                raise
+            finally:
+                if release is not None:
+                    release()
+
+    def _open(self, probe):
+        if self.fps is None:
+            elapsed = probe[-1][0] - probe[0][0]
+            measured = (len(probe) - 1) / elapsed if elapsed > 0 else 20.0
+            self.fps = min(max(measured, 1.0), 60.0)
+        height, width = probe[0][1].shape[:2]
+        self._start_time = probe[0][0]
+        self._writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*self.fourcc), self.fps, (width, height))
+        if not self._writer.isOpened():
+            raise IOError(f"无法创建视频文件: {self.path}")
+
+    def _encode(self, timestamp, frame):
+        # 按时间戳计算该帧在输出视频中的位置：早到的帧跳过，丢帧造成的空缺用该帧补齐（最多2秒）
+        target = int(round((timestamp - self._start_time) * self.fps))
+        repeats = min(target - self._next_index + 1, int(self.fps * 2))
+        if repeats <= 0:
+            return
+        start = time.perf_counter()
+        for _ in range(repeats):
+            self._writer.write(frame)
+        elapsed_ms = (time.perf_counter() - start) * 1000.0 / repeats
+        self.encode_ms = elapsed_ms if self.written == 0 else 0.9 * self.encode_ms + 0.1 * elapsed_ms
+        self.encode_max_ms = max(self.encode_max_ms, elapsed_ms)
+        self.written += repeats
+        self._next_index = target + 1
+
+    def close(self, timeout=10.0):
+        """编码完队列中剩余的帧后关闭文件"""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        if self.is_alive():
+            self.join(timeout)
+
+    @property
+    def queued(self):
+        return len(self._queue)
+
+    def stats(self):
+        return {
+            'queued': self.queued,
+            'dropped': self.dropped,
+            'written': self.written,
+            'fps': self.fps,
+            'encode_ms': self.encode_ms,
+            'encode_max_ms': self.encode_max_ms,
+        }
+
+    def describe(self):
+        """统计文本，如 "录制 19.8fps 队列3/60 丢弃0 编码4ms(最大12ms)" """
+        fps = f"{self.fps:.1f}fps" if self.fps else "测量帧率中"
+        return (f"录制 {fps} 队列{self.queued}/{self.queue_size} 丢弃{self.dropped} "
+                f"编码{self.encode_ms:.0f}ms(最大{self.encode_max_ms:.0f}ms)")
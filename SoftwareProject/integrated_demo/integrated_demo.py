@@ -12,15 +12,9 @@ import datetime
 import time
 import cv2
 import numpy as np
-import dlib
-import imutils
 from playsound import playsound
-import platform
-import winsound  # Add winsound for more reliable Windows audio playback
 from pydub import AudioSegment  # Add pydub for MP3 to WAV conversion
 import tempfile  # For temporary WAV files
-from imutils import face_utils
-from scipy.spatial import distance as dist
 from PyQt5 import QtCore, QtWidgets
 from PyQt5.QtGui import QImage, QPixmap, QTextCursor
 from PyQt5.QtWidgets import QApplication, QMainWindow, QGraphicsScene, QMessageBox, QDesktopWidget
@@ -38,22 +32,22 @@ class NumpyEncoder(json.JSONEncoder):
             return obj.tolist()
         return super(NumpyEncoder, self).default(obj)
 
-# 确保可以导入两个项目的模块
-sys.path.append(os.path.join(os.path.dirname(__file__), 'dynamic_gestures'))
+# 检测逻辑位于无界面的检测引擎中，界面只负责采集、显示和提示
+from core.audio import AudioCueService
+from core.capture_format import SessionRecorder, SessionWriter
+from core.clip_recorder import ClipRecorder
+from core.engine import DetectionConfig, DetectionEngine, LOGGED_EVENTS, describe_event
+from core.adaptive import AdaptiveController, LoadSample, read_system_load
+from core.event_store import EventStore, today_range
+from core.frame_bus import BusCapture, open_capture
+from core.journal import EventJournal, StateSnapshot
+from core.state_stream import StatePublisher
+from core.video_encoder import VideoEncoder
+from core.head_pose import NOD_PITCH_THRESHOLD
 
-# 导入dynamic_gestures项目的组件
-from dynamic_gestures.onnx_models import HandDetection, HandClassification
-from dynamic_gestures.main_controller import MainController
-from dynamic_gestures.utils.enums import targets as gesture_targets
-from dynamic_gestures.utils.drawer import Drawer as HandDrawer
-
-# 导入VisionGuard项目的组件
-# 这里我们直接从combined.py中复制相关类和函数
-
-# 系统平台检测
-system = platform.system()
-if system != "Windows":
-    import vlc
+# 多线程处理流水线组件
+from core.stages import AnalysisResult, DropOldestQueue, FramePacket, Stage, compose_overlay
+from core.buffer_pool import BufferPool
 
 print("正在初始化集成演示系统...")
 print("请等待界面启动...")
@@ -83,148 +77,66 @@ detection_logger.addHandler(file_handler)
 # 记录系统启动信息
 detection_logger.info("系统启动")
 
-# 点头/摇头检测参数和光流法跟踪配置
-lk_params = dict(winSize=(35, 35), maxLevel=3,
-                 criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 20, 0.03))
-NOD_THRESHOLD = 35        # 点头垂直位移阈值 (增加阈值减少误检测)
-SHAKE_THRESHOLD = 10      # 摇头水平位移阈值
-DIRECTION_CHANGES = 2     # 摇头方向变换次数阈值
-DOMINANCE_RATIO = 2.0     # 主导方向比例阈值 (增加以要求更明确的垂直运动)
-TRACKING_FRAMES = 15      # 光流轨迹帧数窗口
-MIN_MOVE = 2              # 判定有效移动的最小像素
-DISPLAY_DURATION = 45     # 检测到动作后文本显示持续帧数
-
-def get_coords(p):
-    """提取光流跟踪点的坐标"""
-    try:
-        return int(p[0][0][0]), int(p[0][0][1])
-    except:
-        return int(p[0][0]), int(p[0][1])
-
-class GestureDetector:
-    """手势（点头/摇头）检测器，维护光流跟踪点和运动分析"""
-    def __init__(self):
-        self.track_points = []               # 光流跟踪点历史
-        self.direction_history = []          # 水平运动方向历史（用于判断摇头）
-        self.gesture_status = {"nod": 0, "shake": 0}  # 动作状态计数，用于控制显示
-        self.face_center = None              # 当前跟踪的人脸中心点
-        self.lost_counter = 0               # 连续跟踪丢失计数
-        self.debug_info = {}                # 调试信息
-        self.last_gesture_time = 0          # 上次检测到手势的时间
-        self.cooldown_period = 1.5          # 手势检测冷却期（秒）
-        self.ready_for_detection = True     # 是否已准备好检测
-        self.wait_after_detection = False   # 检测到点头摇头后的等待标志
-        self.wait_until_time = 0            # 等待结束的时间点
-
-    def update_tracking(self, new_point):
-        """更新光流跟踪点位置历史"""
-        self.track_points.append(new_point)
-        if len(self.track_points) > TRACKING_FRAMES:
-            self.track_points.pop(0)
-        if len(self.track_points) >= 2:
-            prev = self.track_points[-2]
-            curr = self.track_points[-1]
-            dx = curr[0][0][0] - prev[0][0][0]
-            # 如果水平移动超过最小阈值，则记录方向（1=右移，-1=左移）
-            if abs(dx) > MIN_MOVE:
-                direction = 1 if dx > 0 else -1
-                self.direction_history.append(direction)
-                if len(self.direction_history) > 20:
-                    self.direction_history = self.direction_history[-20:]
-
-    def analyze_motion(self):
-        """分析累计的轨迹位移，判断是否构成点头或摇头动作"""
-        # 检查是否在冷却期内
-        current_time = time.time()
-        if current_time - self.last_gesture_time < self.cooldown_period:
-            self.ready_for_detection = False
-            return None
-        else:
-            self.ready_for_detection = True
-            
-        # 需要至少2个点才能计算运动
-        if len(self.track_points) < 5:  # 增加所需最小点数
-            return None
-            
-        start_point = self.track_points[0]
-        end_point = self.track_points[-1]
-        total_x = end_point[0][0][0] - start_point[0][0][0]
-        total_y = end_point[0][0][1] - start_point[0][0][1]
-        
-        # 计算整体位移量
-        total_displacement = np.sqrt(total_x**2 + total_y**2)
-        
-        # 保存调试信息
-        self.debug_info = {
-            'total_x': float(total_x),
-            'total_y': float(total_y),
-            'abs_x': float(abs(total_x)),
-            'abs_y': float(abs(total_y)),
-            'track_points': len(self.track_points),
-            'dir_history': len(self.direction_history),
-            'total_disp': float(total_displacement)
-        }
-        
-        # 位移不足最小运动量，不判定为任何动作
-        min_motion = max(NOD_THRESHOLD, SHAKE_THRESHOLD) * 0.6
-        if abs(total_x) + abs(total_y) < min_motion:
-            return None
-            
-        # 计算水平/垂直位移占比
-        sum_xy = abs(total_x) + abs(total_y)
-        x_ratio = abs(total_x) / sum_xy if sum_xy != 0 else 0
-        y_ratio = abs(total_y) / sum_xy if sum_xy != 0 else 0
-        is_x_dominant = x_ratio > (y_ratio * DOMINANCE_RATIO)
-        is_y_dominant = y_ratio > (x_ratio * DOMINANCE_RATIO)
-        
-        # 过滤微小动作，避免轻微晃动导致的误判断
-        if total_displacement < NOD_THRESHOLD * 0.8:
-            return None
-        
-        # 判断点头：垂直方向位移占主导且超过阈值
-        if is_y_dominant and abs(total_y) > NOD_THRESHOLD:
-            # 检查Y方向运动是否足够明显
-            if abs(total_y) > total_displacement * 0.7:
-                self.last_gesture_time = current_time
-                return "nod"
-            
-        # 判断摇头：水平方向位移占主导且超过阈值，且累计方向变换次数达到要求
-        if is_x_dominant and abs(total_x) > SHAKE_THRESHOLD:
-            dir_changes = sum(1 for i in range(1, len(self.direction_history))
-                              if self.direction_history[i] != self.direction_history[i-1])
-            if dir_changes >= DIRECTION_CHANGES:
-                self.last_gesture_time = current_time
-                return "shake"
-                
-        return None
-
-    def reset_counters(self, detected_gesture):
-        """检测到动作后重置计数器，触发显示计数"""
-        # 保留最后一个跟踪点，方便继续跟踪
-        last_point = None
-        if self.track_points:
-            last_point = self.track_points[-1].copy()
-            
-        if detected_gesture == "nod":
-            self.gesture_status["nod"] = DISPLAY_DURATION
-            self.direction_history = []  # 点头时清空方向变化历史
-            self.track_points = []  # 重置跟踪点
-        elif detected_gesture == "shake":
-            self.gesture_status["shake"] = DISPLAY_DURATION
-            self.direction_history = []  # 摇头后清空方向历史
-            self.track_points = []  # 重置跟踪点
-            
-        # 设置2秒的等待期，在此期间不进行面部检测
-        self.wait_after_detection = True
-        self.wait_until_time = time.time() + 2.0  # 当前时间加2秒
-            
-        # 如果有保存的跟踪点，将其作为新起点
-        if last_point is not None:
-            self.track_points = [last_point]
+class UiSignals(QtCore.QObject):
+    """工作线程到界面线程的信号，Qt控件只能在界面线程中更新"""
+    frame_ready = QtCore.pyqtSignal(QImage)
+    stats_ready = QtCore.pyqtSignal(str)
+    log_ready = QtCore.pyqtSignal(str)
+    level_changed = QtCore.pyqtSignal(str)  # 性能档位变化（参数为日志文字），在界面线程中更新检测配置
 
 class IntegratedUI(object):
+    # 分析叠加层的最长显示时间（秒），超过后只显示原始画面
+    OVERLAY_MAX_AGE = 1.0
+    # 显示和分析使用的图像宽度（像素），采集阶段按比例缩放到该宽度
+    FRAME_WIDTH = 640
+
+    # 提示音文件（启动时全部读入内存）
+    SOUND_FILES = {
+        # 人脸检测声音
+        "nod": "sounds/Nod.wav",
+        "shake": "sounds/Shake.wav",
+        "tired": "sounds/Tired.wav",
+        "sleep": "sounds/Sleep.wav",
+        "noface": "sounds/NoFace.wav",
+        "yawn": "sounds/Tired.wav",
+    }
+    GESTURE_SOUND_DIR = "sounds/gestures"
+    # 同一提示音的最小间隔（秒），未列出的使用默认值
+    SOUND_COOLDOWN = 2.0
+    SOUND_COOLDOWNS = {"noface": 5.0}
+
+    # 录制队列满时的丢帧策略（界面文字, VideoEncoder 的 drop_policy）
+    RECORDING_DROP_POLICIES = [
+        ("丢弃最旧帧", 'oldest'),
+        ("丢弃最新帧", 'newest'),
+        ("等待编码", 'block'),
+    ]
+
+    # 事件片段录制：触发事件及事件前后保留的秒数
+    CLIP_EVENTS = ('sleep', 'fatigue', 'yawn')
+    CLIP_PRE_SECONDS = 10.0
+    CLIP_POST_SECONDS = 5.0
+
+    # 自适应性能调节：分析单帧的目标耗时（毫秒）和调节间隔（秒）
+    ADAPTIVE_TARGET_MS = 100.0
+    ADAPTIVE_INTERVAL = 2.0
+
+    # 前端快照中保留的最近事件数，完整记录见 logs/events*.jsonl
+    RECENT_EVENTS = 50
+
+    # 检测事件对应的提示音
+    EVENT_SOUNDS = {
+        'nod': "nod",
+        'shake': "shake",
+        'yawn': "yawn",
+        'sleep': "sleep",
+        'fatigue': "tired",
+        'no_detection': "noface",
+    }
+
     def __init__(self, MainWindow):
         self.qmessagebox = QMessageBox()
+        self.ui_signals = UiSignals()
         MainWindow.setObjectName("MainWindow")
         # 居中窗口并设置初始大小
         self.desktop = QApplication.desktop()
@@ -273,23 +185,26 @@ class IntegratedUI(object):
         self.checkBox_yawn = QtWidgets.QCheckBox("打哈欠检测")  # 创建但不添加到界面
         self.checkBox_blink = QtWidgets.QCheckBox("闭眼检测")
         self.checkBox_fatigue = QtWidgets.QCheckBox("疲劳检测")
+        # 视线估计复用人脸检测结果，需要 L2CS 模型，开始检测前勾选才会加载
+        self.checkBox_gaze = QtWidgets.QCheckBox("视线估计")
         self.face_layout.addWidget(self.checkBox_nod)
         self.face_layout.addWidget(self.checkBox_shake)
         # 不再添加打哈欠检测选项
         # self.face_layout.addWidget(self.checkBox_yawn)
         self.face_layout.addWidget(self.checkBox_blink)
         self.face_layout.addWidget(self.checkBox_fatigue)
+        self.face_layout.addWidget(self.checkBox_gaze)
         
         # 点头检测灵敏度设置
         self.nodSensitivityLayout = QtWidgets.QHBoxLayout()
         self.nodSensitivityLabel = QtWidgets.QLabel("点头灵敏度:")
         self.nodSensitivitySlider = QtWidgets.QSlider(QtCore.Qt.Horizontal)
-        self.nodSensitivitySlider.setMinimum(20)  # 最小阈值
-        self.nodSensitivitySlider.setMaximum(50)  # 最大阈值
-        self.nodSensitivitySlider.setValue(NOD_THRESHOLD)  # 当前值
+        self.nodSensitivitySlider.setMinimum(6)   # 最小俯仰角阈值（度）
+        self.nodSensitivitySlider.setMaximum(20)  # 最大俯仰角阈值（度）
+        self.nodSensitivitySlider.setValue(int(NOD_PITCH_THRESHOLD))  # 当前值
         self.nodSensitivitySlider.setTickPosition(QtWidgets.QSlider.TicksBelow)
-        self.nodSensitivitySlider.setTickInterval(5)
-        self.nodSensitivityValueLabel = QtWidgets.QLabel(f"{NOD_THRESHOLD}")
+        self.nodSensitivitySlider.setTickInterval(2)
+        self.nodSensitivityValueLabel = QtWidgets.QLabel(f"{int(NOD_PITCH_THRESHOLD)}°")
         self.nodSensitivityLayout.addWidget(self.nodSensitivityLabel)
         self.nodSensitivityLayout.addWidget(self.nodSensitivitySlider)
         self.nodSensitivityLayout.addWidget(self.nodSensitivityValueLabel)
@@ -380,10 +295,18 @@ class IntegratedUI(object):
         self.performanceLayout = QtWidgets.QVBoxLayout(self.performanceGroup)
         
         # 交替检测选项
-        self.checkBox_alternating = QtWidgets.QCheckBox("使用交替检测模式(推荐)")
-        self.checkBox_alternating.setChecked(True)
-        self.checkBox_alternating.setToolTip("启用此选项可降低CPU使用率，防止程序卡死")
+        self.checkBox_alternating = QtWidgets.QCheckBox("使用交替检测模式(低配设备)")
+        self.checkBox_alternating.setChecked(False)
+        self.checkBox_alternating.setToolTip("默认人脸和手势在不同线程中并发分析每一帧；单核或低配设备上可启用此选项，每帧只做一种检测以降低CPU使用率")
         self.performanceLayout.addWidget(self.checkBox_alternating)
+
+        # 自适应性能调节
+        self.checkBox_adaptive = QtWidgets.QCheckBox("自适应性能调节")
+        self.checkBox_adaptive.setChecked(True)
+        self.checkBox_adaptive.setToolTip(
+            f"根据分析耗时、CPU占用和温度自动调整处理帧率、人脸检测分辨率、视线估计和交替检测，"
+            f"使分析单帧耗时不超过{self.ADAPTIVE_TARGET_MS:.0f}ms；开启时忽略手动设置的处理帧率")
+        self.performanceLayout.addWidget(self.checkBox_adaptive)
         
         # 人脸框显示持续帧数控制
         self.faceBoxLayout = QtWidgets.QHBoxLayout()
@@ -404,6 +327,7 @@ class IntegratedUI(object):
         self.frameRateSpinner.setMinimum(1)
         self.frameRateSpinner.setMaximum(30)
         self.frameRateSpinner.setValue(2)  # 默认每2帧处理一次
+        self.frameRateSpinner.setEnabled(not self.checkBox_adaptive.isChecked())  # 自适应调节时由档位决定
         self.frameRateLayout.addWidget(self.frameRateLabel)
         self.frameRateLayout.addWidget(self.frameRateSpinner)
         self.performanceLayout.addLayout(self.frameRateLayout)
@@ -417,6 +341,30 @@ class IntegratedUI(object):
         self.recordingLayout.addWidget(self.checkBox_recording)
         self.recordingLayout.addWidget(self.recordButton)
         self.performanceLayout.addLayout(self.recordingLayout)
+        self.dropPolicyLayout = QtWidgets.QHBoxLayout()
+        self.dropPolicyLabel = QtWidgets.QLabel("编码跟不上时:")
+        self.dropPolicyCombo = QtWidgets.QComboBox()
+        for text, policy in self.RECORDING_DROP_POLICIES:
+            self.dropPolicyCombo.addItem(text, policy)
+        self.dropPolicyCombo.setToolTip("录制帧在后台编码，队列满时的处理方式；等待会拖慢显示，但不丢帧")
+        self.dropPolicyLayout.addWidget(self.dropPolicyLabel)
+        self.dropPolicyLayout.addWidget(self.dropPolicyCombo)
+        self.performanceLayout.addLayout(self.dropPolicyLayout)
+        self.checkBox_clips = QtWidgets.QCheckBox(
+            f"事件片段录制(事件前{self.CLIP_PRE_SECONDS:.0f}秒/后{self.CLIP_POST_SECONDS:.0f}秒)")
+        self.checkBox_clips.setToolTip("发生睡眠、疲劳、打哈欠事件时自动保存前后的视频片段到 clips 目录")
+        self.checkBox_clips.setChecked(True)
+        self.performanceLayout.addWidget(self.checkBox_clips)
+        self.checkBox_session = QtWidgets.QCheckBox("同时录制原始会话(用于回放分析)")
+        self.checkBox_session.setToolTip("保存未标注的原始帧和采集时间戳(.vcap)，可用 replay.py 重新运行检测")
+        self.checkBox_session.setChecked(True)
+        self.performanceLayout.addWidget(self.checkBox_session)
+        
+        # 流水线各阶段帧率/队列深度
+        self.stageStatsLabel = QtWidgets.QLabel("未运行")
+        self.stageStatsLabel.setWordWrap(True)
+        self.stageStatsLabel.setToolTip("采集/分析/显示各阶段的帧率、单帧耗时、输入队列深度和丢弃帧数")
+        self.performanceLayout.addWidget(self.stageStatsLabel)
         
         # 添加性能优化组到控制面板
         self.controlPanel_layout.addWidget(self.performanceGroup)
@@ -452,10 +400,25 @@ class IntegratedUI(object):
         self.holdTimeSlider.valueChanged.connect(self.update_hold_time)
         self.exportLogButton.clicked.connect(self.export_logs)
         self.checkBox_alternating.stateChanged.connect(self.toggle_alternating_mode)
+        self.checkBox_adaptive.stateChanged.connect(self.toggle_adaptive_mode)
         self.checkBox_recording.stateChanged.connect(self.toggle_recording_enabled)
         self.recordButton.clicked.connect(self.toggle_recording)
         self.saveFrontendDataButton.clicked.connect(self.save_frontend_data)
         self.faceBoxSpinner.valueChanged.connect(self.update_face_box_frames)
+        # 功能开关变化时同步检测配置
+        for checkbox in (self.checkBox_nod, self.checkBox_shake, self.checkBox_yawn, self.checkBox_blink,
+                         self.checkBox_fatigue, self.checkBox_gaze, self.checkBox_hand, self.checkBox_hand_debug):
+            checkbox.stateChanged.connect(self.apply_detection_config)
+        self.ui_signals.frame_ready.connect(self.show_frame)
+        self.ui_signals.stats_ready.connect(self.stageStatsLabel.setText)
+        self.ui_signals.log_ready.connect(self.append_log)
+        self.ui_signals.level_changed.connect(self.on_performance_level_changed)
+        # 工作线程使用的控件状态在界面线程中缓存，工作线程不直接读取控件
+        self.frameRateSpinner.valueChanged.connect(self.update_frame_skip)
+        self.checkBox_clips.stateChanged.connect(self.toggle_clips)
+        self.frame_skip = self.frameRateSpinner.value()
+        self.clips_enabled = self.checkBox_clips.isChecked()
+        self.adaptive_enabled = self.checkBox_adaptive.isChecked()
         
     def setStyles(self):
         # 设置现代化样式
@@ -482,12 +445,12 @@ class IntegratedUI(object):
             
             # 创建专用的前端数据快照
             snapshot_file = os.path.join(self.frontend_data_dir, f"snapshot_{int(time.time())}.json")
-            with open(snapshot_file, 'w', encoding='utf-8') as f:
-                json.dump(self.frontend_data, f, indent=4, ensure_ascii=False, cls=NumpyEncoder)
+            with self.frontend_lock:
+                self.frontend_snapshot.write(snapshot_file)
                 
             # 打印数据摘要
-            event_count = len(self.frontend_data['last_events'])
-            self.log_message(f"前端数据已保存！当前有 {event_count} 个事件记录，持续累积中。")
+            self.log_message(f"前端数据已保存！累计 {self.frontend_snapshot.total_events} 个事件，"
+                             f"快照保留最近 {len(self.frontend_snapshot.recent_events)} 个，完整记录见事件日志。")
             self.log_message(f"文件位置: {self.frontend_data_file} 和 {snapshot_file}")
             
             # 显示当前检测状态
@@ -515,64 +478,18 @@ class IntegratedUI(object):
             timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
             export_file = os.path.join(export_dir, f"detection_log_export_{timestamp}.csv")
             
-            # 从日志文件中提取数据
-            detection_data = []
-            
-            # 检查日志文件是否存在
-            if not os.path.exists(log_filename):
-                self.log_message(f"找不到日志文件: {log_filename}")
-                return
-                
-            # 读取日志文件
-            with open(log_filename, 'r', encoding='utf-8') as f:
-                for line in f:
-                    # 尝试提取JSON数据
-                    try:
-                        # 跳过非JSON行
-                        if ' - INFO - {' not in line:
-                            continue
-                            
-                        # 提取JSON部分
-                        json_part = line.split(' - INFO - ', 1)[1]
-                        # 使用自定义解析器确保所有数据类型正确处理
-                        log_entry = json.loads(json_part)
-                        
-                        # 添加基本字段
-                        entry = {
-                            'timestamp': log_entry.get('timestamp', ''),
-                            'event_type': log_entry.get('event_type', ''),
-                        }
-                        
-                        # 添加详细信息
-                        details = log_entry.get('details', {})
-                        for key, value in details.items():
-                            if isinstance(value, (dict, list)):
-                                entry[key] = json.dumps(value)
-                            else:
-                                entry[key] = value
-                                
-                        detection_data.append(entry)
-                    except Exception as e:
-                        print(f"解析日志行时出错: {str(e)}")
-                        continue
-            
-            # 导出为CSV
-            if not detection_data:
+            # 从事件库中按时间范围导出今天的事件（分批索引查询）
+            self.event_store.flush()
+            start, end = today_range()
+            count = self.event_store.export_csv(export_file, start, end)
+            if not count:
+                os.remove(export_file)
                 self.log_message("日志中没有检测到有效数据")
                 return
-                
-            # 获取所有可能的列名
-            all_keys = set()
-            for entry in detection_data:
-                all_keys.update(entry.keys())
-                
-            # 将数据写入CSV
-            with open(export_file, 'w', encoding='utf-8', newline='') as f:
-                import csv
-                writer = csv.DictWriter(f, fieldnames=sorted(list(all_keys)))
-                writer.writeheader()
-                writer.writerows(detection_data)
-                
+            
+            counts = self.event_store.counts(start, end)
+            summary = ", ".join(f"{event_type}: {n}" for event_type, n in sorted(counts.items()))
+            self.log_message(f"今日共 {count} 个事件（{summary}）")
             self.log_message(f"日志已成功导出到: {export_file}")
             detection_logger.info(f"日志导出: {export_file}")
             
@@ -582,106 +499,82 @@ class IntegratedUI(object):
 
     def init_face_detection_params(self):
         """初始化人脸检测相关参数"""
-        # 面部特征索引点
-        self.lStart, self.lEnd = face_utils.FACIAL_LANDMARKS_IDXS["left_eye"]
-        self.rStart, self.rEnd = face_utils.FACIAL_LANDMARKS_IDXS["right_eye"]
-        self.mStart, self.mEnd = face_utils.FACIAL_LANDMARKS_IDXS["mouth"]
-        
-        # 疲劳检测参数
-        self.EYE_AR_THRESH = 0.24  # 眼睛长宽比阈值
-        self.AR_CONSEC_FRAMES = 60  # 闭眼判定连续帧数阈值
-        self.MAR_THRESH = 0.5  # 打哈欠嘴部长宽比阈值（从0.6降低到0.5，更容易检测）
-        self.MOUTH_AR_CONSEC_FRAMES = 15  # 打哈欠连续帧数阈值（从30降低到15）
+        # 检测开关和阈值，由界面控件同步（见 apply_detection_config）
+        self.detection_config = DetectionConfig()
         
-        # 计数器
-        self.COUNTER = 0  # 闭眼计数器
-        self.mCOUNTER = 0  # 打哈欠计数器
-        self.TOTAL = 0  # 闭眼总次数
-        self.mTOTAL = 0  # 打哈欠总次数
-        self.oCOUNTER = 0  # 脱离范围计数器
-        
-        # 状态标志
-        self.shutEye = False
-        self.ifYawming = False
-        self.ifTired = False
-        self.ifNoFace = False
-        
-        # 检测器
-        self.detector = None
-        self.predictor = None
-        
-        # 手势检测器
-        self.gesture_detector = None
-        
-        # 前一帧灰度图
-        self.prev_gray = None
-        
-        # 哈欠时间记录
-        self.timeOfTheLastOfYawns = datetime.datetime(2022, 12, 31)
-        self.timeOfTheFirstOfYawns = datetime.datetime(2022, 12, 31)
-        
-        # 疲劳判断参数
-        self.Number_Of_Yawns_Judged_As_Fatigue = 4  # 判断为疲劳的哈欠次数
-        self.NOYJAF_Time = 180  # 判断疲劳的时间窗口(秒)
+        # 检测引擎，开始检测时创建
+        self.engine = None
         
         # 性能优化标志
-        self.use_alternating_detection = True  # 是否使用交替检测模式
+        self.use_alternating_detection = False  # 是否使用交替检测模式（默认并发分析）
+        self.adaptive_controller = None  # 自适应性能调节，检测运行期间有效
         
         # 录制相关参数
         self.is_recording = False
-        self.video_writer = None
+        self.video_encoder = None  # 后台编码线程，显示阶段只负责提交帧
+        # 事件片段：显示阶段持续缓存最近的帧，事件发生时后台保存前后片段
+        self.clip_recorder = ClipRecorder("clips", self.CLIP_PRE_SECONDS, self.CLIP_POST_SECONDS,
+                                          trigger_events=self.CLIP_EVENTS)
+        # 提示音：启动时一次性加载，单个工作线程播放
+        self.audio = AudioCueService.from_directory(self.SOUND_FILES, self.GESTURE_SOUND_DIR,
+                                                    cooldown=self.SOUND_COOLDOWN,
+                                                    cooldowns=self.SOUND_COOLDOWNS)
+        self.reported_missing_sounds = set()
+        self.clip_recorder.on_saved = lambda path, clip: self.log_message(
+            f"事件片段已保存: {path}（{', '.join(clip.events)}）")
+        self.session_writer = None  # 原始会话录制（后台线程编码写入），由采集线程提交帧
+        self.session_lock = threading.Lock()
         self.recording_start_time = None
-        
-        # 添加人脸框持久显示参数
-        self.last_face_box = None
-        self.face_box_valid_frames = 5  # 人脸框保持显示的帧数
-        
-        # 前端数据交互相关参数
+
+        # 采集、分析、显示各阶段的图像缓冲（缩放帧、叠加层、显示帧）从缓冲池取用，稳定后不再分配
+        self.buffer_pool = BufferPool()
+        self.analysis_lock = threading.Lock()  # 保护 latest_analysis 的替换与引用计数
+        self._raw_frame = None                 # 摄像头读取缓冲，仅采集线程使用
+        self._rgb_frame = None                 # Qt 显示用的 RGB 缓冲，仅显示线程使用
+        
+        # 前端数据交互相关参数（人脸/手势工作线程都会更新，读写时加锁）
+        self.frontend_lock = threading.RLock()
         self.frontend_data_dir = "frontend_data"
         if not os.path.exists(self.frontend_data_dir):
             os.makedirs(self.frontend_data_dir)
         self.frontend_data_file = os.path.join(self.frontend_data_dir, "detection_data.json")
         
-        # 尝试加载已有的前端数据，如果不存在则创建新的
+        # 事件追加写入按大小轮转的事件日志，前端快照只保留当前状态和最近的事件
+        self.event_journal = EventJournal(log_dir, prefix="events", encoder=NumpyEncoder)
+        # 可查询的事件库（SQLite），由后台线程写入，供导出和统计使用
+        self.event_store = EventStore(os.path.join(log_dir, "events.db"), encoder=NumpyEncoder)
+        self.frontend_snapshot = StateSnapshot(self.frontend_data_file,
+                                               max_events=self.RECENT_EVENTS, encoder=NumpyEncoder)
+        self.frontend_data = self.frontend_snapshot.state
+        self.frontend_data.update({
+            "timestamp": datetime.datetime.now().isoformat(),
+            "face_detected": False,
+            "hand_detected": False,
+            "face_box": None,
+            "fatigue_level": 0,  # 0-100的疲劳程度
+            "ear": 0,  # 眼睛长宽比
+            "mar": 0,  # 嘴部长宽比
+            "current_gesture": None,  # 当前检测到的手势
+            "system_status": "初始化"
+        })
+        
+        # 尝试加载已有的前端数据（保留最近的事件）
         try:
-            if os.path.exists(self.frontend_data_file):
-                with open(self.frontend_data_file, 'r', encoding='utf-8') as f:
-                    self.frontend_data = json.load(f)
-                    # 更新当前时间戳，但保留历史事件
-                    self.frontend_data['timestamp'] = datetime.datetime.now().isoformat()
-                    self.frontend_data['system_status'] = "已加载历史数据"
-                    self.log_message(f"已加载历史前端数据，包含 {len(self.frontend_data.get('last_events', []))} 个历史事件")
-            else:
-                # 文件不存在，创建新的数据结构
-                self.frontend_data = {
-                    "timestamp": datetime.datetime.now().isoformat(),
-                    "face_detected": False,
-                    "hand_detected": False,
-                    "face_box": None,
-                    "last_events": [],  # 事件记录，不限制数量
-                    "fatigue_level": 0,  # 0-100的疲劳程度
-                    "ear": 0,  # 眼睛长宽比
-                    "mar": 0,  # 嘴部长宽比
-                    "current_gesture": None,  # 当前检测到的手势
-                    "system_status": "初始化"
-                }
-                self.update_frontend_data()  # 初始化前端数据文件
+            if self.frontend_snapshot.load():
+                self.frontend_data['timestamp'] = datetime.datetime.now().isoformat()
+                self.frontend_data['system_status'] = "已加载历史数据"
+                self.log_message(f"已加载历史前端数据，累计 {self.frontend_snapshot.total_events} 个事件，"
+                                 f"保留最近 {len(self.frontend_snapshot.recent_events)} 个")
         except Exception as e:
             self.log_message(f"加载前端数据时出错: {str(e)}，将创建新的数据文件")
-            # 文件格式错误或读取失败，创建新的数据结构
-            self.frontend_data = {
-                "timestamp": datetime.datetime.now().isoformat(),
-                "face_detected": False,
-                "hand_detected": False,
-                "face_box": None,
-                "last_events": [],  # 事件记录，不限制数量
-                "fatigue_level": 0,  # 0-100的疲劳程度
-                "ear": 0,  # 眼睛长宽比
-                "mar": 0,  # 嘴部长宽比
-                "current_gesture": None,  # 当前检测到的手势
-                "system_status": "初始化"
-            }
-            self.update_frontend_data()  # 初始化前端数据文件
+        self.update_frontend_data()  # 初始化前端数据文件
+        
+        # 通过本机端口向Django服务推送状态变化，浏览器无需轮询数据文件
+        self.state_publisher = StatePublisher(encoder=NumpyEncoder)
+        try:
+            self.state_publisher.start()
+        except OSError as e:
+            self.log_message(f"状态推送端口 {self.state_publisher.port} 不可用: {str(e)}，仅写入数据文件")
 
     def init_hand_detection_params(self):
         """初始化手势检测相关参数"""
@@ -689,16 +582,6 @@ class IntegratedUI(object):
         self.detector_path = "models/hand_detector.onnx"
         self.classifier_path = "models/crops_classifier.onnx"
         
-        # 手势检测器
-        self.hand_controller = None
-        self.hand_drawer = None
-        
-        # 手势持续时间检测
-        self.current_gesture = None       # 当前检测到的手势
-        self.gesture_start_time = 0       # 手势开始时间
-        self.gesture_hold_time = 1.0      # 手势需要保持的时间(秒) - 将在UI中设置
-        self.reported_gestures = set()    # 已播报过的手势，避免重复播报
-        
         # 检查模型文件是否存在
         if not os.path.exists(self.detector_path) or not os.path.exists(self.classifier_path):
             self.log_message("警告：手势检测模型文件不存在，请检查路径")
@@ -706,9 +589,16 @@ class IntegratedUI(object):
             self.checkBox_hand.setEnabled(False)
 
     def log_message(self, message):
-        """将消息添加到日志区域"""
-        timestamp = time.strftime('%Y-%m-%d %H:%M:%S ', time.localtime())
-        self.textBrowser.append(timestamp + message)
+        """将消息添加到日志区域（可在任意线程中调用，工作线程中通过信号交给界面线程）"""
+        text = time.strftime('%Y-%m-%d %H:%M:%S ', time.localtime()) + message
+        if QtCore.QThread.currentThread() is self.textBrowser.thread():
+            self.append_log(text)
+        else:
+            self.ui_signals.log_ready.emit(text)
+
+    def append_log(self, text):
+        """在界面线程中追加一行日志"""
+        self.textBrowser.append(text)
         self.textBrowser.moveCursor(self.textBrowser.textCursor().End)
         
     def log_detection(self, event_type, details=None):
@@ -728,45 +618,40 @@ class IntegratedUI(object):
             'details': details
         }
         
-        # 转换为JSON并记录
         try:
-            # 使用自定义编码器处理NumPy类型
-            json_data = json.dumps(log_data, ensure_ascii=False, cls=NumpyEncoder)
-            detection_logger.info(json_data)
-            
-            # 更新前端数据
-            current_time = datetime.datetime.now().isoformat()
-            event_info = {
-                'timestamp': current_time,
-                'event_type': event_type,
-                'details': details
-            }
-            
-            # 添加到事件列表的开头，不限制事件数量，持续积累
-            self.frontend_data['last_events'].insert(0, event_info)
+            # 追加到事件日志（每个事件一行JSON）并写入事件库
+            self.event_journal.append(log_data)
+            self.event_store.append(log_data)
+            if self.clips_enabled:
+                self.clip_recorder.trigger(event_type)
+            self.state_publisher.publish_event(log_data)
             
-            # 更新时间戳
-            self.frontend_data['timestamp'] = current_time
-            
-            # 更新与事件相关的特定数据
-            if event_type == 'nod' or event_type == 'shake':
-                self.frontend_data['head_gesture'] = event_type
-            elif event_type == 'hand_gesture' and 'gesture_name' in details:
-                self.frontend_data['current_gesture'] = details['gesture_name']
-            elif event_type == 'fatigue':
-                self.frontend_data['fatigue_level'] = 75  # 较高的疲劳度
-            elif event_type == 'yawn':
-                self.frontend_data['fatigue_level'] = min(self.frontend_data['fatigue_level'] + 10, 100)  # 增加疲劳度
-                if 'mar' in details:
-                    self.frontend_data['mar'] = details['mar']
-            elif event_type == 'blink' or event_type == 'sleep':
-                if 'ear' in details:
-                    self.frontend_data['ear'] = details['ear']
-                if event_type == 'sleep':
-                    self.frontend_data['fatigue_level'] = 100  # 睡眠状态为最高疲劳度
-            
-            # 保存更新后的前端数据
-            self.update_frontend_data()
+            with self.frontend_lock:
+                # 加入最近事件（固定数量，最旧的自动移除）
+                self.frontend_snapshot.add_event(log_data)
+                
+                # 更新时间戳
+                self.frontend_data['timestamp'] = log_data['timestamp']
+                
+                # 更新与事件相关的特定数据
+                if event_type == 'nod' or event_type == 'shake':
+                    self.frontend_data['head_gesture'] = event_type
+                elif event_type == 'hand_gesture' and 'gesture_name' in details:
+                    self.frontend_data['current_gesture'] = details['gesture_name']
+                elif event_type == 'fatigue':
+                    self.frontend_data['fatigue_level'] = 75  # 较高的疲劳度
+                elif event_type == 'yawn':
+                    self.frontend_data['fatigue_level'] = min(self.frontend_data['fatigue_level'] + 10, 100)  # 增加疲劳度
+                    if 'mar' in details:
+                        self.frontend_data['mar'] = details['mar']
+                elif event_type == 'blink' or event_type == 'sleep':
+                    if 'ear' in details:
+                        self.frontend_data['ear'] = details['ear']
+                    if event_type == 'sleep':
+                        self.frontend_data['fatigue_level'] = 100  # 睡眠状态为最高疲劳度
+                
+                # 保存更新后的前端数据
+                self.update_frontend_data()
             
         except Exception as e:
             detection_logger.error(f"日志记录失败: {str(e)}")
@@ -789,51 +674,112 @@ class IntegratedUI(object):
                 self.stop_recording()
                 self.recordButton.setText("开始录制")
             
+            # 各阶段线程退出后由process_camera释放摄像头
             self.CAMERA_STYLE = False
-            if hasattr(self, 'cap') and self.cap is not None:
-                self.cap.release()
             self.log_message("摄像头已停止")
 
     def load_models(self):
-        """加载所需的所有模型"""
+        """创建检测引擎并加载所需的所有模型"""
         try:
-            # 加载人脸检测器和68点特征预测模型
-            self.detector = dlib.get_frontal_face_detector()
-            model_path = "models/shape_predictor_68_face_landmarks.dat"
-            if not os.path.exists(model_path):
-                self.log_message(f"错误：找不到人脸特征点模型文件: {model_path}")
+            self.apply_detection_config()
+            self.engine = DetectionEngine(
+                self.detection_config,
+                predictor_path="models/shape_predictor_68_face_landmarks.dat",
+                hand_detector_path=self.detector_path,
+                hand_classifier_path=self.classifier_path)
+            for message in self.engine.load(load_hand=self.checkBox_hand.isChecked(),
+                                            load_gaze=self.checkBox_gaze.isChecked()):
+                self.log_message(message)
+            
+            # 缺少模型文件的功能在界面上取消选中
+            if not self.engine.face_available:
                 self.checkBox_nod.setChecked(False)
                 self.checkBox_shake.setChecked(False)
                 self.checkBox_yawn.setChecked(False)
                 self.checkBox_blink.setChecked(False)
                 self.checkBox_fatigue.setChecked(False)
-            else:
-                self.predictor = dlib.shape_predictor(model_path)
-                self.log_message("人脸特征点模型加载成功")
-            
-            # 初始化手势检测器
-            if self.checkBox_hand.isChecked():
-                if os.path.exists(self.detector_path) and os.path.exists(self.classifier_path):
-                    self.hand_controller = MainController(self.detector_path, self.classifier_path)
-                    self.hand_drawer = HandDrawer()
-                    self.log_message("手势检测模型加载成功")
-                else:
-                    self.log_message("错误：手势检测模型文件不存在")
-                    self.checkBox_hand.setChecked(False)
-            
-            # 初始化点头/摇头检测器
-            self.gesture_detector = GestureDetector()
+                self.checkBox_gaze.setChecked(False)
+            if self.checkBox_gaze.isChecked() and not self.engine.gaze_available:
+                self.checkBox_gaze.setChecked(False)
+            if self.checkBox_hand.isChecked() and not self.engine.hand_available:
+                self.checkBox_hand.setChecked(False)
             
             return True
         except Exception as e:
             self.log_message(f"模型加载错误: {str(e)}")
             return False
 
+    def apply_detection_config(self, *args):
+        """根据界面控件生成新的检测配置，整体替换引擎使用的配置
+
+        自适应性能调节开启时，交替检测、视线估计和人脸检测分辨率还受当前档位限制。
+        """
+        level = self.adaptive_controller.level if self.adaptive_controller is not None else None
+        self.detection_config = DetectionConfig(
+            nod=self.checkBox_nod.isChecked(),
+            shake=self.checkBox_shake.isChecked(),
+            yawn=self.checkBox_yawn.isChecked(),
+            blink=self.checkBox_blink.isChecked(),
+            fatigue=self.checkBox_fatigue.isChecked(),
+            gaze=self.checkBox_gaze.isChecked() and (level is None or level.gaze),
+            hand=self.checkBox_hand.isChecked(),
+            debug=self.checkBox_hand_debug.isChecked(),
+            alternating=self.use_alternating_detection or (level is not None and level.alternating),
+            nod_pitch_threshold=float(self.nodSensitivitySlider.value()),
+            gesture_hold_time=self.holdTimeSlider.value() / 10.0,
+            face_box_frames=self.faceBoxSpinner.value(),
+        )
+        if level is not None:
+            self.detection_config.face_detect_width = level.face_detect_width
+        if self.engine is not None:
+            self.engine.config = self.detection_config
+
     def toggle_alternating_mode(self, state):
         """切换交替检测模式"""
         self.use_alternating_detection = (state == QtCore.Qt.Checked)
+        self.apply_detection_config()
         self.log_message(f"交替检测模式: {'开启' if self.use_alternating_detection else '关闭'}")
 
+    def update_frame_skip(self, value):
+        """更新手动设置的分析间隔（每隔N帧分析一次）"""
+        self.frame_skip = value
+
+    def toggle_clips(self, state):
+        """切换事件片段录制"""
+        self.clips_enabled = (state == QtCore.Qt.Checked)
+
+    def toggle_adaptive_mode(self, state):
+        """切换自适应性能调节（检测运行中也可切换）"""
+        self.adaptive_enabled = (state == QtCore.Qt.Checked)
+        if state == QtCore.Qt.Checked:
+            if self.CAMERA_STYLE:
+                self.adaptive_controller = AdaptiveController(self.ADAPTIVE_TARGET_MS)
+        else:
+            self.adaptive_controller = None
+        self.frameRateSpinner.setEnabled(state != QtCore.Qt.Checked)
+        self.apply_detection_config()
+        self.log_message(f"自适应性能调节: {'开启' if state == QtCore.Qt.Checked else '关闭'}")
+
+    def adjust_performance(self, analysis_stage, capture_stage, dropped):
+        """根据本周期的测量结果调整性能档位（在监控线程中调用）
+
+        检测配置由界面控件生成，档位变化通过信号交给界面线程更新配置并记录原因。
+        """
+        controller = self.adaptive_controller
+        if controller is None:
+            return
+        cpu, temperature = read_system_load()
+        sample = LoadSample(analysis_stage.meter.busy_ms, capture_stage.meter.fps, dropped, cpu, temperature)
+        decision = controller.update(sample)
+        if decision is not None:
+            level, reason = decision
+            self.ui_signals.level_changed.emit(f"性能档位 {controller.index}: {level.describe()}（{reason}）")
+
+    def on_performance_level_changed(self, message):
+        """在界面线程中按新的性能档位更新检测配置"""
+        self.apply_detection_config()
+        self.log_message(message)
+
     def toggle_recording_enabled(self, state):
         """启用或禁用录制按钮"""
         self.recordButton.setEnabled(state == QtCore.Qt.Checked)
@@ -866,16 +812,21 @@ class IntegratedUI(object):
             timestamp = time.strftime("%Y%m%d_%H%M%S", time.localtime())
             filename = f"recordings/recording_{timestamp}.mp4"
             
-            # 获取视频分辨率
-            if hasattr(self, 'cap') and self.cap is not None:
-                width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-                height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-            else:
-                width, height = 640, 480
+            # 后台编码：帧率按实际显示帧率测量，分辨率取第一帧
+            self.video_encoder = VideoEncoder(filename, fourcc='mp4v',
+                                              drop_policy=self.dropPolicyCombo.currentData())
+            self.video_encoder.start()
             
-            # 设置视频编解码器和写入器
-            fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # 或使用 'XVID'
-            self.video_writer = cv2.VideoWriter(filename, fourcc, 20.0, (width, height))
+            # 原始会话：保存分析所用的原始帧和采集时间戳
+            if self.checkBox_session.isChecked():
+                session_file = f"recordings/session_{timestamp}.vcap"
+                session_writer = SessionRecorder(SessionWriter(
+                    session_file, codec='jpeg', quality=90,
+                    metadata={'camera': 0, 'config': self.detection_config.to_dict()}))
+                session_writer.start()
+                with self.session_lock:
+                    self.session_writer = session_writer
+                self.log_message(f"开始录制原始会话: {session_file}")
             
             self.is_recording = True
             self.recording_start_time = time.time()
@@ -883,818 +834,343 @@ class IntegratedUI(object):
         except Exception as e:
             self.log_message(f"录制启动失败: {str(e)}")
             self.is_recording = False
-            self.video_writer = None
+            self.video_encoder = None
 
     def stop_recording(self):
         """停止录制视频"""
-        if self.is_recording and self.video_writer is not None:
-            self.video_writer.release()
-            self.video_writer = None
+        if self.is_recording and self.video_encoder is not None:
             self.is_recording = False
+            encoder, self.video_encoder = self.video_encoder, None
+            encoder.close()
+            if encoder.error is not None:
+                self.log_message(f"录制编码出错: {str(encoder.error)}")
+            self.log_message(f"录制统计: {encoder.fps or 0:.1f}fps, 写入{encoder.written}帧, "
+                             f"丢弃{encoder.dropped}帧, 平均编码{encoder.encode_ms:.1f}ms, "
+                             f"最大{encoder.encode_max_ms:.1f}ms")
+            
+            with self.session_lock:
+                session_writer, self.session_writer = self.session_writer, None
+            if session_writer is not None:
+                session_writer.close()
+                if session_writer.error is not None:
+                    self.log_message(f"原始会话写入出错: {str(session_writer.error)}")
+                self.log_message(f"原始会话已保存: {session_writer.path} ({len(session_writer)}帧，"
+                                 f"丢弃{session_writer.dropped}帧)")
             
             duration = time.time() - self.recording_start_time
             self.log_message(f"视频录制已停止，持续时间: {duration:.1f}秒")
 
     def process_camera(self):
-        """处理摄像头图像的主线程函数，整合两个项目的功能"""
+        """摄像头处理主线程：启动采集、分析、显示/录制三个阶段线程并定期刷新统计信息
+
+        采集阶段把每一帧同时送入显示队列和分析队列（均为满时丢弃最旧帧的有界队列），
+        显示阶段按采集帧率把最近一次的分析叠加层绘制到最新的原始帧上，
+        因此分析较慢时画面依然流畅，只是标注的刷新率较低。
+        """
         # 加载所需模型
         if not self.load_models():
             self.log_message("模型加载失败，无法启动检测")
             return
-        
-        # 打开摄像头
-        self.cap = cv2.VideoCapture(0)
+
+        # 打开摄像头（摄像头服务 camera_service.py 运行时改为从共享内存帧总线读取）
+        self.cap = open_capture(0)
         if not self.cap.isOpened():
             self.log_message("摄像头打开失败")
             return
-        
+        if isinstance(self.cap, BusCapture):
+            self.log_message("已连接摄像头服务，从共享内存读取画面")
+
         self.CAMERA_STYLE = True
         self.log_message("摄像头已打开，开始检测")
-        
-        # 初始化计时器
-        self.time_start = time.perf_counter()
-        
-        # 用于控制处理帧率的变量
-        process_every_n_frames = self.frameRateSpinner.value()  # 每隔N帧处理一次，减少CPU负载
-        frame_count = 0
-        last_error_time = 0  # 用于限制错误日志频率
-        
-        # 交替检测控制
-        detection_mode = 0  # 0: 面部检测, 1: 手势检测
-        
-        # 检测到物体的状态跟踪
-        face_detected = False
-        hand_detected = False
-        last_face_time = time.time()
-        last_hand_time = time.time()
-        no_detection_reported = False
-        
-        # 主循环处理摄像头图像
-        while self.cap.isOpened() and self.CAMERA_STYLE:
-            try:
-                ret, frame = self.cap.read()
-                if not ret:
-                    continue
-                
-                frame_count += 1
-                if frame_count % process_every_n_frames != 0:
-                    # 显示原始帧，但跳过处理
-                    self.update_display(frame)
-                    cv2.waitKey(1)
-                    continue
-                
-                # 获取当前的处理帧率设置
-                process_every_n_frames = self.frameRateSpinner.value()
-                
-                # 调整图像大小以加快处理速度
-                frame = imutils.resize(frame, width=640)
-                
-                # 创建帧的副本，用于各种处理
-                display_frame = frame.copy()
-                
-                # 转换为灰度图用于各种检测
-                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-                
-                # 减少点头/摇头显示持续时间的计数器，不管当前是什么检测模式
-                if self.gesture_detector and hasattr(self.gesture_detector, 'gesture_status'):
-                    if self.gesture_detector.gesture_status["nod"] > 0:
-                        self.gesture_detector.gesture_status["nod"] -= 1
-                    if self.gesture_detector.gesture_status["shake"] > 0:
-                        self.gesture_detector.gesture_status["shake"] -= 1
-                
-                # 使用交替检测模式时，每一帧只执行一种检测
-                if self.use_alternating_detection:
-                    if detection_mode == 0:
-                        # 1. 人脸检测和疲劳分析
-                        if (self.checkBox_nod.isChecked() or self.checkBox_shake.isChecked() or 
-                            self.checkBox_yawn.isChecked() or self.checkBox_blink.isChecked() or 
-                            self.checkBox_fatigue.isChecked()):
-                            
-                            # 检测人脸
-                            faces = self.detector(gray, 0)
-                            
-                            if len(faces) > 0:
-                                # 保存当前人脸框用于持续显示
-                                face = faces[0]
-                                x, y, w, h = face.left(), face.top(), face.right() - face.left(), face.bottom() - face.top()
-                                self.last_face_box = (x, y, w, h)
-                                self.face_box_valid_frames = self.faceBoxSpinner.value()  # 使用控件的值
-                                
-                                # 更新前端数据中的人脸框信息
-                                self.frontend_data['face_detected'] = True
-                                self.frontend_data['face_box'] = [x, y, w, h]
-                                self.frontend_data['system_status'] = "正在检测人脸"
-                                
-                                # 处理第一个检测到的人脸
-                                self.process_face(frame, display_frame, gray, faces)
-                                face_detected = True
-                                last_face_time = time.time()
-                                no_detection_reported = False
-                            else:
-                                # 没有检测到人脸
-                                face_detected = False
-                                self.frontend_data['face_detected'] = False
-                    else:
-                        # 2. 手势检测
-                        if self.checkBox_hand.isChecked() and self.hand_controller is not None:
-                            hand_result = self.process_hands(frame, display_frame)
-                            hand_detected = hand_result is not None and len(hand_result) > 0
-                            
-                            # 更新前端数据中的手部检测状态
-                            self.frontend_data['hand_detected'] = hand_detected
-                            if hand_detected:
-                                self.frontend_data['system_status'] = "正在检测手势"
-                                last_hand_time = time.time()
-                                no_detection_reported = False
-                                
-                            # 即使在手势检测模式下，也显示上一帧的人脸框
-                            if self.last_face_box is not None and self.face_box_valid_frames > 0:
-                                x, y, w, h = self.last_face_box
-                                cv2.rectangle(display_frame, (x, y), (x + w, y + h), (0, 0, 255), 2)
-                                self.face_box_valid_frames -= 1  # 减少有效帧计数
-                    
-                    # 每10帧更新一次前端数据文件（降低I/O开销）
-                    if frame_count % 10 == 0:
-                        self.update_frontend_data()
-                    
-                    # 检查是否需要播放"脱离范围"提示
-                    current_time = time.time()
-                    if (not face_detected and not hand_detected and 
-                        current_time - last_face_time > 3 and 
-                        current_time - last_hand_time > 3 and
-                        not no_detection_reported):
-                        self.log_message("脱离识别范围!!!")
-                        self.frontend_data['system_status'] = "脱离识别范围"
-                        self.frontend_data['face_detected'] = False
-                        self.frontend_data['hand_detected'] = False
-                        self.update_frontend_data()  # 立即更新状态
-                        t = threading.Thread(target=self.play_sound, args=("noface",))
-                        t.start()
-                        no_detection_reported = True
-                        
-                    # 切换检测模式
-                    detection_mode = 1 - detection_mode
-                else:
-                    # 不使用交替检测，同时执行两种检测
-                    face_detected = False
-                    hand_detected = False
-                    
-                    # 1. 人脸检测和疲劳分析
-                    if (self.checkBox_nod.isChecked() or self.checkBox_shake.isChecked() or 
-                        self.checkBox_yawn.isChecked() or self.checkBox_blink.isChecked() or 
-                        self.checkBox_fatigue.isChecked()):
-                        
-                        # 检测人脸
-                        faces = self.detector(gray, 0)
-                        
-                        if len(faces) > 0:
-                            # 更新前端数据中的人脸框信息
-                            face = faces[0]
-                            x, y, w, h = face.left(), face.top(), face.right() - face.left(), face.bottom() - face.top()
-                            self.frontend_data['face_detected'] = True
-                            self.frontend_data['face_box'] = [x, y, w, h]
-                            self.frontend_data['system_status'] = "正在检测人脸"
-                            
-                            # 处理第一个检测到的人脸
-                            self.process_face(frame, display_frame, gray, faces)
-                            face_detected = True
-                            last_face_time = time.time()
-                            no_detection_reported = False
-                        else:
-                            # 没有检测到人脸
-                            face_detected = False
-                            self.frontend_data['face_detected'] = False
-                    
-                    # 2. 手势检测
-                    if self.checkBox_hand.isChecked() and self.hand_controller is not None:
-                        hand_result = self.process_hands(frame, display_frame)
-                        hand_detected = hand_result is not None and len(hand_result) > 0
-                        
-                        # 更新前端数据中的手部检测状态
-                        self.frontend_data['hand_detected'] = hand_detected
-                        if hand_detected:
-                            self.frontend_data['system_status'] = "正在检测手势"
-                            last_hand_time = time.time()
-                            no_detection_reported = False
-                    
-                    # 每10帧更新一次前端数据文件
-                    if frame_count % 10 == 0:
-                        self.update_frontend_data()
-                
-                # 更新界面显示
-                self.update_display(display_frame)
-                
-                # 录制处理帧
-                if self.is_recording and self.video_writer is not None:
-                    try:
-                        # 添加录制指示器
-                        rec_indicator = "● REC"
-                        text_size = cv2.getTextSize(rec_indicator, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)[0]
-                        cv2.putText(display_frame, rec_indicator, 
-                                   (display_frame.shape[1] - text_size[0] - 10, 30),
-                                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-                        
-                        # 添加时间戳
-                        if self.recording_start_time is not None:
-                            rec_time = time.time() - self.recording_start_time
-                            timestamp = f"{int(rec_time // 60):02d}:{int(rec_time % 60):02d}"
-                            cv2.putText(display_frame, timestamp, 
-                                       (display_frame.shape[1] - 70, 60),
-                                       cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-                        
-                        # 写入帧
-                        self.video_writer.write(display_frame)
-                    except Exception as e:
-                        self.log_message(f"录制帧时出错: {str(e)}")
-                
-                # 在图像上标注当前模式
-                if self.use_alternating_detection:
-                    mode_text = "面部检测模式" if detection_mode == 0 else "手势检测模式"
-                    cv2.putText(display_frame, mode_text, (10, display_frame.shape[0] - 10),
-                              cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 2)
-                
-                # 延时以控制处理速度
-                cv2.waitKey(1)
-                
-            except Exception as e:
-                current_time = time.time()
-                # 限制错误日志频率，避免刷屏
-                if current_time - last_error_time > 5:  # 每5秒最多记录一次同类错误
-                    print(f"处理错误: {str(e)}")
-                    self.log_message(f"处理发生错误: {str(e)[:50]}")
-                    last_error_time = current_time
-                
-                # 短暂休息，让系统有时间恢复
-                time.sleep(0.1)
-        
+
+        self.frame_count = 0
+        self.last_error_time = 0  # 用于限制错误日志频率
+        if self.adaptive_enabled:
+            controller = self.adaptive_controller = AdaptiveController(self.ADAPTIVE_TARGET_MS)
+            self.ui_signals.level_changed.emit(f"性能档位 {controller.index}: {controller.level.describe()}（初始）")
+        self.latest_analysis = None  # 最近一次分析结果（叠加层），由显示阶段读取
+
+        # 阶段之间的有界队列：显示只需要最新帧，分析落后时直接丢弃旧帧
+        # 帧缓冲在被丢弃或处理完后归还缓冲池
+        self.render_queue = DropOldestQueue(maxsize=2, on_drop=FramePacket.release)
+        self.analysis_queue = DropOldestQueue(maxsize=1, on_drop=FramePacket.release)
+        self.stages = [
+            Stage("采集", self.capture_frame, on_error=self.on_stage_error),
+            Stage("分析", self.analyze_frame, self.analysis_queue, on_error=self.on_stage_error,
+                  on_done=FramePacket.release),
+            Stage("显示", self.render_frame, self.render_queue, on_error=self.on_stage_error,
+                  on_done=FramePacket.release),
+        ]
+        for stage in self.stages:
+            stage.start()
+
+        # 定期刷新各阶段帧率和队列深度，按固定间隔调整性能档位
+        capture_stage, analysis_stage = self.stages[0], self.stages[1]
+        next_adjust = time.monotonic() + self.ADAPTIVE_INTERVAL
+        last_dropped = 0
+        while self.CAMERA_STYLE and all(stage.is_alive() for stage in self.stages):
+            time.sleep(0.5)
+            if time.monotonic() >= next_adjust:
+                next_adjust += self.ADAPTIVE_INTERVAL
+                dropped = self.analysis_queue.dropped
+                self.adjust_performance(analysis_stage, capture_stage, dropped - last_dropped)
+                last_dropped = dropped
+            stats = " | ".join(stage.describe() for stage in self.stages)
+            controller = self.adaptive_controller
+            if controller is not None:
+                stats += f" | 档位{controller.index} {controller.level.describe()}"
+            modality_stats = self.engine.scheduler.describe()
+            if modality_stats:
+                stats += f" | {modality_stats}"
+            encoder = self.video_encoder
+            if encoder is not None:
+                stats += f" | {encoder.describe()}"
+            session_writer = self.session_writer
+            if session_writer is not None:
+                stats += f" | {session_writer.describe()}"
+            stats += f" | {self.buffer_pool.describe()}"
+            self.ui_signals.stats_ready.emit(stats)
+
+        # 停止各阶段线程，归还队列中剩余的帧和最后的叠加层
+        for stage in self.stages:
+            stage.stop()
+        for stage in self.stages:
+            stage.join(timeout=2.0)
+        self.stages = []
+        self.render_queue.clear()
+        self.analysis_queue.clear()
+        self.publish_analysis(None)
+        self.adaptive_controller = None
+        self.engine.close()
+        self.clip_recorder.flush()  # 保存未结束的事件片段
+        self.ui_signals.stats_ready.emit("未运行")
+
         # 关闭摄像头
         if self.cap is not None:
             self.cap.release()
-            
-    def process_face(self, frame, display_frame, gray, faces):
-        """处理检测到的人脸"""
-        # 取第一个人脸进行处理
-        face = faces[0]
-        
-        # 绘制人脸边界框，使用更明显的红色矩形
-        x, y, w, h = face.left(), face.top(), face.right() - face.left(), face.bottom() - face.top()
-        cv2.rectangle(display_frame, (x, y), (x + w, y + h), (0, 0, 255), 2)
-        
-        # 在画面上显示检测到的人脸数量
-        cv2.putText(display_frame, f"FACES: {len(faces)}", (20, 30),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-        cv2.putText(display_frame, f"COUNTER: {self.COUNTER}", (300, 30),
-                  cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-        
-        # 提取人脸特征点
-        shape = self.predictor(frame, face)
-        
-        # 绘制所有68个特征点 - 更大更明显
-        for i in range(68):
-            cv2.circle(display_frame, (shape.part(i).x, shape.part(i).y), 3, (0, 255, 0), -1, 8)
-        
-        # 转换特征点格式用于后续处理
-        shape = face_utils.shape_to_np(shape)
-        
-        # 绘制面部轮廓线 - 增加详细度
-        # 脸部轮廓 (0-16)
-        for i in range(16):
-            cv2.line(display_frame, (shape[i][0], shape[i][1]), 
-                    (shape[i+1][0], shape[i+1][1]), (0, 255, 0), 1)
-            
-        # 左眉毛 (17-21)
-        for i in range(17, 21):
-            cv2.line(display_frame, (shape[i][0], shape[i][1]), 
-                    (shape[i+1][0], shape[i+1][1]), (0, 255, 0), 1)
-            
-        # 右眉毛 (22-26)
-        for i in range(22, 26):
-            cv2.line(display_frame, (shape[i][0], shape[i][1]), 
-                    (shape[i+1][0], shape[i+1][1]), (0, 255, 0), 1)
-            
-        # 鼻梁 (27-30)
-        for i in range(27, 30):
-            cv2.line(display_frame, (shape[i][0], shape[i][1]), 
-                    (shape[i+1][0], shape[i+1][1]), (0, 255, 0), 1)
-            
-        # 鼻子底部 (31-35)
-        for i in range(31, 35):
-            cv2.line(display_frame, (shape[i][0], shape[i][1]), 
-                    (shape[i+1][0], shape[i+1][1]), (0, 255, 0), 1)
-        cv2.line(display_frame, (shape[35][0], shape[35][1]), 
-                (shape[31][0], shape[31][1]), (0, 255, 0), 1)
-            
-        # 左眼 (36-41)
-        for i in range(36, 41):
-            cv2.line(display_frame, (shape[i][0], shape[i][1]), 
-                    (shape[i+1][0], shape[i+1][1]), (0, 255, 0), 1)
-        cv2.line(display_frame, (shape[41][0], shape[41][1]), 
-                (shape[36][0], shape[36][1]), (0, 255, 0), 1)
-            
-        # 右眼 (42-47)
-        for i in range(42, 47):
-            cv2.line(display_frame, (shape[i][0], shape[i][1]), 
-                    (shape[i+1][0], shape[i+1][1]), (0, 255, 0), 1)
-        cv2.line(display_frame, (shape[47][0], shape[47][1]), 
-                (shape[42][0], shape[42][1]), (0, 255, 0), 1)
-            
-        # 嘴唇外围 (48-59)
-        for i in range(48, 59):
-            cv2.line(display_frame, (shape[i][0], shape[i][1]), 
-                    (shape[i+1][0], shape[i+1][1]), (0, 255, 0), 1)
-        cv2.line(display_frame, (shape[59][0], shape[59][1]), 
-                (shape[48][0], shape[48][1]), (0, 255, 0), 1)
-            
-        # 嘴唇内围 (60-67)
-        for i in range(60, 67):
-            cv2.line(display_frame, (shape[i][0], shape[i][1]), 
-                    (shape[i+1][0], shape[i+1][1]), (0, 255, 0), 1)
-        cv2.line(display_frame, (shape[67][0], shape[67][1]), 
-                (shape[60][0], shape[60][1]), (0, 255, 0), 1)
-        
-        # 左眼轮廓
-        leftEye = shape[self.lStart:self.lEnd]
-        leftEyeHull = cv2.convexHull(leftEye)
-        cv2.drawContours(display_frame, [leftEyeHull], -1, (0, 255, 0), 2)
-        
-        # 右眼轮廓
-        rightEye = shape[self.rStart:self.rEnd]
-        rightEyeHull = cv2.convexHull(rightEye)
-        cv2.drawContours(display_frame, [rightEyeHull], -1, (0, 255, 0), 2)
-        
-        # 嘴部轮廓
-        mouth = shape[self.mStart:self.mEnd]
-        mouthHull = cv2.convexHull(mouth)
-        cv2.drawContours(display_frame, [mouthHull], -1, (0, 255, 0), 2)
-        
-        # 点头/摇头检测
-        if self.checkBox_nod.isChecked() or self.checkBox_shake.isChecked():
-            # 检查是否在等待期内
-            if self.gesture_detector.wait_after_detection:
-                current_time = time.time()
-                if current_time >= self.gesture_detector.wait_until_time:
-                    # 等待期结束，重置等待标志
-                    self.gesture_detector.wait_after_detection = False
-                    self.log_message("点头/摇头检测恢复")
-                # 等待期内不显示任何文字提示
-            else:
-                # 不在等待期内，进行正常检测
-                self.process_head_gesture(frame, display_frame, gray, face)
-        
-        # 打哈欠检测
-        if self.checkBox_yawn.isChecked():
-            self.process_yawn(frame, display_frame, shape)
-        
-        # 闭眼检测
-        if self.checkBox_blink.isChecked():
-            self.process_blink(frame, display_frame, shape)
-        
-        # 疲劳状态检测
-        if self.checkBox_fatigue.isChecked():
-            self.check_fatigue_status()
-    
-    def process_head_gesture(self, frame, display_frame, gray, face):
-        """处理头部姿态（点头/摇头）检测"""
-        # 如果在等待期内，直接返回不进行检测
-        if self.gesture_detector.wait_after_detection:
-            return
-            
-        # 提取人脸区域
-        x = face.left(); y = face.top()
-        w = face.right() - face.left(); h = face.bottom() - face.top()
-        
-        # 如果未初始化跟踪点或跟踪中断超过5帧，则重新初始化跟踪点
-        if self.gesture_detector.face_center is None or self.gesture_detector.lost_counter > 5:
-            face_center = (x + w // 2, y + h // 2 + h // 5)
-            self.gesture_detector.face_center = face_center
-            self.gesture_detector.track_points = [np.array([[face_center]], np.float32)]
-            self.gesture_detector.lost_counter = 0
-            self.prev_gray = gray.copy()
+
+    def on_stage_error(self, stage_name, e):
+        """处理阶段线程中的异常"""
+        current_time = time.time()
+        # 限制错误日志频率，避免刷屏
+        if current_time - self.last_error_time > 5:  # 每5秒最多记录一次同类错误
+            print(f"{stage_name}处理错误: {str(e)}")
+            self.log_message(f"{stage_name}处理发生错误: {str(e)[:50]}")
+            self.last_error_time = current_time
+
+    def capture_frame(self):
+        """采集阶段：读取一帧并分发到显示队列和分析队列"""
+        # 读取到上一帧的缓冲中，尺寸不变时不再分配
+        if self._raw_frame is not None:
+            ret, frame = self.cap.read(self._raw_frame)
         else:
-            self.gesture_detector.lost_counter = 0
-            
-        # 光流跟踪
-        if self.gesture_detector.track_points and self.prev_gray is not None:
-            try:
-                # 计算光流跟踪的新位置
-                new_points, st, err = cv2.calcOpticalFlowPyrLK(
-                    self.prev_gray, gray, self.gesture_detector.track_points[-1], None, **lk_params)
-                
-                if new_points is not None:
-                    self.gesture_detector.update_tracking(new_points)
-                    self.prev_gray = gray.copy()
-                    
-                    # 分析运动轨迹判断动作
-                    gesture = self.gesture_detector.analyze_motion()
-                    
-                    # 根据选中选项过滤未启用的手势检测
-                    if gesture == "nod" and not self.checkBox_nod.isChecked():
-                        gesture = None
-                    if gesture == "shake" and not self.checkBox_shake.isChecked():
-                        gesture = None
-                        
-                    # 处理检测到的手势
-                    if gesture:
-                        self.log_message("检测到" + ("点头" if gesture == "nod" else "摇头"))
-                        
-                        # 记录到日志文件
-                        gesture_details = {
-                            'motion_data': {
-                                k: float(v) if isinstance(v, (np.integer, np.floating)) else v 
-                                for k, v in self.gesture_detector.debug_info.items()
-                            },
-                            'threshold': float(NOD_THRESHOLD if gesture == "nod" else SHAKE_THRESHOLD)
-                        }
-                        self.log_detection(gesture, gesture_details)
-                        
-                        t = threading.Thread(target=self.play_sound, args=(gesture,))
-                        t.start()
-                        self.gesture_detector.reset_counters(gesture)
-            except Exception as e:
-                print(f"跟踪错误: {str(e)}")
-                self.gesture_detector.track_points = []
-                self.gesture_detector.face_center = None
-        
-        # 在画面上显示检测结果
-        if self.gesture_detector.gesture_status["nod"] > 0:
-            cv2.putText(display_frame, "NODDING", (50, 60),
-                        cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 0), 3)
-        if self.gesture_detector.gesture_status["shake"] > 0:
-            cv2.putText(display_frame, "SHAKING", (50, 120),
-                        cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 0, 0), 3)
-        
-        # 调试信息不再在图像上显示
-        if self.checkBox_hand_debug.isChecked():
-            # 不再绘制跟踪点
-            pass
-    
-    def process_yawn(self, frame, display_frame, shape):
-        """处理打哈欠检测"""
-        # 提取嘴部特征点
-        mouth = shape[self.mStart:self.mEnd]
-        # 计算嘴部长宽比
-        mar = self.mouth_aspect_ratio(mouth)
-        
-        # 更新前端数据，即使没有触发事件
-        self.frontend_data['mar'] = float(mar)
-        
-        # 绘制嘴部轮廓 - 使用更粗的线条
-        mouthHull = cv2.convexHull(mouth)
-        
-        # 始终绘制嘴部轮廓，而不仅在调试模式下
-        cv2.drawContours(display_frame, [mouthHull], -1, (0, 255, 0), 2)
-        
-        # 在画面上显示MAR值
-        cv2.putText(display_frame, "MAR: {:.2f}".format(mar), (20, 100),
-                  cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-                  
-        # 检测打哈欠
-        if mar > self.MAR_THRESH:
-            self.mCOUNTER += 1
-        if mar < self.MAR_THRESH:
-            self.mCOUNTER = 0
+            ret, frame = self.cap.read()
+        if not ret or frame is None:
+            time.sleep(0.01)
+            return False
+        self._raw_frame = frame
+
+        self.frame_count += 1
+        # 帧总线的帧使用摄像头服务记录的采集时间
+        timestamp = self.cap.last_timestamp if isinstance(self.cap, BusCapture) else time.time()
+
+        # 调整图像大小以加快处理速度，显示与分析使用同一尺寸以便叠加；
+        # 缩放结果写入缓冲池的缓冲，各阶段用完后归还
+        buffer = self.resize_to_pool(frame, self.FRAME_WIDTH)
+        packet = FramePacket(self.frame_count, timestamp, buffer.array, buffer)
+        try:
+            # 录制原始会话（每一帧，与分析间隔无关）：只放入后台录制队列，
+            # 录制线程持有一次引用，编码写入或丢弃后归还
+            if self.session_writer is not None:
+                with self.session_lock:
+                    if self.session_writer is not None:
+                        self.session_writer.write(packet.frame, packet.timestamp, packet.frame_id,
+                                                  release=packet.retain().release)
+
+            # 每个队列各持有一次引用
+            self.render_queue.put(packet.retain())
+            # 每隔N帧送入一次分析，减少CPU负载（自适应调节时由当前档位决定）
+            controller = self.adaptive_controller
+            frame_skip = controller.level.frame_skip if controller is not None else self.frame_skip
+            if self.frame_count % frame_skip == 0:
+                self.analysis_queue.put(packet.retain())
+        finally:
+            packet.release()
+
+    def resize_to_pool(self, frame, width):
+        """按比例缩放到指定宽度，结果写入缓冲池中的缓冲（调用方负责 release）"""
+        height = int(frame.shape[0] * width / float(frame.shape[1]))
+        buffer = self.buffer_pool.acquire((height, width) + frame.shape[2:], frame.dtype)
+        if frame.shape[:2] == (height, width):
+            np.copyto(buffer.array, frame)
         else:
-            if self.mCOUNTER >= self.MOUTH_AR_CONSEC_FRAMES:
-                self.ifYawming = True
-                
-        if self.ifYawming:
-            if self.mTOTAL == 0:
-                self.timeOfTheFirstOfYawns = datetime.datetime.now()
-            if self.mTOTAL == self.Number_Of_Yawns_Judged_As_Fatigue - 1:
-                self.timeOfTheLastOfYawns = datetime.datetime.now()
-            if mar < self.MAR_THRESH:
-                self.ifYawming = False
-                self.mTOTAL += 1
-                self.log_message("打哈欠")
-                
-                # 记录到日志文件
-                yawn_details = {
-                    'counter': self.mTOTAL,
-                    'mar': float(mar),  # 确保mar是可JSON序列化的
-                    'threshold': float(self.MAR_THRESH),
-                    'frames_count': self.mCOUNTER
-                }
-                self.log_detection('yawn', yawn_details)
-                
-                # 播放打哈欠提示音
-                t = threading.Thread(target=self.play_sound, args=("yawn",))
-                t.start()
-            
-            # 显示打哈欠文本 - 使用更大的字体和更粗的线条
-            cv2.putText(display_frame, "YAWNING", (50, 160), 
-                        cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 0), 3)
-    
-    def process_blink(self, frame, display_frame, shape):
-        """处理眨眼/闭眼检测"""
-        # 提取左右眼特征点
-        leftEye = shape[self.lStart:self.lEnd]
-        rightEye = shape[self.rStart:self.rEnd]
-        
-        # 计算眼睛长宽比
-        leftEAR = self.eye_aspect_ratio(leftEye)
-        rightEAR = self.eye_aspect_ratio(rightEye)
-        ear = (leftEAR + rightEAR) / 2.0
-        
-        # 更新前端数据，即使没有触发事件
-        self.frontend_data['ear'] = float(ear)
-        
-        # 绘制眼睛轮廓 - 使用更粗的线条
-        leftEyeHull = cv2.convexHull(leftEye)
-        rightEyeHull = cv2.convexHull(rightEye)
-        
-        # 始终绘制眼睛轮廓，而不仅在调试模式下
-        cv2.drawContours(display_frame, [leftEyeHull], -1, (0, 255, 0), 2)
-        cv2.drawContours(display_frame, [rightEyeHull], -1, (0, 255, 0), 2)
-        
-        # 在画面上显示EAR值
-        cv2.putText(display_frame, "EAR: {:.2f}".format(ear), (20, 70),
-                  cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-        
-        # 检测闭眼
-        self.time_end = time.perf_counter()
-        self.time_reduce = self.time_end - self.time_start
-        
-        if ear < self.EYE_AR_THRESH:
-            self.COUNTER += 1
+            cv2.resize(frame, (width, height), dst=buffer.array, interpolation=cv2.INTER_AREA)
+        return buffer
+
+    def publish_analysis(self, analysis):
+        """替换最近一次的分析结果，归还上一次结果的叠加层缓冲"""
+        with self.analysis_lock:
+            previous, self.latest_analysis = self.latest_analysis, analysis
+        if previous is not None:
+            previous.release()
+
+    def analyze_frame(self, packet):
+        """分析阶段：由检测引擎分析一帧，界面只负责更新状态、提示事件和发布叠加层"""
+        result = self.engine.process(packet.frame, packet.timestamp, packet.frame_id)
+        for name, error in result.errors.items():
+            self.on_stage_error(name, error)
+
+        # 更新前端数据中的检测状态
+        with self.frontend_lock:
+            if result.face_ran:
+                self.frontend_data['face_detected'] = result.face_detected
+                if result.face_detected:
+                    self.frontend_data['face_box'] = list(result.face_box)
+                    self.frontend_data['system_status'] = "正在检测人脸"
+                if result.ear is not None:
+                    self.frontend_data['ear'] = result.ear
+                if result.mar is not None:
+                    self.frontend_data['mar'] = result.mar
+                if result.gaze is not None:
+                    self.frontend_data['gaze'] = list(result.gaze)
+            if result.hand_ran:
+                self.frontend_data['hand_detected'] = result.hand_detected
+                if result.hand_detected:
+                    self.frontend_data['system_status'] = "正在检测手势"
+
+        for event in result.events:
+            self.handle_detection_event(event)
+
+        # 状态变化每帧推送，数据文件每10帧更新一次（降低I/O开销）
+        if packet.frame_id % 10 == 0:
+            self.update_frontend_data()
         else:
-            # 如果有足够的闭眼帧数，记录眨眼事件
-            if self.COUNTER >= 5 and self.COUNTER < self.AR_CONSEC_FRAMES:  # 正常眨眼
-                blink_details = {
-                    'frames_count': self.COUNTER,
-                    'ear': float(ear),
-                    'threshold': float(self.EYE_AR_THRESH)
-                }
-                self.log_detection('blink', blink_details)
-            
-            self.COUNTER = 0
-            
-        if self.COUNTER >= self.AR_CONSEC_FRAMES:
-            self.shutEye = True
-            
-        # 在调试模式下显示眼睛状态信息
-        if self.checkBox_hand_debug.isChecked():
-            cv2.putText(display_frame, f"COUNTER: {self.COUNTER}", (300, 30),
-                      cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
-    
-    def check_fatigue_status(self):
-        """综合判断疲劳状态"""
-        # 如果闭眼时间过长，判定为睡觉
-        if self.shutEye:
-            self.log_message("睡觉")
-            
-            # 记录到日志文件
-            sleep_details = {
-                'frames_count': self.COUNTER,
-                'threshold_frames': self.AR_CONSEC_FRAMES,
-                'duration': float(self.time_reduce)
-            }
-            self.log_detection('sleep', sleep_details)
-            
-            t = threading.Thread(target=self.play_sound, args=("sleep",))
-            t.start()
-            self.shutEye = False
-            self.COUNTER = 0
-            
-        # 根据短时间内的哈欠次数判断疲劳
-        if (self.mTOTAL >= self.Number_Of_Yawns_Judged_As_Fatigue and
-            (0 < (self.timeOfTheLastOfYawns - self.timeOfTheFirstOfYawns).seconds < self.NOYJAF_Time)):
-            self.log_message("疲劳")
-            
-            # 记录到日志文件
-            fatigue_details = {
-                'yawn_count': self.mTOTAL,
-                'threshold_count': self.Number_Of_Yawns_Judged_As_Fatigue,
-                'time_window': (self.timeOfTheLastOfYawns - self.timeOfTheFirstOfYawns).seconds,
-                'max_time_window': self.NOYJAF_Time,
-                'first_yawn_time': self.timeOfTheFirstOfYawns.isoformat(),
-                'last_yawn_time': self.timeOfTheLastOfYawns.isoformat()
-            }
-            self.log_detection('fatigue', fatigue_details)
-            
-            t = threading.Thread(target=self.play_sound, args=("tired",))
-            t.start()
-            # 重置相关计数
-            self.TOTAL = 0
-            self.mTOTAL = 0
-            self.ifTired = False
-    
-    def handle_no_face(self, display_frame):
-        """处理未检测到人脸的情况"""
-        # 增加未检测到人脸的计数
-        self.oCOUNTER += 1
-        
-        if self.checkBox_hand_debug.isChecked():
-            cv2.putText(display_frame, "No Face", (20, 50),
-                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 1, cv2.LINE_AA)
-        
-        # 点头/摇头检测器状态更新
-        if self.checkBox_nod.isChecked() or self.checkBox_shake.isChecked():
-            # 计数跟踪丢失帧数
-            self.gesture_detector.lost_counter += 1
-            self.gesture_detector.face_center = None
-            if self.gesture_detector.lost_counter > 5:
-                self.gesture_detector.track_points = []
-    
-    def process_hands(self, frame, display_frame):
-        """处理手势检测"""
+            with self.frontend_lock:
+                self.state_publisher.publish(self.frontend_data)
+
+        # 在缓冲池的叠加层上绘制并发布最新的分析结果
+        buffer = self.buffer_pool.acquire(result.frame_shape, np.uint8)
+        buffer.array.fill(0)
+        overlay = self.engine.draw(result, buffer.array)
+        self.publish_analysis(AnalysisResult(packet.frame_id, packet.timestamp, overlay, buffer))
+
+    def handle_detection_event(self, event):
+        """提示检测引擎产生的事件：状态输出、日志文件和声音"""
+        message = describe_event(event)
+        if message:
+            self.log_message(message)
+
+        if event.event_type in LOGGED_EVENTS:
+            self.log_detection(event.event_type, event.details)
+
+        if event.event_type == 'no_detection':
+            with self.frontend_lock:
+                self.frontend_data['system_status'] = "脱离识别范围"
+                self.frontend_data['face_detected'] = False
+                self.frontend_data['hand_detected'] = False
+            self.update_frontend_data()  # 立即更新状态
+
+        sound = self.EVENT_SOUNDS.get(event.event_type)
+        if event.event_type == 'hand_gesture':
+            sound = f"gesture_{event.details['gesture_name']}"
+        if sound:
+            # 只是放入播放队列，不会阻塞分析线程
+            self.play_sound(sound)
+
+    def render_frame(self, packet):
+        """显示/录制阶段：把最近的分析叠加层合成到最新帧上，更新界面并写入录像"""
+        display = self.buffer_pool.acquire(packet.frame.shape, packet.frame.dtype)
         try:
-            # 使用MainController进行手部检测和手势识别
-            # MainController返回三个值：边界框、跟踪ID、手势标签
-            bboxes, track_ids, labels = self.hand_controller(frame)
-            
-            # 检查是否有检测到的手势
-            if bboxes is not None and len(bboxes) > 0:
-                # 获取第一个检测到的手势（如果有多个，只处理第一个）
-                current_detected_gesture = None
-                gesture_box = None
-                
-                for i, box in enumerate(bboxes):
-                    # 绘制检测结果
-                    if self.checkBox_hand_debug.isChecked():
-                        # 绘制手势边界框
-                        x1, y1, x2, y2 = map(int, box[:4])
-                        cv2.rectangle(display_frame, (x1, y1), (x2, y2), (0, 255, 0), 2)
-                    
-                    # 处理检测到的手势
-                    if labels[i] is not None:
-                        # 获取手势名称 - 使用gesture_targets列表获取手势名称
-                        gesture_index = labels[i]
-                        if 0 <= gesture_index < len(gesture_targets):
-                            gesture_name = gesture_targets[gesture_index]
-                            current_detected_gesture = gesture_name
-                            gesture_box = box.copy()  # 创建副本以避免引用问题
-                            break  # 只处理第一个检测到的手势
-                
-                # 手势持续时间检测
-                current_time = time.time()
-                
-                # 如果检测到了手势
-                if current_detected_gesture is not None:
-                    # 在画面上显示手势名称
-                    x1, y1 = map(int, gesture_box[:2])
-                    cv2.putText(display_frame, f"Gesture: {current_detected_gesture}",
-                               (x1, y1 - 10),
-                               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 2)
-                    
-                    # 如果是新的手势或者之前没有手势
-                    if self.current_gesture != current_detected_gesture:
-                        self.current_gesture = current_detected_gesture
-                        self.gesture_start_time = current_time
-                        hold_time = 0
-                    else:
-                        # 计算手势已经保持的时间
-                        hold_time = current_time - self.gesture_start_time
-                    
-                    # 绘制手势保持进度条
-                    x1, y1, x2, y2 = map(int, gesture_box[:4])
-                    progress = min(1.0, hold_time / self.gesture_hold_time)
-                    
-                    # 计算进度条宽度
-                    bar_width = int((x2 - x1) * progress)
-                    
-                    # 绘制进度条背景
-                    cv2.rectangle(display_frame, 
-                                 (x1, y2 + 5), 
-                                 (x2, y2 + 15), 
-                                 (100, 100, 100), 
-                                 -1)
-                    
-                    # 绘制进度
-                    if progress < 1.0:
-                        # 进行中 - 蓝色
-                        bar_color = (255, 128, 0)  # 橙色
-                    else:
-                        # 完成 - 绿色
-                        bar_color = (0, 255, 0)
-                    
-                    cv2.rectangle(display_frame, 
-                                 (x1, y2 + 5), 
-                                 (x1 + bar_width, y2 + 15), 
-                                 bar_color, 
-                                 -1)
-                    
-                    # 在调试模式下显示手势保持时间
-                    if self.checkBox_hand_debug.isChecked():
-                        cv2.putText(display_frame, f"Hold: {hold_time:.1f}s / {self.gesture_hold_time:.1f}s",
-                                   (x1, y2 + 30), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 0, 255), 2)
-                    
-                    # 检查手势是否已经保持足够长的时间且未播报过
-                    gesture_key = f"{current_detected_gesture}_{int(current_time/10)}"  # 每10秒允许相同手势再次播报
-                    if hold_time >= self.gesture_hold_time and gesture_key not in self.reported_gestures:
-                        # 添加手势名称到日志
-                        self.log_message(f"检测到手势: {current_detected_gesture} (已保持{hold_time:.1f}秒)")
-                        
-                        # 记录到日志文件
-                        # 将NumPy数组转换为Python列表
-                        bbox = [float(x) for x in gesture_box[:4]]
-                        gesture_details = {
-                            'gesture_name': current_detected_gesture,
-                            'hold_time': float(hold_time),
-                            'bbox': bbox,
-                            'hold_threshold': float(self.gesture_hold_time)
-                        }
-                        self.log_detection('hand_gesture', gesture_details)
-                        
-                        # 播放手势声音（使用线程避免阻塞主线程）
-                        t = threading.Thread(target=self.play_sound, args=(f"gesture_{current_detected_gesture}",))
-                        t.start()
-                        
-                        # 标记为已播报
-                        self.reported_gestures.add(gesture_key)
-                        
-                        # 定期清理过旧的已播报手势记录
-                        if len(self.reported_gestures) > 100:
-                            self.reported_gestures = set(list(self.reported_gestures)[-50:])
-                else:
-                    # 没有检测到手势，重置状态
-                    self.current_gesture = None
+            self._render(packet, display)
+        finally:
+            display.release()
+
+    def _render(self, packet, display):
+        display_frame = display.array
+        np.copyto(display_frame, packet.frame)
+
+        # 叠加最近一次的分析结果，过旧的结果（如分析线程卡住）不再显示；
+        # 使用期间持有叠加层的引用，分析线程发布新结果时不会被复用
+        with self.analysis_lock:
+            result = self.latest_analysis
+            if result is not None:
+                result.retain()
+        if result is not None:
+            try:
+                if packet.timestamp - result.timestamp < self.OVERLAY_MAX_AGE:
+                    mask = self.buffer_pool.acquire(display_frame.shape[:2], bool)
+                    compose_overlay(display_frame, result.overlay, mask.array)
+                    mask.release()
+            finally:
+                result.release()
+
+        # 更新界面显示
+        self.update_display(display_frame)
+
+        # 缓存最近的帧，供事件片段使用（由片段录制的压缩线程压缩，压缩后归还缓冲池）
+        clip_queued = (self.clips_enabled and
+                       self.clip_recorder.add_frame(display_frame, packet.timestamp,
+                                                    release=display.retain().release))
+
+        # 录制处理帧
+        encoder = self.video_encoder
+        if self.is_recording and encoder is not None:
+            if clip_queued:
+                # 片段压缩线程还在读取 display_frame，录制指示器画在单独的副本上
+                record = self.buffer_pool.acquire(display_frame.shape, display_frame.dtype)
+                np.copyto(record.array, display_frame)
             else:
-                # 没有检测到任何手，重置状态
-                self.current_gesture = None
-            
-            return bboxes
-        except Exception as e:
-            self.log_message(f"手势检测错误: {str(e)}")
-            return None
-    
+                record = display.retain()
+            record_frame = record.array
+            try:
+                # 添加录制指示器
+                rec_indicator = "● REC"
+                text_size = cv2.getTextSize(rec_indicator, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)[0]
+                cv2.putText(record_frame, rec_indicator,
+                           (record_frame.shape[1] - text_size[0] - 10, 30),
+                           cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+
+                # 添加时间戳
+                if self.recording_start_time is not None:
+                    rec_time = time.time() - self.recording_start_time
+                    timestamp = f"{int(rec_time // 60):02d}:{int(rec_time % 60):02d}"
+                    cv2.putText(record_frame, timestamp,
+                               (record_frame.shape[1] - 70, 60),
+                               cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 0, 255), 2)
+
+                # 提交给后台编码线程，编码线程持有一次引用，编码或丢弃后归还缓冲池
+                encoder.write(record_frame, packet.timestamp, release=record.retain().release)
+            except Exception as e:
+                self.log_message(f"录制帧时出错: {str(e)}")
+            finally:
+                record.release()
+
     def update_display(self, frame):
-        """更新界面显示"""
+        """更新界面显示（可在工作线程中调用）"""
         # 转换图像格式用于Qt显示
-        rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        if self._rgb_frame is None or self._rgb_frame.shape != frame.shape:
+            self._rgb_frame = np.empty_like(frame)
+        rgb_image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=self._rgb_frame)
         h, w, ch = rgb_image.shape
         bytes_per_line = ch * w
-        qt_image = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888)
-        # 只更新主视图
+        # 复制一份，QImage不持有numpy缓冲区
+        qt_image = QImage(rgb_image.data, w, h, bytes_per_line, QImage.Format_RGB888).copy()
+        self.ui_signals.frame_ready.emit(qt_image)
+
+    def show_frame(self, qt_image):
+        """在界面线程中刷新主视图"""
         self.videoDisplay.setPixmap(QPixmap.fromImage(qt_image))
     
     def play_sound(self, sound_type):
-        """播放声音提示"""
-        # 定义声音文件路径，优先使用WAV格式
-        sound_files = {
-            # 人脸检测声音
-            "nod": "sounds/Nod",
-            "shake": "sounds/Shake",
-            "tired": "sounds/Tired",
-            "sleep": "sounds/Sleep",
-            "noface": "sounds/NoFace",
-            "yawn": "sounds/Tired"
-        }
-        
-        # 检查是否是手势声音
-        if sound_type.startswith("gesture_"):
-            # 提取手势名称并查找对应声音文件
-            gesture_name = sound_type[8:]  # 去掉"gesture_"前缀
-            base_sound_file = f"sounds/gestures/{gesture_name}"
-        else:
-            base_sound_file = sound_files.get(sound_type)
-            
-        if not base_sound_file:
-            self.log_message(f"未定义的声音类型: {sound_type}")
-            return
-            
-        # 优先尝试WAV文件，如果没有则使用MP3
-        wav_file = f"{base_sound_file}.wav"
-        
-        # 检查WAV文件是否存在
-        if os.path.exists(wav_file):
-            sound_file = wav_file
-        else:
-            # WAV文件不存在，使用系统提示音
-            if system == "Windows":
-                winsound.MessageBeep(0)
-            self.log_message(f"找不到声音文件: {wav_file}")
+        """播放声音提示（冷却期内或已在排队的提示音会被忽略）"""
+        if sound_type in self.audio.cues:
+            self.audio.play(sound_type)
             return
         
-        try:
-            if system == "Windows":
-                # 使用异步模式播放，避免主线程阻塞
-                winsound.PlaySound(sound_file, winsound.SND_FILENAME | winsound.SND_ASYNC)
-            else:
-                player = vlc.MediaPlayer(sound_file)
-                player.play()
-        except Exception as e:
-            print(f"音频播放错误: {str(e)}")
-            # 如果失败，只记录错误但不阻止程序继续运行
-            self.log_message(f"无法播放声音: {sound_type}")
-
-    def eye_aspect_ratio(self, eye):
-        """计算眼睛的长宽比"""
-        A = dist.euclidean(eye[1], eye[5])
-        B = dist.euclidean(eye[2], eye[4])
-        C = dist.euclidean(eye[0], eye[3])
-        ear = (A + B) / (2.0 * C)
-        return ear
-    
-    def mouth_aspect_ratio(self, mouth):
-        """计算嘴部的长宽比"""
-        A = np.linalg.norm(mouth[2] - mouth[9])
-        B = np.linalg.norm(mouth[4] - mouth[7])
-        C = np.linalg.norm(mouth[0] - mouth[6])
-        mar = (A + B) / (2.0 * C)
-        # 在调试模式下打印MAR值
-        if self.checkBox_hand_debug.isChecked():
-            print(f"当前MAR值: {mar}")
-        return mar
+        # 没有对应的声音文件，每种只提示一次
+        if sound_type not in self.reported_missing_sounds:
+            self.reported_missing_sounds.add(sound_type)
+            self.log_message(f"找不到声音文件: {sound_type}")
 
     def update_hold_time(self, value):
         """更新手势保持时间"""
@@ -1703,32 +1179,30 @@ class IntegratedUI(object):
         # 更新标签显示
         self.holdTimeValueLabel.setText(f"{seconds:.1f}")
         # 更新手势保持时间
-        self.gesture_hold_time = seconds
+        self.apply_detection_config()
         self.log_message(f"手势保持时间已更新为 {seconds:.1f} 秒")
 
     def update_nod_sensitivity(self, value):
         """更新点头检测灵敏度"""
-        global NOD_THRESHOLD  # 使用全局变量
-        NOD_THRESHOLD = value
-        self.nodSensitivityValueLabel.setText(f"{value}")
-        self.log_message(f"点头检测阈值已调整为: {value} (值越大越不灵敏)")
+        self.nodSensitivityValueLabel.setText(f"{value}°")
+        self.apply_detection_config()
+        self.log_message(f"点头检测阈值已调整为: {value}° (值越大越不灵敏)")
         
-        # 如果已经创建了检测器，更新其相关参数
-        if hasattr(self, 'gesture_detector') and self.gesture_detector is not None:
-            # 重置检测器状态，避免误检测
-            self.gesture_detector.track_points = []
-            self.gesture_detector.direction_history = []
+        # 如果已经创建了检测引擎，重置点头/摇头轨迹，避免误检测
+        if self.engine is not None:
+            self.engine.head_gesture.reset_tracks()
             
     def update_face_box_frames(self, value):
         """更新人脸框持续显示帧数"""
-        self.face_box_valid_frames = value
+        self.apply_detection_config()
         self.log_message(f"人脸框持续显示帧数已更新为: {value}")
 
     def update_frontend_data(self):
         """更新前端数据文件，静默模式，不输出任何信息"""
         try:
-            with open(self.frontend_data_file, 'w', encoding='utf-8') as f:
-                json.dump(self.frontend_data, f, indent=4, ensure_ascii=False, cls=NumpyEncoder)
+            with self.frontend_lock:
+                self.frontend_snapshot.write()
+                self.state_publisher.publish(self.frontend_data)
             # 不输出任何日志信息
         except Exception as e:
             # 只有错误情况才记录日志
@@ -1762,5 +1236,10 @@ if __name__ == "__main__":
     ui.log_message("集成系统已启动")
     ui.log_message("请点击\"开始检测\"按钮开始识别")
     
-    # 执行应用程序
-    sys.exit(app.exec_()) 
\ No newline at end of file
+    # 执行应用程序，退出前写完事件库中排队的事件
+    exit_code = app.exec_()
+    ui.event_store.close()
+    ui.state_publisher.close()
+    ui.clip_recorder.close()
+    ui.audio.close()
+    sys.exit(exit_code) 
\ No newline at end of file
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+离线回放：用检测引擎分析录制好的视频文件或会话文件（.vcap），输出事件流和处理速度
+
+会话文件由界面的"录制原始会话"生成，保存了原始帧和采集时间戳，回放时按
+采集时间驱动检测引擎，结果与实时运行一致。
+
+用法:
+    python replay.py drive1.mp4 drive2.mp4 --workers 2 --output events.jsonl
+    python replay.py recordings/session_20240101_120000.vcap
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from contextlib import nullcontext
+from multiprocessing import Pool
+
+import cv2
+import imutils
+
+from core.capture_format import SessionReader, is_session_file
+from core.engine import DetectionConfig, DetectionEngine, LOGGED_EVENTS
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="离线回放视频，运行疲劳/点头摇头/手势分析")
+    parser.add_argument("videos", nargs="+", help="视频文件或会话文件（.vcap）路径")
+    parser.add_argument("--output", default="replay_events.jsonl",
+                        help="事件输出文件（JSON Lines，每行一个事件）")
+    parser.add_argument("--config", default=None,
+                        help="检测配置JSON文件，字段同 DetectionConfig")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="并行处理的视频数（每个视频一个进程）")
+    parser.add_argument("--stride", type=int, default=1,
+                        help="每隔N帧分析一次，对应界面中的\"处理帧率\"")
+    parser.add_argument("--width", type=int, default=640,
+                        help="分析前缩放到的宽度，与实时检测保持一致")
+    parser.add_argument("--no-hand", action="store_true", help="不运行手势识别")
+    return parser.parse_args()
+
+
+def load_config(path, no_hand=False):
+    """读取检测配置文件，未指定时使用默认配置"""
+    config = DetectionConfig()
+    if path:
+        with open(path, 'r', encoding='utf-8') as f:
+            config = DetectionConfig.from_dict(json.load(f))
+    if no_hand:
+        config.hand = False
+    # 回放每帧都运行所有模态，不使用交替检测
+    config.alternating = False
+    return config
+
+
+def _video_frames(path, measure):
+    """逐帧读取普通视频，时间戳按帧率推算，返回 (帧序号, 时间戳, 图像) 迭代器"""
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise IOError(f"无法打开视频: {path}")
+    video_fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    try:
+        frame_index = 0
+        while True:
+            with measure('decode'):
+                ret, frame = cap.read()
+            if not ret:
+                break
+            frame_index += 1
+            yield frame_index, (frame_index - 1) / video_fps, frame
+    finally:
+        cap.release()
+
+
+def _session_frames(path, measure):
+    """逐帧读取会话文件，时间戳为相对第一帧的采集时间"""
+    with SessionReader(path) as reader:
+        if reader.recovered:
+            print(f"[{os.path.basename(path)}] 会话文件没有正常结束，已恢复 {len(reader)} 帧", file=sys.stderr)
+        if not len(reader):
+            return
+        start = float(reader.timestamps[0])
+        for i in range(len(reader)):
+            with measure('decode'):
+                timestamp, _, frame = reader.frame(i)
+            yield i + 1, timestamp - start, frame
+
+
+def replay_video(path, config, stride=1, width=640, timer=None, draw=False):
+    """分析一个视频或会话文件，返回 (事件记录列表, 统计信息)
+
+    事件时间戳为视频时间（秒），事件格式与 log_detection 写入的日志一致。
+    timer 为 core.profiling.StageTimer 时记录解码、各检测阶段、绘制和整帧耗时；
+    draw 为True时同时绘制标注叠加层（与界面的工作量一致）。
+    """
+    def measure(stage):
+        return timer.measure(stage) if timer is not None else nullcontext()
+
+    if is_session_file(path):
+        frames = _session_frames(path, measure)
+    else:
+        frames = _video_frames(path, measure)
+
+    engine = DetectionEngine(config)
+    engine.load(load_hand=config.hand, load_gaze=config.gaze)
+    engine.timer = timer
+
+    events = []
+    frame_index = 0
+    last_timestamp = 0.0
+    analyzed = 0
+    start = time.perf_counter()
+    try:
+        for frame_index, timestamp, frame in frames:
+            last_timestamp = timestamp
+            if frame_index % stride != 0:
+                continue
+
+            with measure('frame_total'):
+                if frame.shape[1] != width:
+                    frame = imutils.resize(frame, width=width)
+                result = engine.process(frame, timestamp, frame_index)
+                if draw:
+                    with measure('overlay_draw'):
+                        engine.draw(result)
+            analyzed += 1
+
+            for name, error in result.errors.items():
+                print(f"[{os.path.basename(path)}] 第{frame_index}帧{name}分析错误: {error}", file=sys.stderr)
+            for event in result.events:
+                if event.event_type not in LOGGED_EVENTS:
+                    continue
+                events.append({
+                    'video': path,
+                    'timestamp': round(event.timestamp, 3),
+                    'frame': event.frame_id,
+                    'event_type': event.event_type,
+                    'details': event.details,
+                })
+    finally:
+        frames.close()
+        engine.close()
+
+    elapsed = time.perf_counter() - start
+    # 最后一帧的时间加上一帧的平均间隔
+    video_seconds = last_timestamp + (last_timestamp / (frame_index - 1) if frame_index > 1 else 0.0)
+    stats = {
+        'video': path,
+        'frames': frame_index,
+        'analyzed_frames': analyzed,
+        'video_seconds': video_seconds,
+        'elapsed': elapsed,
+        'fps': analyzed / elapsed if elapsed > 0 else 0.0,
+        # 相对实时的倍速：>1 表示比实时播放更快
+        'realtime_factor': video_seconds / elapsed if elapsed > 0 else 0.0,
+        'events': len(events),
+    }
+    return events, stats
+
+
+def _replay_worker(task):
+    path, config_dict, stride, width = task
+    try:
+        return replay_video(path, DetectionConfig.from_dict(config_dict), stride, width)
+    except Exception as e:
+        return [], {'video': path, 'error': str(e)}
+
+
+def json_default(obj):
+    """JSON编码NumPy标量"""
+    if hasattr(obj, 'item'):
+        return obj.item()
+    if hasattr(obj, 'tolist'):
+        return obj.tolist()
+    raise TypeError(f"无法序列化的类型: {type(obj)}")
+
+
+def main():
+    args = parse_args()
+    config = load_config(args.config, args.no_hand)
+    tasks = [(path, config.to_dict(), args.stride, args.width) for path in args.videos]
+
+    start = time.perf_counter()
+    total_frames = 0
+    total_video_seconds = 0.0
+    workers = max(1, min(args.workers, len(tasks)))
+
+    with open(args.output, 'w', encoding='utf-8') as out:
+        if workers == 1:
+            results = map(_replay_worker, tasks)
+        else:
+            pool = Pool(workers)
+            results = pool.imap(_replay_worker, tasks)
+
+        for events, stats in results:
+            if 'error' in stats:
+                print(f"{stats['video']}: 处理失败 - {stats['error']}")
+                continue
+            for record in events:
+                out.write(json.dumps(record, ensure_ascii=False, default=json_default) + "\n")
+            total_frames += stats['analyzed_frames']
+            total_video_seconds += stats['video_seconds']
+            print(f"{stats['video']}: {stats['analyzed_frames']}帧, {stats['events']}个事件, "
+                  f"{stats['fps']:.1f} FPS, 实时倍速 {stats['realtime_factor']:.2f}x")
+
+        if workers > 1:
+            pool.close()
+            pool.join()
+
+    elapsed = time.perf_counter() - start
+    if elapsed > 0 and total_frames:
+        print(f"合计: {total_frames}帧 / {elapsed:.1f}秒 = {total_frames / elapsed:.1f} FPS, "
+              f"视频时长 {total_video_seconds:.1f}秒, 实时倍速 {total_video_seconds / elapsed:.2f}x")
+    print(f"事件已写入: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# 测试直接导入 core 包，与 integrated_demo.py / replay.py 在本目录下运行时一致
+DEMO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if DEMO_DIR not in sys.path:
+    sys.path.insert(0, DEMO_DIR)
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+pytest.importorskip("cv2")
+
+from core.capture_format import SessionReader, SessionRecorder, SessionWriter
+
+
+def make_frames(count, shape=(8, 8, 3)):
+    return [np.full(shape, i, dtype=np.uint8) for i in range(count)]
+
+
+def test_round_trip_across_chunks(tmp_path):
+    path = str(tmp_path / "session.vcap")
+    frames = make_frames(10)
+    # 每帧 192 字节，每 3 帧写入一个数据块
+    with SessionWriter(path, codec='raw', chunk_bytes=500) as writer:
+        for i, frame in enumerate(frames):
+            writer.write(frame, 100.0 + i * 0.05)
+        assert len(writer) == 10
+
+    with SessionReader(path) as reader:
+        assert not reader.recovered
+        assert len(reader) == 10
+        for i, (timestamp, frame_id, image) in enumerate(reader):
+            assert frame_id == i
+            assert timestamp == pytest.approx(100.0 + i * 0.05)
+            np.testing.assert_array_equal(image, frames[i])
+        assert reader.seek_time(100.12) == 3
+
+
+def test_recover_without_footer(tmp_path):
+    path = str(tmp_path / "session.vcap")
+    writer = SessionWriter(path, codec='raw', chunk_bytes=500)
+    for i, frame in enumerate(make_frames(7)):
+        writer.write(frame, float(i), frame_id=100 + i)
+    # 模拟录制中断：只写出已满的数据块，不写尾部索引
+    writer._file.close()
+
+    with SessionReader(path) as reader:
+        assert reader.recovered
+        assert len(reader) == 6
+        assert [frame_id for _, frame_id, _ in reader] == list(range(100, 106))
+
+
+
+def test_recover_empty_and_truncated_files(tmp_path):
+    # 录制刚开始或在写出第一个数据块前中断的文件
+    empty = tmp_path / "empty.vcap"
+    empty.write_bytes(b"")
+    with SessionReader(str(empty)) as reader:
+        assert reader.recovered
+        assert len(reader) == 0
+        assert list(reader) == []
+
+    # 文件头随第一个数据块写出，之前中断时文件为空
+    path = str(tmp_path / "session.vcap")
+    writer = SessionWriter(path, codec='raw', chunk_bytes=500)
+    writer.write(make_frames(1)[0], 0.0)
+    writer._file.close()
+    with SessionReader(path) as reader:
+        assert reader.recovered
+        assert reader.codec is None
+        assert len(reader) == 0
+
+    # 元数据只写出一部分
+    with SessionWriter(path, codec='raw') as writer:
+        writer.write(make_frames(1)[0], 0.0)
+    truncated = tmp_path / "truncated.vcap"
+    with open(path, 'rb') as f:
+        truncated.write_bytes(f.read(14))
+    with SessionReader(str(truncated)) as reader:
+        assert reader.recovered
+        assert len(reader) == 0
+
+def test_recorder_writes_in_background_and_releases(tmp_path):
+    path = str(tmp_path / "session.vcap")
+    released = []
+    recorder = SessionRecorder(SessionWriter(path, codec='raw', chunk_bytes=500))
+    recorder.start()
+    for i, frame in enumerate(make_frames(12)):
+        assert recorder.write(frame, float(i), release=lambda i=i: released.append(i))
+    recorder.close()
+
+    assert recorder.error is None
+    assert len(recorder) == 12
+    assert sorted(released) == list(range(12))
+    with SessionReader(path) as reader:
+        assert [frame_id for _, frame_id, _ in reader] == list(range(12))
+
+
+def test_recorder_drops_when_full(tmp_path):
+    released = []
+    recorder = SessionRecorder(SessionWriter(str(tmp_path / "s.vcap"), codec='raw'), queue_size=2)
+    # 未启动写入线程，队列满后新帧被丢弃并立即释放
+    frames = make_frames(3)
+    results = [recorder.write(f, float(i), release=lambda i=i: released.append(i)) for i, f in enumerate(frames)]
+    assert results == [True, True, False]
+    assert recorder.dropped == 1
+    assert released == [2]
+    recorder.start()
+    recorder.close()
+    assert sorted(released) == [0, 1, 2]
@@ -0,0 +1,89 @@
+import csv
+
+from core.event_store import EventStore
+
+
+def event(ts, event_type, **details):
+    return {'timestamp': ts, 'event_type': event_type, 'details': details}
+
+
+def make_store(tmp_path, records):
+    store = EventStore(str(tmp_path / "events.db"), batch_size=4)
+    for record in records:
+        store.append(record)
+    store.flush()
+    return store
+
+
+def test_query_and_counts(tmp_path):
+    store = make_store(tmp_path, [
+        event(100.0, 'yawn', counter=1, mar=0.62),
+        event(101.0, 'nod', threshold=35.0),
+        event(102.0, 'yawn', counter=2, mar=0.71),
+        event(103.0, 'sleep', frames_count=3, duration=1.2),
+    ])
+    try:
+        events = store.query()
+        assert [e['id'] for e in events] == [1, 2, 3, 4]
+        assert events[0]['details'] == {'counter': 1, 'mar': 0.62}
+
+        # 时间范围为左闭右开
+        assert [e['id'] for e in store.query(start=101.0, end=103.0)] == [2, 3]
+        assert [e['id'] for e in store.query(event_types=['yawn'])] == [1, 3]
+        assert [e['id'] for e in store.query(event_types=['nod', 'sleep'])] == [2, 4]
+        assert [e['id'] for e in store.query(after_id=2, limit=1)] == [3]
+        assert [e['id'] for e in store.iter_events(batch=3)] == [1, 2, 3, 4]
+
+        assert store.counts() == {'yawn': 2, 'nod': 1, 'sleep': 1}
+        assert store.counts(start=102.0) == {'yawn': 1, 'sleep': 1}
+    finally:
+        store.close()
+
+
+def test_iso_timestamps(tmp_path):
+    store = make_store(tmp_path, [
+        event('2024-05-01T08:00:00', 'blink', ear=0.18),
+        event('2024-05-01T09:30:00', 'blink', ear=0.15),
+    ])
+    try:
+        events = store.query(start='2024-05-01T09:00:00')
+        assert [e['timestamp'] for e in events] == ['2024-05-01T09:30:00']
+    finally:
+        store.close()
+
+
+def test_export_csv_with_cursor(tmp_path):
+    store = make_store(tmp_path, [
+        event(100.0, 'yawn', counter=1, mar=0.62),
+        event(101.0, 'hand_gesture', gesture_name='ok', hold_time=1.5, bbox=[10, 20, 30, 40]),
+    ])
+    try:
+        first = str(tmp_path / "first.csv")
+        assert store.export_csv(first, cursor='daily') == 2
+        with open(first, encoding='utf-8', newline='') as f:
+            rows = list(csv.DictReader(f))
+        assert list(rows[0].keys()) == ['id', 'timestamp', 'event_type', 'bbox', 'counter', 'gesture_name', 'hold_time', 'mar']
+        assert rows[0]['mar'] == '0.62'
+        assert rows[1]['gesture_name'] == 'ok'
+        assert rows[1]['bbox'] == '[10, 20, 30, 40]'
+        assert store.get_cursor('daily') == 2
+
+        # 再次导出只包含上次之后的新事件
+        store.append(event(102.0, 'sleep', frames_count=3, duration=1.2))
+        store.flush()
+        second = str(tmp_path / "second.csv")
+        assert store.export_csv(second, cursor='daily') == 1
+        with open(second, encoding='utf-8', newline='') as f:
+            assert [row['id'] for row in csv.DictReader(f)] == ['3']
+        assert store.export_csv(str(tmp_path / "third.csv"), cursor='daily') == 0
+        assert store.get_cursor('daily') == 3
+    finally:
+        store.close()
+
+
+def test_close_writes_pending_events(tmp_path):
+    store = EventStore(str(tmp_path / "events.db"))
+    for i in range(10):
+        store.append(event(float(i), 'blink', ear=0.2))
+    store.close()
+    assert len(store.query()) == 10
@@ -0,0 +1,70 @@
+import threading
+
+import numpy as np
+import pytest
+
+cv2 = pytest.importorskip("cv2")
+
+from core.video_encoder import VideoEncoder
+
+
+def frame(value=0):
+    return np.full((16, 16, 3), value, dtype=np.uint8)
+
+
+def test_timestamps_align_output(tmp_path):
+    path = str(tmp_path / "out.avi")
+    released = []
+    encoder = VideoEncoder(path, fourcc='MJPG', fps=10)
+    encoder.start()
+    # 0.1~0.5 秒之间丢了 3 帧，用 0.5 秒的帧补齐
+    for i, ts in enumerate((0.0, 0.1, 0.5)):
+        assert encoder.write(frame(i), ts, release=lambda i=i: released.append(i))
+    encoder.close()
+
+    assert encoder.error is None
+    assert encoder.written == 6
+    assert sorted(released) == [0, 1, 2]
+    capture = cv2.VideoCapture(path)
+    assert int(capture.get(cv2.CAP_PROP_FRAME_COUNT)) == 6
+    capture.release()
+
+
+def test_drop_newest_when_full(tmp_path):
+    released = []
+    # 未启动的编码线程不会取走帧，队列保持满
+    encoder = VideoEncoder(str(tmp_path / "out.avi"), queue_size=2, drop_policy='newest')
+    assert encoder.write(frame(), 0.0, release=lambda: released.append(0))
+    assert encoder.write(frame(), 0.1, release=lambda: released.append(1))
+    assert not encoder.write(frame(), 0.2, release=lambda: released.append(2))
+    assert released == [2]
+    assert encoder.dropped == 1
+    assert encoder.queued == 2
+
+
+def test_drop_oldest_when_full(tmp_path):
+    released = []
+    encoder = VideoEncoder(str(tmp_path / "out.avi"), queue_size=2, drop_policy='oldest')
+    for i in range(3):
+        assert encoder.write(frame(), i * 0.1, release=lambda i=i: released.append(i))
+    assert released == [0]
+    assert encoder.dropped == 1
+    assert [item[0] for item in encoder._queue] == [0.1, 0.2]
+
+
+def test_rejects_unknown_policy(tmp_path):
+    with pytest.raises(ValueError):
+        VideoEncoder(str(tmp_path / "out.avi"), drop_policy='random')
+
+
+def test_blocked_write_rejected_when_encoder_stops(tmp_path):
+    released = []
+    encoder = VideoEncoder(str(tmp_path / "out.avi"), queue_size=1, drop_policy='block', block_timeout=5.0)
+    assert encoder.write(frame(), 0.0, release=lambda: released.append(0))
+
+    # 写入方阻塞等待空位时编码线程退出，被唤醒后应丢弃该帧并释放
+    threading.Timer(0.1, encoder.close).start()
+    assert not encoder.write(frame(), 0.1, release=lambda: released.append(1))
+    assert released == [1]
+    assert encoder.dropped == 1
+    assert encoder.queued == 1
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+集成演示状态订阅模块
+后台线程连接集成演示程序的状态推送端口（见 integrated_demo/core/state_stream.py），
+在内存中维护最新状态和最近事件，并通知等待中的 Server-Sent Events 连接。
+"""
+
+import json
+import socket
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+
+
+class StateSubscriber:
+    """订阅集成演示的状态推送，断线后自动重连"""
+
+    RECENT_EVENTS = 50
+    BACKLOG = 1000  # 保留的最近消息数，浏览器落后更多时改发完整状态
+
+    def __init__(self, host, port, retry_interval=1.0):
+        self.host = host
+        self.port = port
+        self.retry_interval = retry_interval
+
+        self.state = {}
+        self.seq = 0
+        self.connected = False
+        self.recent_events = deque(maxlen=self.RECENT_EVENTS)
+        self.messages = deque(maxlen=self.BACKLOG)  # (seq, 消息)
+        self.condition = threading.Condition()
+
+        self._thread = threading.Thread(target=self._run, name="integrated-state", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            try:
+                with socket.create_connection((self.host, self.port), timeout=self.retry_interval) as conn:
+                    conn.settimeout(None)
+                    self._set_connected(True)
+                    with conn.makefile('r', encoding='utf-8') as stream:
+                        for line in stream:
+                            self._handle(json.loads(line))
+            except (OSError, ValueError):
+                pass
+            self._set_connected(False)
+            time.sleep(self.retry_interval)
+
+    def _set_connected(self, connected):
+        with self.condition:
+            if self.connected != connected:
+                self.connected = connected
+                self.condition.notify_all()
+
+    def _handle(self, message):
+        with self.condition:
+            if message['type'] == 'snapshot':
+                # 新连接（或演示程序重启）：以完整状态为准，浏览器也需要重新同步
+                self.state = dict(message['state'])
+                self.messages.clear()
+            elif message['seq'] <= self.seq:
+                # 早于当前完整状态的消息
+                return
+            elif message['type'] == 'delta':
+                self.state.update(message['changes'])
+                for key in message['removed']:
+                    self.state.pop(key, None)
+            elif message['type'] == 'event':
+                self.recent_events.appendleft(message['event'])
+            self.seq = message['seq']
+            self.messages.append((self.seq, message))
+            self.condition.notify_all()
+
+    def snapshot(self):
+        """当前完整状态，格式与 detection_data.json 相同"""
+        with self.condition:
+            data = dict(self.state)
+            data['last_events'] = list(self.recent_events)
+            return self.seq, data
+
+    def wait(self, after_seq, timeout):
+        """等待 after_seq 之后的新消息
+
+        返回消息列表；落后太多（消息已被丢弃）或重新同步时返回 None，调用方应改发完整状态。
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: self.seq != after_seq, timeout=timeout)
+            if self.seq == after_seq:
+                return []
+            if not self.messages or self.messages[0][0] > after_seq + 1 or self.seq < after_seq:
+                return None
+            return [message for seq, message in self.messages if seq > after_seq]
+
+
+_subscriber = None
+_subscriber_lock = threading.Lock()
+
+
+def get_subscriber():
+    """进程内共享的订阅者，首次使用时创建"""
+    global _subscriber
+    with _subscriber_lock:
+        if _subscriber is None:
+            _subscriber = StateSubscriber(
+                getattr(settings, 'INTEGRATED_STATE_HOST', '127.0.0.1'),
+                getattr(settings, 'INTEGRATED_STATE_PORT', 8765),
+            )
+        return _subscriber
@@ -5,4 +5,5 @@ urlpatterns = [
     path('welcome/', views.integrated_home, name='integrated_home'),
     path('launch/', views.launch_demo, name='launch_demo'),
     path('status/', views.get_detection_data, name='get_detection_data'),
+    path('stream/', views.detection_stream, name='detection_stream'),
 ] 
\ No newline at end of file
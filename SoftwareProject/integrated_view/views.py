@@ -6,7 +6,7 @@
 该模块处理集成演示的视图逻辑，包括启动演示程序和获取检测数据。
 """
 
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 import subprocess
 import sys
@@ -15,6 +15,9 @@ import threading
 import json
 from django.shortcuts import render
 
+from .stream import get_subscriber
+
+
 def integrated_home(request):
     return render(request, 'integrated/welcome.html')  # 使用你准备的模板路径
 
@@ -45,8 +48,13 @@ def launch_demo(request):
 
 @csrf_exempt
 def get_detection_data(request):
-    """获取检测数据用于前端显示"""
+    """获取检测数据用于前端显示（演示程序在运行时直接返回推送的内存状态）"""
     try:
+        subscriber = get_subscriber()
+        if subscriber.connected:
+            _, data = subscriber.snapshot()
+            return JsonResponse(data)
+
         data_file = os.path.join(os.path.dirname(os.path.dirname(__file__)), 
                                 'integrated_demo', 'frontend_data', 'detection_data.json')
         
@@ -58,4 +66,34 @@ def get_detection_data(request):
             return JsonResponse({'status': 'error', 'message': '数据文件不存在'})
     except Exception as e:
         return JsonResponse({'status': 'error', 'message': str(e)}) 
-    
+
+
+def _sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def detection_stream(request):
+    """以 Server-Sent Events 推送检测状态：先发送完整状态，之后发送增量和事件"""
+    subscriber = get_subscriber()
+
+    def stream():
+        seq, data = subscriber.snapshot()
+        yield _sse('snapshot', {'seq': seq, 'connected': subscriber.connected, 'state': data})
+        while True:
+            messages = subscriber.wait(seq, timeout=15)
+            if messages is None:
+                # 落后太多或演示程序重启，重新发送完整状态
+                seq, data = subscriber.snapshot()
+                yield _sse('snapshot', {'seq': seq, 'connected': subscriber.connected, 'state': data})
+            elif messages:
+                for message in messages:
+                    yield _sse(message['type'], message)
+                seq = messages[-1]['seq']
+            else:
+                # 心跳，同时让浏览器知道演示程序是否在运行
+                yield _sse('status', {'connected': subscriber.connected})
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response